@@ -7,6 +7,8 @@ from matplotlib.figure import Figure
 import main_modeling as main_modeling
 import animation_gui as anim
 import objects
+import newton
+from integrators import SYMPLECTIC_METHODS
 from simsave import save_system
 import webbrowser
 
@@ -131,6 +133,34 @@ class CreateModel(wx.Panel):
 
         self.button_IC = wx.Button(self, label="Set Initial Conditions", pos=(500, 550))
         self.button_IC.Bind(wx.EVT_BUTTON, self.on_open_IC)
+
+        #Create a button to compute the natural frequencies without simulating the system
+        self.button_modal = wx.Button(self, label="Modal Analysis", pos=(850, 550))
+        self.button_modal.Bind(wx.EVT_BUTTON, self.on_modal_analysis)
+
+        #Create a button to set the static equilibrium as initial conditions
+        self.button_equilibrium = wx.Button(self, label="Start at Equilibrium", pos=(980, 550))
+        self.button_equilibrium.Bind(wx.EVT_BUTTON, self.on_equilibrium)
+
+        # Create the inputs for the settings of the simulation
+        wx.StaticText(self, label="Duration (s)", pos=(300, 600))
+        self.input_duration = wx.TextCtrl(self, value="10", pos=(300, 620), size=(120, -1))
+        wx.StaticText(self, label="Method", pos=(440, 600))
+        self.choice_method = wx.Choice(self, choices=["RK45", "RK23", "DOP853", "Radau", "BDF", "LSODA", "auto",
+                                                      "modal", "propagator"] + list(SYMPLECTIC_METHODS), pos=(440, 620))
+        self.choice_method.SetSelection(0)
+        wx.StaticText(self, label="Rel. tolerance", pos=(580, 600))
+        self.input_rtol = wx.TextCtrl(self, value="1e-6", pos=(580, 620), size=(120, -1))
+        wx.StaticText(self, label="Abs. tolerance", pos=(720, 600))
+        self.input_atol = wx.TextCtrl(self, value="1e-6", pos=(720, 620), size=(120, -1))
+        wx.StaticText(self, label="Max. step (s), empty: no limit", pos=(860, 600))
+        self.input_max_step = wx.TextCtrl(self, value="", pos=(860, 620), size=(120, -1))
+        self.config = None
+        self.equations_topology = None  # topology of the system whose equations were shown the last time
+
+        # Create a text to show the metrics of the last run (time of the phases, solver statistics, peak memory)
+        wx.StaticText(self, label="Metrics of the last run", pos=(20, 550))
+        self.text_metrics = wx.StaticText(self, label="", pos=(20, 570), size=(260, -1))
         
         self.num = 0  # Initialize num
         self.paused = False 
@@ -160,26 +190,46 @@ class CreateModel(wx.Panel):
         """
         Method to run the simulation, plot, animate and save the simulated data.
         After the simulation is completed the simulated data is plotted and the animation is initialized with the initial conditions.
-        In a next step the computed equations of motion are shown in a seperate frame.
+        In a next step the computed equations of motion are shown in a seperate frame, if the topology of the system
+        changed since the last run.
         Then the user can save the simulated data via a file dialog.
         After one canceled the dialog or saved the data the animation starts.
+        The metrics of the run (including showing the equations and saving) are shown and appended to the log file
+        data/metrics.jsonl.
 
         """
 
+        self.config = self.get_solver_config()
+        if self.config is None:
+            return
+
         list_of_object_lists = [list_of_springs, list_of_mass]
-        self.res, self.system = main_modeling.run_simulation(list_of_object_lists, simulation_points=25001)
-        self.plot_results(self.res, list_of_object_lists)
-        self.show_equations(self.system)
-        self.canvas.draw()
+        try:
+            self.res, self.system = main_modeling.run_simulation(list_of_object_lists, config=self.config)
+        except ValueError as error:
+            wx.MessageBox(str(error), "Warning", wx.OK | wx.ICON_WARNING)
+            return
 
-        # Start animation
-        max_simulated_time = self.res.t[-1]
-        num_frames = len(self.res.t)
+        max_simulated_time = self.config.t_span[1]
         animation_time = max_simulated_time * 1000  # Convert to milliseconds
 
-        # computes the necessary steps that must be skipped to obtain an update time of 110 ms which allows 
-        # matching the simulated time in the animation quiet good with one spring mass oscillator
-        self.skip_sim_steps = round(110 * num_frames / animation_time)
+        # one frame every 110 ms allows matching the simulated time in the animation quiet good with one spring mass oscillator
+        if self.config.dense:
+            # the dense result is only evaluated at the points of the plot and at the frames of the animation
+            num_frames = round(animation_time / 110) + 1
+            self.plot_results(self.res.sample(2001), list_of_object_lists, self.res.sample(num_frames))
+            self.skip_sim_steps = 1
+        else:
+            # computes the necessary steps that must be skipped to obtain an update time of 110 ms
+            self.plot_results(self.res, list_of_object_lists)
+            self.skip_sim_steps = max(1, round(110 * len(self.res.t) / animation_time))
+        # the equations of motion only depend on the topology, they aren't derived and rendered again for the same one
+        if self.system.topology != self.equations_topology:
+            with self.res.metrics:
+                self.show_equations(self.system)
+            self.equations_topology = self.system.topology
+        self.show_metrics()
+        self.canvas.draw()
 
         self.Bind(wx.EVT_TIMER, self.update_animation, self.timer)
 
@@ -192,6 +242,7 @@ class CreateModel(wx.Panel):
  
             # Show the dialog and get the response
             if save_dialog.ShowModal() == wx.ID_CANCEL:
+                self.res.metrics.log(folder_path + "\\metrics.jsonl")
                 self.timer.Start(self.updatetime)  # Update time per frame 
                 return  # User cancelled the dialog
  
@@ -200,12 +251,83 @@ class CreateModel(wx.Panel):
  
             # Call your custom save function with the selected file path 
             print(save_file_path+".nc")
-            save_system(save_file_path, self.res, self.system)
+            with self.res.metrics:
+                save_system(save_file_path, self.res, self.system, config=self.config)
             print("Data saved.")
+
+        self.show_metrics()
+        self.res.metrics.log(folder_path + "\\metrics.jsonl")
         
         self.timer.Start(self.updatetime)  # Update time per frame 
 
 
+    def get_solver_config(self):
+        """
+        Method to read the settings of the simulation from the inputs.
+        The output is sampled with 2500 points per second. The fixed step methods and the discrete-time propagator
+        have no dense output, all other methods return a lazy result that is only evaluated for the plot and the
+        animation.
+
+        :return: settings of the simulation or None if an input is invalid
+        :rtype: newton.SolverConfig
+        """
+        method = self.choice_method.GetString(self.choice_method.GetSelection())
+        try:
+            duration = float(self.input_duration.GetValue())
+            rtol = float(self.input_rtol.GetValue())
+            atol = float(self.input_atol.GetValue())
+            max_step = float(self.input_max_step.GetValue()) if self.input_max_step.GetValue().strip() else None
+        except ValueError:
+            wx.MessageBox("Invalid settings of the simulation.", "Warning", wx.OK | wx.ICON_WARNING)
+            return None
+
+        if duration <= 0:
+            wx.MessageBox("The duration of the simulation must be positive.", "Warning", wx.OK | wx.ICON_WARNING)
+            return None
+
+        return newton.SolverConfig(t_span=(0, duration), num_points=round(2500 * duration) + 1, method=method,
+                                   rtol=rtol, atol=atol, max_step=max_step,
+                                   dense=method not in SYMPLECTIC_METHODS and method != "propagator")
+
+    def on_equilibrium(self, event):
+        """
+        Method to compute the static equilibrium of the created system and set it as initial conditions,
+        so the simulation starts at rest in the equilibrium.
+        The rest positions and the prestretches of the springs are shown in a message box.
+        """
+        list_of_object_lists = [list_of_springs, list_of_mass]
+        try:
+            positions, prestretches, system = main_modeling.run_static_equilibrium(list_of_object_lists, set_equilibrium=True)
+        except ValueError as error:
+            wx.MessageBox(str(error), "Warning", wx.OK | wx.ICON_WARNING)
+            return
+
+        lines = [f"Mass {i+1}: y = {position[1]:.4f} m" for i, position in enumerate(positions)]
+        lines += [f"Spring {i+1}: prestretch = {prestretch:.4f} m" for i, prestretch in enumerate(prestretches)]
+        wx.MessageBox("\n".join(lines), "Static Equilibrium", wx.OK | wx.ICON_INFORMATION)
+
+    def on_modal_analysis(self, event):
+        """
+        Method to compute the natural frequencies and mode shapes of the created system.
+        The system is not simulated. The modes are shown in a seperate frame as a table.
+        """
+        list_of_object_lists = [list_of_springs, list_of_mass]
+        try:
+            frequencies, mode_shapes, system = main_modeling.run_modal_analysis(list_of_object_lists)
+        except ValueError as error:
+            wx.MessageBox(str(error), "Warning", wx.OK | wx.ICON_WARNING)
+            return
+
+        mode_table = ModeTable(self, frequencies, mode_shapes)
+        mode_table.Show()
+
+    def show_metrics(self):
+        """
+        Method to show the metrics of the last run (see metrics.RunMetrics.summary())
+        """
+        self.text_metrics.SetLabel(self.res.metrics.summary())
+        self.Layout()
+
     def show_equations(self, system):
         """
         Method to generate and show the equations in a seperate frame
@@ -216,18 +338,20 @@ class CreateModel(wx.Panel):
         # plot/show equations of motion
         main_modeling.generate_latex(system)
 
-    def plot_results(self, res, list_of_object_lists):
+    def plot_results(self, res, list_of_object_lists, frames=None):
         """
         Method to plot the simulated data and initializes the animation with the initial conditions
         :param res: Results of simulation. Containing time, position and velocity.
         :type res: scipy.integrate.OdeSolution
         :param list_of_object_lists: list containing spring and mass objects
         :type list_of_object_lists: list
+        :param frames: Results of simulation at the frames of the animation, default is None (res is used)
+        :type frames: scipy.integrate.OdeSolution
         """
 
         # Plot results in ax1
         main_modeling.plot_results(res, self.ax1)
-        self.animation = anim.Animation(res, list_of_object_lists, self.ax2)
+        self.animation = anim.Animation(res if frames is None else frames, list_of_object_lists, self.ax2)
 
     def update_animation(self, event):
         """
@@ -337,6 +461,13 @@ class OpenModel(wx.Panel):
         self.Bind(wx.EVT_BUTTON,self.on_load_model,self.button_load_model)             
         self.button_load_model.SetPosition((1000,500))
 
+        # Create a button to show the equations of motion of the loaded model (they are derived only on request)
+        self.button_equations = wx.Button(self,label="Show Equations")
+        self.Bind(wx.EVT_BUTTON,self.on_show_equations,self.button_equations)
+        self.button_equations.SetPosition((1000,540))
+        self.button_equations.Disable()
+        self.loaded_res = None
+
         self.num = 0  # Initialize num
         self.paused = False 
         self.updatetime = 100 # Initialize updatetime
@@ -365,7 +496,9 @@ class OpenModel(wx.Panel):
         Method to run the simulation, plot and animate loaded data.
         A file dialog opens where one can select the file which should be loaded.
         After that list of objects is recreated, as well as the saved system itself.
-        Then the loaded data is plotted and the animation starts.
+        Then the loaded data is plotted and the animation starts. Only the points of the plot and the frames of the
+        animation are read from the file.
+        The equations of motion are only derived when the "Show Equations" button is clicked.
         """
         self.timer.Stop()
         self.ax1.cla()  # clear axis 1
@@ -386,26 +519,35 @@ class OpenModel(wx.Panel):
 
             # Get the selected file path
             selected_file_path = file_dialog.GetPath()
-            loaded_list_of_object_lists = main_modeling.load_list(selected_file_path)
-            self.loaded_res = main_modeling.load_sys(selected_file_path)
-            self.loaded_system = self.loaded_res.loaded_system
+            # the file is read once, the results are only read at the points of the plot and at the frames of the
+            # animation
+            loaded_list_of_object_lists, self.loaded_res = main_modeling.load_model_file(selected_file_path,
+                                                                                         lazy=True)
+            self.button_equations.Enable()
+
+            max_simulated_time = self.loaded_res.results.t_span[1]
+            animation_time = max_simulated_time * 1000  # Convert to milliseconds
 
-            self.plot_results(self.loaded_res, loaded_list_of_object_lists)
-            self.show_equations(self.loaded_system)
+            # one frame every 110 ms allows matching the simulated time in the animation quiet good with one spring
+            # mass oscillator
+            num_frames = round(animation_time / 110) + 1
+            self.plot_results(self.loaded_res.sample(2001), loaded_list_of_object_lists,
+                              self.loaded_res.sample(num_frames))
             self.canvas.draw()
 
             # Start animation
-            max_simulated_time = self.loaded_res.t[-1]
-            num_frames = len(self.loaded_res.t)
-            animation_time = max_simulated_time * 1000  # Convert to milliseconds
-
-            # computes the necessary steps that must be skipped to obtain an update time of 110 ms which allows 
-            # matching the simulated time in the animation quiet good with one spring mass oscillator
-            self.skip_sim_steps = round(110 * num_frames / animation_time)
+            self.skip_sim_steps = 1
 
             self.Bind(wx.EVT_TIMER, self.update_animation, self.timer)
             self.timer.Start(self.updatetime)  # Update time per frame
 
+    def on_show_equations(self, event):
+        """
+        Method to build the loaded system and show its equations of motion in a seperate frame
+        """
+        if self.loaded_res is not None:
+            self.show_equations(self.loaded_res.loaded_system)
+
     def show_equations(self, system):
         """
         Method to generate and show the equations in a seperate frame
@@ -415,17 +557,19 @@ class OpenModel(wx.Panel):
         # plot/show equations of motion
         main_modeling.generate_latex(system)
 
-    def plot_results(self, res, list_of_object_lists):
+    def plot_results(self, res, list_of_object_lists, frames=None):
         """
         Method to plot the simulated data and initializes the animation with the initial conditions
         :param res: Results of simulation. Containing time, position and velocity.
         :type res: scipy.integrate.OdeSolution
         :param list_of_object_lists: list containing spring and mass objects
         :type list_of_object_lists: list
+        :param frames: Results of simulation at the frames of the animation, default is None (res is used)
+        :type frames: scipy.integrate.OdeSolution
         """
         # Plot results in ax1
         main_modeling.plot_results(res, self.ax1)
-        self.animation = anim.Animation(res, list_of_object_lists, self.ax2)
+        self.animation = anim.Animation(res if frames is None else frames, list_of_object_lists, self.ax2)
 
     def update_animation(self, event):
         """
@@ -1220,6 +1364,43 @@ class InitialCondition(wx.Frame):
             wx.MessageBox("No initial conditions to submit.", "Warning", wx.OK | wx.ICON_WARNING)
 
 
+class ModeTable(wx.Frame):
+    """
+    Class to create the Frame for the results of the modal analysis
+    It is opened by pressing the button "Modal Analysis" on the panel "Create Model"
+    This frame has no childs.
+    The frame contains a table with one row per mode: natural frequency, period and the amplitude of every mass in the mode shape (y direction).
+
+    :param parent: The Create Model panel
+    :type parent: wx.Panel
+    :param frequencies: natural frequencies in (Hz)
+    :type frequencies: numpy.ndarray
+    :param mode_shapes: mode shapes (one column per mode, rows in the order of the coordinates [x1, y1, x2, y2, ...])
+    :type mode_shapes: numpy.ndarray
+    """
+    def __init__(self, parent, frequencies, mode_shapes):
+        wx.Frame.__init__(self,parent,title="Modal Analysis", size =(600,400))
+        self.SetBackgroundColour(wx.Colour(255,255,255))
+
+        # Create the table with one column for every mass
+        self.table = wx.ListCtrl(self, style=wx.LC_REPORT)
+        self.table.InsertColumn(0, "Mode")
+        self.table.InsertColumn(1, "Frequency (Hz)")
+        self.table.InsertColumn(2, "Period (s)")
+        y_shapes = mode_shapes[1::2]
+        for i in range(len(y_shapes)):
+            self.table.InsertColumn(3+i, "Mass "+str(i+1))
+
+        # Fill the table, the mode shapes are normalized to the largest amplitude
+        for j in range(len(frequencies)):
+            row = self.table.InsertItem(j, str(j+1))
+            self.table.SetItem(row, 1, f"{frequencies[j]:.4f}")
+            self.table.SetItem(row, 2, f"{1/frequencies[j]:.4f}" if frequencies[j] > 0 else "-")
+            shape = y_shapes[:, j] / abs(y_shapes[:, j]).max()
+            for i in range(len(shape)):
+                self.table.SetItem(row, 3+i, f"{shape[i]:.3f}")
+
+
 # Create The Frame for the Create Element 
 class CreateElement(wx.Frame):
     """
@@ -1,5 +1,8 @@
 import matplotlib.pyplot as plt
 from sympy import Eq, latex, Function, symbols, Derivative
+from metrics import timed
+from numpy import asarray, searchsorted
+from scipy.optimize import OptimizeResult
 
 
 def eq_to_latex(system):
@@ -40,14 +43,15 @@ def eq_to_latex(system):
     dd = [system.accelerations[m][c] for m in list(system.parameters.keys()) for c in ['x', 'y']]
     dd_expr = [Eq(dd[i], expr_eq[i]) for i in range(len(dd))]
 
-    # substitute to get rid of the explicit time dependency
-    dd_expr_subs = [expr.subs(derivative_dict) for expr in dd_expr]
+    with timed("latex"):
+        # substitute to get rid of the explicit time dependency
+        dd_expr_subs = [expr.subs(derivative_dict) for expr in dd_expr]
 
-    # create the LaTeX string
-    latex_str = ""
-    for expr in dd_expr_subs:
-        expr_latex = latex(expr)
-        latex_str = latex_str + f"${expr_latex}$\n"
+        # create the LaTeX string
+        latex_str = ""
+        for expr in dd_expr_subs:
+            expr_latex = latex(expr)
+            latex_str = latex_str + f"${expr_latex}$\n"
 
     latex_str = latex_str.replace("operatorname", "mathrm")
 
@@ -93,15 +97,105 @@ def show_equations_of_motion(latex_str, font_size=16):
 class LoadedSystem:
     """
     A class to represent a loaded system with associated time, output data, and system parameters.
+    Lazy results of a file (see simsave.LazyResults) are only read when they are used: t and y read all time points,
+    window() and sample() only the needed time points.
 
-    :param t: time values of the simulated and loaded system
+    :param t: time values of the simulated and loaded system (None for lazy results)
     :type t: float
-    :param y: results of the simulated and loaded system
+    :param y: results of the simulated and loaded system (None for lazy results)
     :type y: Numpy.array
-    :param loaded_system: Loaded system regarding the Newton class
+    :param loaded_system: Loaded system regarding the Newton class (None if it is built later, see defer_system())
     :type loaded_system: Newton class
+    :param solver_config: settings of the simulation (None for files without settings)
+    :type solver_config: newton.SolverConfig
+    :param results: lazy results of the file, default is None (t and y are given)
+    :type results: simsave.LazyResults
     """
-    def __init__(self, t, y, loaded_system):
-        self.t = t
-        self.y = y
-        self.loaded_system = loaded_system
\ No newline at end of file
+    def __init__(self, t, y, loaded_system, solver_config=None, results=None):
+        self.time = t
+        self.states = y
+        self.results = results
+        self.system = loaded_system
+        self.system_builder = None
+        self.solver_config = solver_config
+
+    @property
+    def t(self):
+        """
+        Time points of the results
+        """
+        if self.time is None:
+            self.time = self.results.t
+        return self.time
+
+    @property
+    def y(self):
+        """
+        Results (shape: number of states x number of time points)
+        """
+        if self.states is None:
+            self.states = self.results.y
+        return self.states
+
+    def window(self, t_start=None, t_end=None, states=None, max_points=None):
+        """
+        Method for getting the results of a time window (see simsave.LazyResults.window()).
+
+        :param t_start: start time of the window, default is None (first time point)
+        :type t_start: float
+        :param t_end: end time of the window, default is None (last time point)
+        :type t_end: float
+        :param states: indices of the states, default is None (all states)
+        :type states: list of int
+        :param max_points: maximum number of time points (every n-th point is used), default is None (all points)
+        :type max_points: int
+        :return: results of the window with the attributes t and y
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        if self.results is not None and self.states is None:
+            return self.results.window(t_start, t_end, states, max_points)
+
+        t = asarray(self.t)
+        start = 0 if t_start is None else searchsorted(t, t_start)
+        stop = len(t) if t_end is None else searchsorted(t, t_end, side="right")
+        step = 1 if max_points is None else max(1, -(-(stop - start) // max_points))
+        y = asarray(self.y)[:, start:stop:step]
+        return OptimizeResult(t=t[start:stop:step], y=y if states is None else y[states])
+
+    def sample(self, num_points, states=None):
+        """
+        Method for getting about num_points evenly spaced time points of the results (e.g. the points of a plot or
+        the frames of an animation, see simsave.LazyResults.sample()).
+
+        :param num_points: maximum number of time points
+        :type num_points: int
+        :param states: indices of the states, default is None (all states)
+        :type states: list of int
+        :return: sampled results with the attributes t and y
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        return self.window(states=states, max_points=num_points)
+
+    @property
+    def loaded_system(self):
+        """
+        Loaded system. A deferred system (see defer_system()) is built when it is needed the first time.
+
+        :return: loaded system
+        :rtype: newton.Mechanics
+        """
+        if self.system_builder is not None:
+            builder, self.system_builder = self.system_builder, None
+            self.system = builder()
+
+        return self.system
+
+    def defer_system(self, builder):
+        """
+        Method for building the loaded system only when it is needed (e.g. to show the equations of motion),
+        so the results can be plotted and animated without deriving the symbolic system.
+
+        :param builder: function without arguments that returns the loaded system
+        :type builder: function
+        """
+        self.system_builder = builder
\ No newline at end of file
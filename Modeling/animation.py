@@ -89,16 +89,11 @@ def animation(sol, list_of_object_lists,skip_sim_steps=150):
                     sb_index += 1
         
         for i in range(len(list_of_springs)):
-            if list_of_springs[i].startingpoint[1] == 0:
-                list_of_springs[i].move(None, list_of_mass[i])
-                x_sp, y_sp = list_of_springs[i].startingpoint
-                x_ep, y_ep = list_of_springs[i].endpoint
-                spring_line[i][0].set_data([x_sp, x_ep], [y_sp, y_ep])  # Update spring line coordinates
-            else:
-                list_of_springs[i].move(list_of_mass[i-1], list_of_mass[i])
-                x_sp, y_sp = list_of_springs[i].startingpoint
-                x_ep, y_ep = list_of_springs[i].endpoint
-                spring_line[i][0].set_data([x_sp, x_ep], [y_sp, y_ep])  # Update spring line coordinates
+            # move the spring with the masses it is connected to (None for the origin)
+            list_of_springs[i].move(list_of_springs[i].top_mass, list_of_springs[i].bottom_mass)
+            x_sp, y_sp = list_of_springs[i].startingpoint
+            x_ep, y_ep = list_of_springs[i].endpoint
+            spring_line[i][0].set_data([x_sp, x_ep], [y_sp, y_ep])  # Update spring line coordinates
 
         # Update plot title with current time
         time = f"{sol.t[num]:.2f}" 
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from numpy import array, concatenate
+from sympy import lambdify
+import main_modeling
+from chain import create_chain
+from bench_rhs import calls_per_second
+
+
+def main():
+    """
+    Compares the compiled accelerations and Jacobian entries of cubic chains of 30, 300 and 1000 masses without and
+    with common subexpression elimination (the kernel compiles with it, see newton.Kernel.acceleration_function()).
+    The compile time only contains lambdify, the equations in terms of the state symbols are created before.
+    """
+    print(f"{'masses':>7} {'function':>9} {'compile (s)':>12} {'compile cse (s)':>16} {'calls/s':>9} "
+          f"{'calls/s cse':>12} {'speedup':>8}")
+    for num_masses in (30, 300, 1000):
+        list_of_object_lists = create_chain(num_masses, spring_type="cubic", stiffness=1000)
+        system = main_modeling.build_system(list_of_object_lists)
+        z0 = array(main_modeling.get_initial_conditions(list_of_object_lists[1]), dtype=float)
+
+        kernel, active = system.reduced_kernel()
+        state, equations = kernel.state_equations()
+        p = kernel.parameter_vector(system.param_values)
+        z = z0[concatenate((active, len(z0) // 2 + active))]
+
+        index = {s: i for i, s in enumerate(state)}
+        entries = [rhs.diff(s) for rhs in equations for s in rhs.free_symbols if s in index]
+
+        for name, expressions in (("rhs", equations), ("jacobian", entries)):
+            compile_time = []
+            calls = []
+            for cse in (False, True):
+                start = time.perf_counter()
+                fun = lambdify([state, kernel.parameters], expressions, cse=cse)
+                compile_time.append(time.perf_counter() - start)
+                calls.append(calls_per_second(lambda t, z: fun(z, p), z))
+
+            print(f"{num_masses:>7} {name:>9} {compile_time[0]:>12.2f} {compile_time[1]:>16.2f} {calls[0]:>9.0f} "
+                  f"{calls[1]:>12.0f} {calls[1] / calls[0]:>7.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
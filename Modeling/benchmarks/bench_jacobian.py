@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from scipy.integrate import solve_ivp
+from numpy import linspace
+import main_modeling
+from chain import create_chain
+
+
+def main():
+    """
+    Integrates hanging chains of 100, 1000, 3000 and 10000 masses with the implicit BDF method and compares the
+    sparse analytic Jacobian with the same Jacobian as dense matrix (dense LU decompositions, only up to 1000 masses).
+    The set up time contains the derivation of the equations and the compilation of the right hand side and Jacobian.
+    """
+    t_span = (0, 1)
+    t_eval = linspace(t_span[0], t_span[1], 101)
+
+    print(f"{'masses':>7} {'set up (s)':>11} {'sparse (s)':>11} {'dense (s)':>10}")
+    for num_masses in (100, 1000, 3000, 10000):
+        list_of_object_lists = create_chain(num_masses)
+
+        start = time.perf_counter()
+        system = main_modeling.build_system(list_of_object_lists)
+        z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+        sim_fun = system.compile_rhs(system.param_values)
+        jac = system.compile_jacobian(system.param_values)
+        set_up = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solve_ivp(sim_fun, t_span, z0, method="BDF", t_eval=t_eval, rtol=1e-6, jac=jac)
+        sparse = time.perf_counter() - start
+
+        dense = "-"
+        if num_masses <= 1000:
+            dense_jac = system.compile_jacobian(system.param_values, dense=True)
+            start = time.perf_counter()
+            solve_ivp(sim_fun, t_span, z0, method="BDF", t_eval=t_eval, rtol=1e-6, jac=dense_jac)
+            dense = f"{time.perf_counter() - start:.2f}"
+
+        print(f"{num_masses:>7} {set_up:>11.2f} {sparse:>11.2f} {dense:>10}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
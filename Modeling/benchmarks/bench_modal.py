@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import main_modeling
+import modal
+from caching import topology_cache
+from chain import create_chain
+
+
+def main():
+    """
+    Measures the duration of the modal analysis (main_modeling.run_modal_analysis()) of cubic chains for the lowest 6
+    modes, split into the derivation of the equations (main_modeling.build_system()), the compilation of the
+    accelerations and the stiffness matrix, the static equilibrium with the linearization and the eigenvalue solver.
+    Every chain is built without cached kernels.
+    """
+    num_modes = 6
+    topology_cache.directory = None     # no kernels stored on or loaded from the disk
+
+    print(f"{'masses':>7} {'DOF':>6} {'build (s)':>10} {'compile (s)':>12} {'equilibrium (s)':>16} "
+          f"{'eigensolver (s)':>16} {'total (s)':>10}")
+    for num_masses in (100, 300, 1000):
+        topology_cache.clear()
+        list_of_object_lists = create_chain(num_masses, spring_type="cubic")
+        n = 2 * num_masses
+
+        start = time.perf_counter()
+        system = main_modeling.build_system(list_of_object_lists)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        system.compile_rhs(system.param_values)
+        system.compile_stiffness(system.param_values)
+        compiled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        q0 = main_modeling.get_initial_conditions(list_of_object_lists[1])[:n]
+        q_eq = system.static_equilibrium(system.param_values, q0)
+        M, K = system.linearize(system.param_values, q_eq)
+        equilibrium = time.perf_counter() - start
+
+        start = time.perf_counter()
+        coupled = K.getnnz(axis=1) > 0
+        modal.natural_frequencies(M[coupled][:, coupled], K[coupled][:, coupled], num_modes)
+        eigensolver = time.perf_counter() - start
+
+        total = build + compiled + equilibrium + eigensolver
+        print(f"{num_masses:>7} {int(coupled.sum()):>6} {build:>10.2f} {compiled:>12.2f} {equilibrium:>16.2f} "
+              f"{eigensolver:>16.3f} {total:>10.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
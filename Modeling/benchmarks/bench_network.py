@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import main_modeling
+import network
+from caching import topology_cache
+from chain import create_chain
+
+
+def main():
+    """
+    Simulates hanging chains of 100, 1000 and 10000 masses for 1 s with the implicit BDF method and compares the
+    symbolic model (main_modeling.build_system(), only up to 1000 masses) with the numeric model
+    (network.SpringNetwork). The set up time contains the derivation and compilation of the equations or the
+    construction of the arrays of the numeric model. The symbolic model is built without cached kernels.
+    """
+    t_span = (0, 1)
+    topology_cache.directory = None     # no kernels stored on or loaded from the disk
+
+    print(f"{'masses':>7} {'symbolic set up (s)':>20} {'symbolic sim (s)':>17} {'numeric set up (s)':>19} "
+          f"{'numeric sim (s)':>16}")
+    for num_masses in (100, 1000, 10000):
+        list_of_object_lists = create_chain(num_masses)
+        z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+        symbolic_set_up = symbolic_sim = "-"
+        if num_masses <= 1000:
+            topology_cache.clear()
+            start = time.perf_counter()
+            system = main_modeling.build_system(list_of_object_lists)
+            system.solver_setup(system.param_values, z0, method="BDF")
+            symbolic_set_up = f"{time.perf_counter() - start:.2f}"
+
+            start = time.perf_counter()
+            system.simulate(system.param_values, z0, t_span, 101, method="BDF")
+            symbolic_sim = f"{time.perf_counter() - start:.2f}"
+
+        start = time.perf_counter()
+        model = network.SpringNetwork(list_of_object_lists)
+        numeric_set_up = time.perf_counter() - start
+
+        start = time.perf_counter()
+        model.simulate(z0, t_span, 101, method="BDF")
+        numeric_sim = time.perf_counter() - start
+
+        print(f"{num_masses:>7} {symbolic_set_up:>20} {symbolic_sim:>17} {numeric_set_up:>19.2f} "
+              f"{numeric_sim:>16.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
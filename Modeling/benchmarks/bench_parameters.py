@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import io
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import main_modeling
+from caching import topology_cache
+from chain import create_chain
+
+
+def timed_run(list_of_object_lists):
+    """
+    Runs the simulation of the given system and measures the wall clock time of the whole run.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :return: duration of the run in (s)
+    :rtype: float
+    """
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):    # hide the output of run_simulation
+        main_modeling.run_simulation(list_of_object_lists, simulation_points=2001)
+    return time.perf_counter() - start
+
+
+def main():
+    """
+    Measures the duration of run_simulation for the first run of a topology (equations are derived and compiled)
+    and for a re-run after a stiffness and a mass were edited (the cached kernel is reused, only integration is repeated).
+    """
+    topology_cache.directory = None     # no kernels stored on or loaded from the disk
+
+    print(f"{'masses':>8} {'first run (s)':>14} {'re-run after edit (s)':>22} {'speedup':>9}")
+    for n in (3, 30, 100):
+        topology_cache.clear()
+        list_of_object_lists = create_chain(n, spring_type="cubic")
+        first = timed_run(list_of_object_lists)
+
+        # parameter edit: the topology stays the same
+        list_of_springs, list_of_mass = list_of_object_lists
+        list_of_springs[0].stiffness *= 2
+        list_of_mass[-1].mass *= 1.5
+        rerun = timed_run(list_of_object_lists)
+
+        print(f"{n:>8} {first:>14.3f} {rerun:>22.3f} {first / rerun:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from numpy import array, concatenate
+from sympy import lambdify
+import main_modeling
+from chain import create_chain
+
+
+def legacy_rhs(system, param_values):
+    """
+    Right hand side as it was built before the single kernel: one lambdified function per equation,
+    a list comprehension over all of them and numpy.concatenate on every call.
+
+    :param system: system object
+    :type system: newton.Mechanics
+    :param param_values: parameter values of the system
+    :type param_values: dictionary
+    :return: function f(t, z)
+    :rtype: function
+    """
+    eq = system.generate_equations()
+    eq_rhs = system.rhs_of_equation(system.substitute_parameters(eq, param_values))
+    coord, vel = system.state_variables()
+    rhs_funcs = [lambdify(coord + vel, rhs) for rhs in eq_rhs]
+
+    def sim_fun(t, z):
+        half = len(z) // 2
+        positions = z[:half]
+        velocities = z[half:]
+        rhs_evals = [f(*positions, *velocities) for f in rhs_funcs]
+        return concatenate((velocities, rhs_evals))
+
+    return sim_fun
+
+
+def calls_per_second(fun, z, duration=1.0):
+    """
+    Measures how often the function can be called within the given duration.
+
+    :param fun: right hand side f(t, z)
+    :type fun: function
+    :param z: state vector
+    :type z: numpy.ndarray
+    :param duration: measuring time in (s)
+    :type duration: float
+    :return: calls per second
+    :rtype: float
+    """
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        fun(0.0, z)
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    """
+    Compares the RHS calls per second of the legacy per-equation functions with the single compiled kernel
+    for chains of 3, 30 and 300 masses.
+    """
+    print(f"{'masses':>8} {'legacy (calls/s)':>18} {'kernel (calls/s)':>18} {'speedup':>9}")
+    for n in (3, 30, 300):
+        list_of_object_lists = create_chain(n)
+        system = main_modeling.build_system(list_of_object_lists)
+        z = array(main_modeling.get_initial_conditions(list_of_object_lists[1]), dtype=float)
+
+        legacy = calls_per_second(legacy_rhs(system, system.param_values), z)
+        kernel = calls_per_second(system.compile_rhs(system.param_values), z)
+        print(f"{n:>8} {legacy:>18.0f} {kernel:>18.0f} {kernel / legacy:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
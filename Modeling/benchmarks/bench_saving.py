@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from netCDF4 import Dataset
+import main_modeling
+from metrics import RunMetrics
+from simsave import save_system, load_system
+from chain import create_chain
+
+
+def read_window(file_name, start, stop):
+    """
+    Reads the states of the time points start to stop from a file of save_system() (both layouts).
+
+    :param file_name: name of the file (with .nc)
+    :type file_name: str
+    :param start: index of the first time point
+    :type start: int
+    :param stop: index after the last time point
+    :type stop: int
+    :return: states of the window
+    :rtype: list or numpy.ndarray
+    """
+    with Dataset(file_name, "r") as data_file:
+        if "states" in data_file.variables:
+            return data_file.variables["states"][start:stop]
+        variables = list(data_file.variables.values())
+        return [variable[start:stop] for variable in variables[1:-1]]
+
+
+def main():
+    """
+    Saves the simulation of hanging chains of 10 and 100 masses (10 s, 25001 time points) with one variable per state
+    (layout of simsave.save()) and with the chunked and compressed two-dimensional layout (simsave.save_states()).
+    Compares the file size, the duration of saving (without the LaTeX equations, see metrics.RunMetrics) and loading
+    the whole file (simsave.load_system()) and the duration of reading a window of 1 s of all states.
+    """
+    print(f"{'masses':>7} {'layout':>8} {'size (MB)':>10} {'save (s)':>9} {'load (s)':>9} {'window (ms)':>12}")
+    with tempfile.TemporaryDirectory() as folder:
+        for num_masses in (10, 100):
+            list_of_object_lists = create_chain(num_masses)
+            system = main_modeling.build_system(list_of_object_lists)
+            z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+            res = system.simulate(system.param_values, z0, (0, 10), 25001, method="propagator")
+
+            for layout in ("rows", "chunked"):
+                file_name = os.path.join(folder, f"chain{num_masses}_{layout}")
+                # names select the layout with one variable per row
+                names = ["time"] + [f"state{i}" for i in range(len(res.y))] + ["system"] if layout == "rows" else None
+
+                with RunMetrics() as metrics:
+                    save_system(file_name, res, system, names=names)
+                save_time = metrics.phases["saving"]
+
+                start = time.perf_counter()
+                load_system(file_name)
+                load_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                read_window(file_name + ".nc", 10000, 12500)
+                window_time = time.perf_counter() - start
+
+                size = os.path.getsize(file_name + ".nc") / 2 ** 20
+                print(f"{num_masses:>7} {layout:>8} {size:>10.2f} {save_time:>9.3f} {load_time:>9.3f} "
+                      f"{window_time * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
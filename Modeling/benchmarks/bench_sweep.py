@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import io
+from contextlib import redirect_stdout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from numpy import linspace
+import main_modeling
+from chain import create_chain
+
+
+def main():
+    """
+    Compares a parameter sweep done with one run_simulation call per variant with the batched sweep
+    (run_parameter_sweep) for a cubic chain of 10 masses and 10, 100 and 300 stiffness/mass variants.
+    """
+    num_masses = 10
+    print(f"{'variants':>9} {'loop (s)':>10} {'batched (s)':>12} {'speedup':>9}")
+    for num_variants in (10, 100, 300):
+        list_of_object_lists = create_chain(num_masses, spring_type="cubic")
+        list_of_springs, list_of_mass = list_of_object_lists
+        stiffness = linspace(50, 150, num_variants)
+        mass = linspace(0.5, 2, num_variants)
+
+        # one run_simulation call per variant
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):    # hide the output of run_simulation
+            for k, m in zip(stiffness, mass):
+                list_of_springs[0].stiffness = k
+                list_of_mass[-1].mass = m
+                main_modeling.run_simulation(list_of_object_lists, simulation_points=2001)
+        loop = time.perf_counter() - start
+
+        # all variants in one batched integration
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            res, system = main_modeling.run_parameter_sweep(list_of_object_lists,
+                                                            {"k1": stiffness, f"m{num_masses}": mass},
+                                                            simulation_points=2001)
+        batched = time.perf_counter() - start
+
+        print(f"{num_variants:>9} {loop:>10.2f} {batched:>12.2f} {loop / batched:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
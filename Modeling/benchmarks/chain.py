@@ -0,0 +1,40 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+import objects
+
+
+def create_chain(num_masses, spring_type="linear", stiffness=100, mass=1, rest_length=0.5):
+    """
+    Creates a hanging chain of masspoints connected by springs. The first spring is attached to the origin.
+    Used as test model for the benchmarks.
+
+    :param num_masses: number of masspoints (and springs) in the chain
+    :type num_masses: int
+    :param spring_type: type of all springs ("linear" or "cubic"), default is "linear"
+    :type spring_type: str
+    :param stiffness: stiffness of every spring in (N/m), default is 100
+    :type stiffness: int or float
+    :param mass: mass of every masspoint in (kg), default is 1
+    :type mass: int or float
+    :param rest_length: rest length of every spring in (m), default is 0.5
+    :type rest_length: int or float
+    :return: List containing lists of Spring and Mass objects
+    :rtype: list of lists of objects
+    """
+    list_of_mass = []
+    list_of_springs = []
+
+    for i in range(1, num_masses + 1):
+        m = objects.Masspoint(mass=mass, index=i, external_force=0)
+        # every spring is slightly stretched at the beginning
+        m.setInitialConditions([0, -i * 1.1 * rest_length], [0, 0])
+        list_of_mass.append(m)
+
+    for i in range(1, num_masses + 1):
+        s = objects.Spring(rest_length=rest_length, stiffness=stiffness, index=i, type=spring_type)
+        top_mass = list_of_mass[i - 2] if i > 1 else None
+        s.setInitialConditions(top_mass, list_of_mass[i - 1], [0, 0])
+        list_of_springs.append(s)
+
+    return [list_of_springs, list_of_mass]
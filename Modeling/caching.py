@@ -0,0 +1,157 @@
+import os
+import atexit
+import pickle
+from collections import OrderedDict
+
+
+# version of the stored kernels, files of other versions are not loaded (e.g. after changes of newton.Kernel)
+CACHE_VERSION = 2
+
+# folder of the stored kernels
+CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".dynamic_vision", "kernels", f"v{CACHE_VERSION}")
+
+
+class KernelCache:
+    """
+    Class for caching the compiled kernels of the equations of motion (see newton.Kernel) by the topology of the
+    system. The most recently used kernels are kept in memory, the least recently used kernel is removed when the cache
+    is full. If a folder is given, the kernels are also stored as files (with the generated source code of their
+    compiled functions, see newton.Kernel.__getstate__()), so they can be loaded again after a restart of the app.
+    The files are loaded with pickle, so only files written by this cache should be in the folder.
+
+    :param max_size: maximum number of kernels kept in memory, default is 16
+    :type max_size: int
+    :param directory: folder of the stored kernels, default is None (kernels are only kept in memory)
+    :type directory: str or None
+
+    :ivar entries: cached entries in the order of their last use (least recently used first)
+    :vartype entries: collections.OrderedDict
+    :ivar stored: names of the compiled functions of every entry when it was stored (or loaded) the last time
+    :vartype stored: dictionary
+    """
+
+    def __init__(self, max_size=16, directory=None):
+        self.max_size = max_size
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.stored = {}
+
+    def file_name(self, key):
+        """
+        Method for getting the file of an entry.
+
+        :param key: key of the entry (hexadecimal hash)
+        :type key: str
+        :return: path of the file
+        :rtype: str
+        """
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key):
+        """
+        Method for getting an entry from memory or, if it isn't in memory, from its file.
+
+        :param key: key of the entry
+        :type key: str
+        :return: kernel and indices of the integrated coordinates, None if the entry doesn't exist
+        :rtype: tuple or None
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        if self.directory is None or not os.path.exists(self.file_name(key)):
+            return None
+
+        try:
+            with open(self.file_name(key), "rb") as file:
+                entry = pickle.load(file)
+        except Exception:
+            # damaged or incompatible file, the kernel is derived again
+            return None
+
+        self.stored[key] = entry[0].compiled_functions()
+        self.add(key, entry)
+
+        return entry
+
+    def put(self, key, entry):
+        """
+        Method for adding an entry. The entry is stored when its functions are compiled (see save()).
+
+        :param key: key of the entry
+        :type key: str
+        :param entry: kernel and indices of the integrated coordinates
+        :type entry: tuple
+        """
+        self.stored.pop(key, None)
+        self.add(key, entry)
+
+    def add(self, key, entry):
+        """
+        Method for adding an entry to memory. If the cache is full, the least recently used entry is stored and
+        removed from memory.
+
+        :param key: key of the entry
+        :type key: str
+        :param entry: kernel and indices of the integrated coordinates
+        :type entry: tuple
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            oldest = next(iter(self.entries))
+            self.save(oldest)
+            del self.entries[oldest]
+
+    def save(self, key):
+        """
+        Method for storing an entry in its file, if functions were compiled since it was stored the last time.
+        The file is replaced at once, so other processes never read a partly written file.
+
+        :param key: key of the entry
+        :type key: str
+        """
+        if self.directory is None or key not in self.entries:
+            return
+
+        entry = self.entries[key]
+        compiled = entry[0].compiled_functions()
+        if not compiled or self.stored.get(key) == compiled:
+            return
+
+        temporary = f"{self.file_name(key)}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, "wb") as file:
+                pickle.dump(entry, file)
+            os.replace(temporary, self.file_name(key))
+        except (OSError, pickle.PicklingError):
+            # the cache is only an acceleration, the simulation doesn't fail if the kernel can't be stored
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+
+        self.stored[key] = compiled
+
+    def flush(self):
+        """
+        Method for storing all entries in memory (see save()).
+        """
+        for key in list(self.entries):
+            self.save(key)
+
+    def clear(self):
+        """
+        Method for removing all entries from memory (the files are kept).
+        """
+        self.entries.clear()
+        self.stored.clear()
+
+
+# kernels by topology of the systems built by main_modeling.build_system()
+topology_cache = KernelCache(directory=CACHE_DIRECTORY)
+
+# kernels that got new compiled functions after they were stored are written when the program ends
+atexit.register(topology_cache.flush)
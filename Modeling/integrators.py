@@ -0,0 +1,85 @@
+from numpy import empty, asarray, diff, allclose, ceil
+
+# order of the symplectic fixed step methods
+SYMPLECTIC_METHODS = {"Verlet": 2, "Yoshida4": 4, "Yoshida6": 6}
+
+
+def composition_weights(order):
+    """
+    Method for computing the step weights of a symmetric composition of velocity Verlet steps (Yoshida's triple jump).
+    A method of order n+2 is composed of three steps of the method of order n with the weights gamma, 1-2*gamma, gamma.
+    Every composition is symplectic and time reversible, so the energy error stays bounded for long horizons.
+
+    :param order: order of the method (2, 4, 6, ...)
+    :type order: int
+    :return: weights of the velocity Verlet steps (fractions of the step size)
+    :rtype: list of float
+    """
+    if order < 2 or order % 2:
+        raise ValueError("The order of a symmetric composition must be even.")
+    if order == 2:
+        return [1.0]
+
+    inner = composition_weights(order - 2)
+    gamma = 1 / (2 - 2 ** (1 / (order - 1)))
+
+    return [gamma * w for w in inner] + [(1 - 2 * gamma) * w for w in inner] + [gamma * w for w in inner]
+
+
+def integrate_symplectic(acc, init_cond, t_eval, order=2, max_step=None):
+    """
+    Method to integrate q_ddot = a(q) with a fixed step symplectic method (velocity Verlet or a composition of it).
+    The step size is given by the uniform output grid t_eval, if needed every interval is divided into equal substeps
+    that are not larger than max_step. The solution is written directly into a preallocated output array, so the cost
+    only depends on the number of output points, substeps and the order.
+
+    :param acc: function a(q) that returns the accelerations for the coordinates q (must not depend on velocities)
+    :type acc: function
+    :param init_cond: initial state [q0, v0]
+    :type init_cond: list
+    :param t_eval: uniform grid of the time points where the solution is computed
+    :type t_eval: numpy.ndarray
+    :param order: order of the method (see composition_weights()), default is 2 (velocity Verlet)
+    :type order: int
+    :param max_step: maximum step size, default is None (one step per output interval)
+    :type max_step: float or None
+    :return: state [q, v] at every time point (shape: number of states x number of time points)
+             and number of evaluations of the accelerations
+    :rtype: tuple
+    """
+    z0 = asarray(init_cond, dtype=float)
+    n = len(z0) // 2
+    t_eval = asarray(t_eval, dtype=float)
+
+    intervals = diff(t_eval)
+    if len(intervals) and not allclose(intervals, intervals[0]):
+        raise ValueError("Fixed step methods need a uniform grid of output points.")
+    h_out = intervals[0] if len(intervals) else 0.0
+    substeps = 1 if max_step is None or h_out <= max_step else int(ceil(h_out / max_step))
+    h = h_out / substeps
+
+    # half kick and drift of every velocity Verlet step of the composition
+    coefficients = [(0.5 * w * h, w * h) for w in composition_weights(order)]
+
+    y = empty((2 * n, len(t_eval)))
+    q = z0[:n].copy()
+    v = z0[n:].copy()
+    a = acc(q)
+    y[:n, 0] = q
+    y[n:, 0] = v
+
+    for k in range(1, len(t_eval)):
+        for _ in range(substeps):
+            for half_kick, drift in coefficients:
+                # kick - drift - kick, the acceleration at the end of a step is reused at the beginning of the next one
+                v += half_kick * a
+                q += drift * v
+                a = acc(q)
+                v += half_kick * a
+
+        y[:n, k] = q
+        y[n:, k] = v
+
+    nfev = 1 + (len(t_eval) - 1) * substeps * len(coefficients)
+
+    return y, nfev
@@ -1,14 +1,26 @@
 import sympy as sp
 import newton
 from matplotlib import pyplot as plt
-from simsave import save_system, tex_save, load_system
+from simsave import save_system, tex_save, load_system, StreamWriter
 import time
-from numpy import array
+import hashlib
+from numpy import zeros
+from collections import OrderedDict
 import objects
 import os
 import animation
+import modal
+import parallel
+import network
+from metrics import RunMetrics, timed
 from additions import eq_to_latex, show_equations_of_motion, LoadedSystem
 
+# maximum number of parsed files kept by parse_file()
+LOADED_FILES_SIZE = 4
+
+# parsed files by path in the order of their last use (see parse_file())
+loaded_files = OrderedDict()
+
 def create_objects():
     """
     Creates instances of Masspoint, SteadyBody, and Spring objects with specified parameters
@@ -44,6 +56,8 @@ def create_objects():
 def get_list_of_all_forces(list_of_object_lists):
     """
     Calculates forces acting on each mass due to springs and the gravitation.
+    The springs act on the masses they are connected to (see objects.Spring.setInitialConditions()),
+    so the forces are assembled in one pass over the springs and branched or looped systems are possible.
 
     :param list_of_object_lists: List containing lists of Spring and Mass objects
     :type list_of_object_lists: list of lists of objects
@@ -51,84 +65,65 @@ def get_list_of_all_forces(list_of_object_lists):
     :rtype: list of lists of sympy.Add or sympy.Mul
     """
     list_of_springs, list_of_mass =list_of_object_lists
-    list_of_forces_all_x = []  
-    list_of_forces_all_y = []
 
-    for i in range(len(list_of_mass)):
-        pos = list_of_mass[i].position
-
-        # initializes the list of force for each mass with the gravitational force of each mass and an external force if acting on the mass
-        list_of_force_y = list(list_of_mass[i].force())
-        list_of_force_x = []
-
-        match list_of_mass[i].type:
-            case "masspoint":
-                for j in range(len(list_of_springs)):
-
-                    # compares the startingpoint of all springs with the position of the mass
-                    # if the points are the same, this means that the spring is below the mass and the force is positive
-                    if pos == list_of_springs[j].startingpoint: 
-                        Fx,Fy = list_of_springs[j].force(list_of_mass[j-1], list_of_mass[j])
-                        list_of_force_y.append(Fy)
-                        list_of_force_x.append(Fx)
-
-                    # if the points are the same, this means that the spring is above the mass and the force is negative
-                    elif pos == list_of_springs[j].endpoint:
-
-                        # if j=0, this means that this is the first spring in the system which is usally attached to the origin instead of a mass.
-                        # Therefore, the value of the first argument should be None in this case.
-                        if j == 0:
-                            Fx,Fy = list_of_springs[j].force(None, list_of_mass[j])
-                            list_of_force_y.append(-Fy)
-                            list_of_force_x.append(-Fx)
-                        else:
-                            Fx,Fy = list_of_springs[j].force(list_of_mass[j-1], list_of_mass[j])
-                            list_of_force_y.append(-Fy)
-                            list_of_force_x.append(-Fx)
-            
-            case "steady body":
-                for j in range(len(list_of_springs)):
-
-                    # compares the startingpoint of all springs with the position of the mass where the spring should be attached
-                    # if the points are the same, this means that the spring is below the mass and the force is positive
-                    if [pos[0],pos[1]-list_of_mass[i].y_dim/2] == list_of_springs[j].startingpoint:
-
-                        # in the computed point of the conection is a - sign because the KOS for the simulation is inverted to the KOS for the animation
-                        Fx,Fy = list_of_springs[j].force(list_of_mass[j-1], list_of_mass[j])
-                        list_of_force_y.append(Fy)
-                        list_of_force_x.append(Fx)
-
-                    # if the points are the same, this means that the spring is above the mass and the force is negativ
-                    elif [pos[0],pos[1]+list_of_mass[i].y_dim/2] == list_of_springs[j].endpoint:
-
-                        # in the computed point of the conection is a + sign because the KOS for the simulation is inverted to the KOS for the animation
-                        # if j=0, this means that this is the first spring in the system which is usally attached to the origin instead of a mass.
-                        # Therefore, the value of the first argument should be None in this case.
-                        if j == 0:
-                            Fx,Fy = list_of_springs[j].force(None, list_of_mass[j])
-                            list_of_force_y.append(-Fy)
-                            list_of_force_x.append(-Fx)
-                        else:
-                            Fx,Fy = list_of_springs[j].force(list_of_mass[j-1], list_of_mass[j])
-                            list_of_force_y.append(-Fy)
-                            list_of_force_x.append(-Fx)
-
-        # write the list of forces attached to each mass in the list of all forces
-        list_of_forces_all_y.append(list_of_force_y)
-        list_of_forces_all_x.append(list_of_force_x)
+    # initializes the list of force for each mass with the gravitational force of each mass and an external force if acting on the mass
+    list_of_forces_all_x = [[] for mass in list_of_mass]
+    list_of_forces_all_y = [list(mass.force()) for mass in list_of_mass]
+
+    # index of every mass in the list of masses
+    mass_index = {id(mass): i for i, mass in enumerate(list_of_mass)}
+
+    for spring in list_of_springs:
+        if spring.bottom_mass is None:
+            raise ValueError(f"Spring {spring.index} isn't connected to a mass, please set its initial conditions.")
+
+        # the first argument is None if the spring is attached to the origin instead of a mass
+        Fx,Fy = spring.force(spring.top_mass, spring.bottom_mass)
+
+        # the spring is below the top mass, so the force on it is positive
+        if spring.top_mass is not None:
+            i = mass_index[id(spring.top_mass)]
+            list_of_forces_all_y[i].append(Fy)
+            list_of_forces_all_x[i].append(Fx)
+
+        # the spring is above the bottom mass, so the force on it is negative
+        i = mass_index[id(spring.bottom_mass)]
+        list_of_forces_all_y[i].append(-Fy)
+        list_of_forces_all_x[i].append(-Fx)
 
     return [list_of_forces_all_x, list_of_forces_all_y]
 
-def run_simulation(list_of_object_lists, simulation_points=25001):
+def topology_key(list_of_object_lists):
     """
-    Runs simulation using Newton mechanics for the given system of masses and springs.
+    Computes the key of the topology of the given system of masses and springs: the types and indices of the masses
+    (the indices name the symbols), which masses have an external force, and the types, indices and connections of the
+    springs. Systems with the same key have the same equations of motion, only the parameter values can differ.
+    So the key is used to cache the compiled kernels (see newton.Mechanics.reduced_kernel()).
 
     :param list_of_object_lists: List containing lists of Spring and Mass objects
     :type list_of_object_lists: list of lists of objects
-    :param simulation_points: Number of points to simulate, default is 25001
-    :type simulation_points: int
-    :return: Result of simulation and system object
-    :rtype: tuple
+    :return: hexadecimal hash of the topology
+    :rtype: str
+    """
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    mass_index = {id(mass): i for i, mass in enumerate(list_of_mass)}
+    masses = [(mass.type, mass.index, mass.external_force != 0) for mass in list_of_mass]
+    springs = [(spring.type, spring.index, mass_index.get(id(spring.top_mass)), mass_index.get(id(spring.bottom_mass)))
+               for spring in list_of_springs]
+
+    return hashlib.sha256(repr((masses, springs)).encode()).hexdigest()
+
+def build_system(list_of_object_lists):
+    """
+    Builds the Newton mechanics system (masses, forces and parameter values) for the given system of masses and springs.
+    The symbolic forces are only added when they are needed (see newton.Mechanics.defer_forces()), because a system
+    whose topology was simulated before gets its compiled kernel from the cache (see topology_key()).
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :return: system object with masses, forces and parameter values
+    :rtype: newton.Mechanics
     """
 
     list_of_springs, list_of_mass = list_of_object_lists
@@ -136,9 +131,6 @@ def run_simulation(list_of_object_lists, simulation_points=25001):
     # list of masses
     sym_mass_list = [mass.sym_mass for mass in list_of_mass]
 
-    # creating the list of forces attached to each mass
-    list_of_forces_all_x, list_of_forces_all_y = get_list_of_all_forces(list_of_object_lists)
-
     # Setup system with Newton mechanics
     system = newton.Mechanics()
 
@@ -146,9 +138,23 @@ def run_simulation(list_of_object_lists, simulation_points=25001):
     for i in range(len(list_of_mass)):
         system.add_mass(name=str(sym_mass_list[i]), mass=sym_mass_list[i]) # add mass i to the system  
 
-    for i in range(len(sym_mass_list)):
-        system.add_force(str(sym_mass_list[i]), (sum(list_of_forces_all_x[i]), 'x'))
-        system.add_force(str(sym_mass_list[i]), (sum(list_of_forces_all_y[i]), 'y'))
+    # the objects of the system at the time it is built
+    object_lists = [list(list_of_springs), list(list_of_mass)]
+
+    def add_forces():
+        """
+        Adds the forces of the springs, the gravitation and the external forces to the system.
+        """
+        # creating the list of forces attached to each mass
+        list_of_forces_all_x, list_of_forces_all_y = get_list_of_all_forces(object_lists)
+
+        for i in range(len(sym_mass_list)):
+            system.add_force(str(sym_mass_list[i]), (sum(list_of_forces_all_x[i]), 'x'))
+            system.add_force(str(sym_mass_list[i]), (sum(list_of_forces_all_y[i]), 'y'))
+
+    system.defer_forces(add_forces)
+    system.topology = topology_key(list_of_object_lists)
+    system.elements = object_lists
 
     # create dictionary of parameter values of each mass
     param_values_mass = {}
@@ -164,8 +170,18 @@ def run_simulation(list_of_object_lists, simulation_points=25001):
     # "**" unpacks the dictionary into positional arguments
     system.param_values = {**param_values_mass, **param_values_spring, g: 9.81}
 
-    # create list of initial conditions
-    # format of z0: [x1, y1, x2, y2, ..., x1_dot, y1_dot, x2_dot, y2_dot, ...]
+    return system
+
+def get_initial_conditions(list_of_mass):
+    """
+    Creates the initial state vector of the simulation from the initial conditions of the masses.
+
+    :param list_of_mass: List of Mass objects
+    :type list_of_mass: list of objects
+    :return: initial state [x1, y1, x2, y2, ..., x1_dot, y1_dot, x2_dot, y2_dot, ...]
+    :rtype: list
+    """
+    # - sign because the coordinate system (COS) of the simulation is inverted to the COS of the animation
     z0 = []
     for mass in list_of_mass:
         z0.append(-mass.position[0])
@@ -174,16 +190,401 @@ def run_simulation(list_of_object_lists, simulation_points=25001):
     for mass in list_of_mass:
         z0 += mass.velocity
 
-    t_span = (0, 10)
+    return z0
 
-    start = time.time()
-    res = system.simulate(system.param_values, z0, t_span, simulation_points)
-    end = time.time()
+def run_simulation(list_of_object_lists, simulation_points=25001, method="RK45", dense=False, config=None):
+    """
+    Runs simulation using Newton mechanics for the given system of masses and springs.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param simulation_points: Number of points to simulate, default is 25001
+    :type simulation_points: int
+    :param method: integration method (see newton.Mechanics.simulate()), default is "RK45"
+    :type method: str
+    :param dense: return a lazy result that is only evaluated where needed (see newton.DenseResult), default is False
+    :type dense: bool
+    :param config: settings of the simulation (horizon, sampling, method, tolerances), replaces simulation_points,
+                   method and dense, default is None (horizon of 10 s)
+    :type config: newton.SolverConfig
+    :return: Result of simulation and system object. The result has the metrics of the run (res.metrics, see
+             metrics.RunMetrics), phases after the run (e.g. saving) can be added with "with res.metrics: ...".
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    if config is None:
+        config = newton.SolverConfig(t_span=(0, 10), num_points=simulation_points, method=method, dense=dense)
+
+    with RunMetrics() as metrics:
+        system = build_system(list_of_object_lists)
+
+        # create list of initial conditions
+        # format of z0: [x1, y1, x2, y2, ..., x1_dot, y1_dot, x2_dot, y2_dot, ...]
+        z0 = get_initial_conditions(list_of_mass)
+
+        start = time.time()
+        with timed("integration"):
+            res = system.simulate(system.param_values, z0, **config.options())
+        end = time.time()
     print("Duration of simulation: ", end - start, "s.")
+
+    metrics.record_solver(res, config.method)
+    res.metrics = metrics
     
     return res,system
 
-def save_created_system(name, res, system):
+def run_simulation_numeric(list_of_object_lists, config=None):
+    """
+    Runs the simulation with the numeric model of the system (see network.SpringNetwork) instead of the
+    symbolic equations, so large systems don't have to be derived and compiled with sympy.
+    The symbolic system can still be built with build_system() to show or save the equations.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param config: settings of the simulation (horizon, sampling, method, tolerances), default is None (horizon of 10 s)
+    :type config: newton.SolverConfig
+    :return: Result of simulation (with the metrics of the run, see run_simulation()) and numeric model
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    if config is None:
+        config = newton.SolverConfig(t_span=(0, 10))
+
+    with RunMetrics() as metrics:
+        # the arrays of the numeric model replace the symbolic forces
+        with timed("force assembly"):
+            model = network.SpringNetwork(list_of_object_lists)
+        z0 = get_initial_conditions(list_of_mass)
+
+        start = time.time()
+        with timed("integration"):
+            res = model.simulate(z0, **config.options())
+        end = time.time()
+    print("Duration of simulation: ", end - start, "s.")
+
+    metrics.record_solver(res, config.method)
+    res.metrics = metrics
+
+    return res, model
+
+def run_simulation_stream(list_of_object_lists, chunk_duration=1.0, t_span=(0, 10), simulation_points=25001,
+                          method="RK45"):
+    """
+    Runs the simulation in time windows, so long simulations don't have to be held in memory at once
+    (see newton.Mechanics.simulate_chunks()). The chunks are computed while the returned generator is consumed,
+    for example to plot or save the results while the simulation is still running.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param chunk_duration: length of the time windows in seconds, default is 1.0
+    :type chunk_duration: float
+    :param t_span: Interval of integration (start time and end time), default is (0, 10)
+    :type t_span: tuple
+    :param simulation_points: Number of points to simulate, default is 25001
+    :type simulation_points: int
+    :param method: integration method of solve_ivp() or "auto", default is "RK45"
+    :type method: str
+    :return: generator of the chunks (time points and states) and system object
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    system = build_system(list_of_object_lists)
+    z0 = get_initial_conditions(list_of_mass)
+
+    chunks = system.simulate_chunks(system.param_values, z0, t_span, chunk_duration, simulation_points, method=method)
+
+    return chunks, system
+
+def run_simulation_to_file(list_of_object_lists, savepath, chunk_duration=1.0, config=None):
+    """
+    Runs the simulation in time windows and appends every window to a file while the simulation is running
+    (see simsave.StreamWriter), so long simulations don't have to be held in memory and the results up to the last
+    flush are kept if the process dies. The file can be loaded during the run (see load_model_file()) as soon as the
+    first window is written. After the run the equations are saved like in save_created_system().
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param savepath: path of the file (with or without .nc)
+    :type savepath: str
+    :param chunk_duration: length of the time windows in seconds, default is 1.0
+    :type chunk_duration: float
+    :param config: settings of the simulation (horizon, sampling, method, tolerances), saved with the results,
+                   default is None (horizon of 10 s)
+    :type config: newton.SolverConfig
+    :return: metrics of the run (see metrics.RunMetrics) and system object
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    if config is None:
+        config = newton.SolverConfig(t_span=(0, 10))
+    # an existing file is only replaced if the simulation can run
+    if config.method not in newton.SOLVERS and config.method != "auto":
+        raise ValueError(f'Method "{config.method}" can\'t be used for chunked integration.')
+    if config.num_points < 2:
+        raise ValueError("The chunked integration needs at least 2 time points (start time and end time).")
+
+    with RunMetrics() as metrics:
+        system = build_system(list_of_object_lists)
+        z0 = get_initial_conditions(list_of_mass)
+
+        writer = StreamWriter(savepath, len(z0), config, system.elements,
+                              float(system.param_values[sp.Symbol('g')]))
+        with timed("integration"):
+            for t_chunk, y_chunk in system.simulate_chunks(system.param_values, z0, config.t_span, chunk_duration,
+                                                           config.num_points, method=config.method,
+                                                           max_step=config.max_step, rtol=config.rtol,
+                                                           atol=config.atol):
+                writer.append(t_chunk, y_chunk)
+        writer.finish(system)
+
+    return metrics, system
+
+def run_parameter_sweep(list_of_object_lists, parameter_table, simulation_points=25001, method="RK45", config=None):
+    """
+    Runs the simulation of many variants of the given system of masses and springs.
+    All variants share the topology of the system, only the values of the parameters differ. So the equations are
+    derived and compiled once and all variants are integrated together (see newton.Mechanics.simulate_batch()).
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param parameter_table: values of the swept parameters, one column per parameter. The keys are the names of the
+                            parameters (e.g. "k1", "m2", "l1_0"), every value is a list with one entry per variant.
+                            Parameters that are not in the table keep the values of the objects.
+    :type parameter_table: dictionary
+    :param simulation_points: Number of points to simulate, default is 25001
+    :type simulation_points: int
+    :param method: integration method of solve_ivp() (see newton.Mechanics.simulate_batch()), default is "RK45"
+    :type method: str
+    :param config: settings of the simulation (horizon, sampling, method, tolerances), replaces simulation_points
+                   and method, default is None (horizon of 10 s)
+    :type config: newton.SolverConfig
+    :return: Result of simulation (y indexed by variant, state and time) and system object
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    if config is None:
+        config = newton.SolverConfig(t_span=(0, 10), num_points=simulation_points, method=method)
+
+    system = build_system(list_of_object_lists)
+    z0 = get_initial_conditions(list_of_mass)
+
+    # create the parameter values of every variant
+    symbols_by_name = {str(key): key for key in system.param_values}
+    num_variants = len(next(iter(parameter_table.values())))
+    param_sets = []
+    for j in range(num_variants):
+        param_values = dict(system.param_values)
+        for name, values in parameter_table.items():
+            if name not in symbols_by_name:
+                raise ValueError(f"Unknown parameter {name}.")
+            param_values[symbols_by_name[name]] = values[j]
+        param_sets.append(param_values)
+
+    start = time.time()
+    res = system.simulate_batch(param_sets, z0, config.t_span, config.num_points, method=config.method,
+                                max_step=config.max_step, rtol=config.rtol, atol=config.atol)
+    end = time.time()
+    print("Duration of simulation of", num_variants, "variants: ", end - start, "s.")
+
+    return res, system
+
+def run_simulations_parallel(list_of_models, simulation_points=25001, method="RK45", max_workers=None, config=None):
+    """
+    Runs the simulations of many independent systems of masses and springs in parallel on a process pool.
+    The equations are derived and compiled once per topology in this process. The workers only get the generated
+    source code of the kernels (see parallel.run_jobs()).
+
+    :param list_of_models: list of systems, each like the list_of_object_lists of run_simulation()
+    :type list_of_models: list
+    :param simulation_points: Number of points to simulate, default is 25001
+    :type simulation_points: int
+    :param method: integration method of solve_ivp() (see parallel.run_jobs()), default is "RK45"
+    :type method: str
+    :param max_workers: number of worker processes, default is None (number of processors)
+    :type max_workers: int or None
+    :param config: settings of the simulation (horizon, sampling, method, tolerances), replaces simulation_points
+                   and method, default is None (horizon of 10 s)
+    :type config: newton.SolverConfig
+    :return: Results of all simulations (in the order of the models) and system objects
+    :rtype: tuple of lists
+    """
+    if config is None:
+        config = newton.SolverConfig(t_span=(0, 10), num_points=simulation_points, method=method)
+
+    systems = []
+    kernels = []
+    jobs = []
+    for list_of_object_lists in list_of_models:
+        system = build_system(list_of_object_lists)
+        z0 = get_initial_conditions(list_of_object_lists[1])
+
+        # models with the same topology share one kernel
+        kernel, active = system.reduced_kernel()
+        index = next((i for i, entry in enumerate(kernels) if entry[0] is kernel), len(kernels))
+        if index == len(kernels):
+            kernels.append((kernel, active))
+        jobs.append((index, kernel.parameter_vector(system.param_values), z0, config))
+        systems.append(system)
+
+    start = time.time()
+    results = parallel.run_jobs(kernels, jobs, max_workers)
+    end = time.time()
+    print("Duration of", len(jobs), "parallel simulations: ", end - start, "s.")
+
+    return results, systems
+
+def run_monte_carlo(list_of_object_lists, distributions, num_samples, seed=None, simulation_points=25001, method="RK45",
+                    max_workers=None, config=None):
+    """
+    Runs a Monte Carlo simulation of the given system of masses and springs in parallel on a process pool.
+    The parameters (e.g. masses and stiffnesses) are perturbed randomly (see parallel.sample_parameters()).
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param distributions: relative perturbation of the parameters, e.g. {"k1": ("normal", 0, 0.05), "m2": ("uniform", -0.1, 0.1)}
+    :type distributions: dictionary
+    :param num_samples: number of samples
+    :type num_samples: int
+    :param seed: seed of the random number generator, default is None
+    :type seed: int or None
+    :param simulation_points: Number of points to simulate, default is 25001
+    :type simulation_points: int
+    :param method: integration method of solve_ivp() (see parallel.run_jobs()), default is "RK45"
+    :type method: str
+    :param max_workers: number of worker processes, default is None (number of processors)
+    :type max_workers: int or None
+    :param config: settings of the simulation (horizon, sampling, method, tolerances), replaces simulation_points
+                   and method, default is None (horizon of 10 s)
+    :type config: newton.SolverConfig
+    :return: Results of all samples, table of the sampled parameter values and system object
+    :rtype: tuple
+    """
+    if config is None:
+        config = newton.SolverConfig(t_span=(0, 10), num_points=simulation_points, method=method)
+
+    system = build_system(list_of_object_lists)
+    z0 = get_initial_conditions(list_of_object_lists[1])
+    param_sets, table = parallel.sample_parameters(system.param_values, distributions, num_samples, seed)
+
+    kernel, active = system.reduced_kernel()
+    jobs = [(0, kernel.parameter_vector(param_values), z0, config) for param_values in param_sets]
+
+    start = time.time()
+    results = parallel.run_jobs([(kernel, active)], jobs, max_workers)
+    end = time.time()
+    print("Duration of Monte Carlo simulation with", num_samples, "samples: ", end - start, "s.")
+
+    return results, table, system
+
+def run_modal_analysis(list_of_object_lists, num_modes=None):
+    """
+    Computes the natural frequencies and mode shapes of the given system of masses and springs without simulating it.
+    The system is linearized around its static equilibrium (only needed for cubic springs, linear systems are
+    independent of the point of linearization). Directions without springs (x direction) have no modes and are not
+    part of the eigenvalue problem.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param num_modes: number of lowest modes to compute, default is None (all modes).
+                      For large systems only these modes are computed by a sparse eigenvalue solver.
+    :type num_modes: int or None
+    :return: natural frequencies in (Hz), mode shapes (one column per mode, rows in the order of the coordinates
+             [x1, y1, x2, y2, ...]) and system object
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    system = build_system(list_of_object_lists)
+    n = 2 * len(list_of_mass)
+    q0 = get_initial_conditions(list_of_mass)[:n]
+
+    start = time.time()
+    q_eq = system.static_equilibrium(system.param_values, q0)
+    M, K = system.linearize(system.param_values, q_eq)
+
+    # only coordinates that are coupled by springs oscillate
+    coupled = K.getnnz(axis=1) > 0
+    frequencies, phi = modal.natural_frequencies(M[coupled][:, coupled], K[coupled][:, coupled], num_modes)
+    mode_shapes = zeros((n, phi.shape[1]))
+    mode_shapes[coupled] = phi
+    end = time.time()
+    print("Duration of modal analysis: ", end - start, "s.")
+
+    return frequencies, mode_shapes, system
+
+def set_initial_conditions(list_of_object_lists, positions, velocities):
+    """
+    Sets the initial conditions of the masses and of the springs between them. Every spring keeps the masses it is
+    connected to (see objects.Spring.setInitialConditions()), so branched or looped systems keep their topology.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param positions: positions [x, y] of the masses in (m)
+    :type positions: list of lists
+    :param velocities: velocities [x_dot, y_dot] of the masses in (m/s)
+    :type velocities: list of lists
+    """
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    for mass, position, velocity in zip(list_of_mass, positions, velocities):
+        mass.setInitialConditions(list(position), list(velocity))
+
+    for spring in list_of_springs:
+        spring.setInitialConditions(spring.top_mass, spring.bottom_mass, [0, 0])
+
+def run_static_equilibrium(list_of_object_lists, set_equilibrium=False):
+    """
+    Computes the rest positions of the masses under gravity and external forces without simulating the system.
+    The equations "all accelerations = 0" are solved with the Newton-Raphson method and the analytic stiffness
+    matrix (see newton.Mechanics.static_equilibrium()). Directions without springs (x direction) keep their
+    initial position.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects
+    :type list_of_object_lists: list of lists of objects
+    :param set_equilibrium: set the rest positions (and zero velocities) as initial conditions of the masses and
+                            springs, so the simulation starts at the equilibrium, default is False
+    :type set_equilibrium: bool
+    :return: rest positions [x, y] of the masses, prestretches of the springs at the equilibrium in (m)
+             and system object
+    :rtype: tuple
+    """
+
+    list_of_springs, list_of_mass = list_of_object_lists
+
+    system = build_system(list_of_object_lists)
+    n = 2 * len(list_of_mass)
+    q0 = get_initial_conditions(list_of_mass)[:n]
+
+    start = time.time()
+    q_eq = system.static_equilibrium(system.param_values, q0)
+    end = time.time()
+    print("Duration of static equilibrium: ", end - start, "s.")
+
+    # - sign because the coordinate system (COS) of the simulation is inverted to the COS of the animation
+    positions = [[float(-q_eq[2*i]), float(-q_eq[2*i+1])] for i in range(len(list_of_mass))]
+
+    # the springs compute their prestretch from the positions of the masses
+    initial_positions = [mass.position for mass in list_of_mass]
+    initial_velocities = [mass.velocity for mass in list_of_mass]
+    set_initial_conditions(list_of_object_lists, positions, [[0, 0] for _ in list_of_mass])
+    prestretches = [float(spring.prestretch) for spring in list_of_springs]
+    if not set_equilibrium:
+        set_initial_conditions(list_of_object_lists, initial_positions, initial_velocities)
+
+    return positions, prestretches, system
+
+def save_created_system(name, res, system, config=None):
     """
     Saves the simulation results and system parameters to a NetCDF file with a given name.
 
@@ -193,28 +594,106 @@ def save_created_system(name, res, system):
     :type res: scipy.integrate.OdeSolution
     :param system: System object containing simulation parameters and equations
     :type system: Newton object
+    :param config: settings of the simulation, default is None (not saved)
+    :type config: newton.SolverConfig
     """
     savepath = os.path.dirname(os.path.realpath(__file__))+"\data\\"+ name
-    save_system(savepath, res, system)
+    save_system(savepath, res, system, config=config)
 
-def load_list(savepath):
+def objects_from_tables(elements, init_state):
     """
-    Loads a system configuration and initial conditions from a saved file, reconstructing Masspoint, Steady Body, and Spring objects for animation.
+    Reconstructs the Masspoint, Steady Body, and Spring objects from the element tables of a saved file
+    (see simsave.save_model()). The springs are connected to the masses of the tables.
+
+    :param elements: element tables (see simsave.load_model())
+    :type elements: dictionary
+    :param init_state: initial state of the simulation [x1, y1, x2, y2, ..., x1_dot, y1_dot, x2_dot, y2_dot, ...]
+    :type init_state: numpy.ndarray
+    :return: List containing reconstructed Spring and Mass objects
+    :rtype: list of lists of objects
+    """
+    num_mass = len(elements['mass'])
+
+    list_of_mass = []
+    for i in range(num_mass):
+        if elements['mass_type'][i] == "steady body":
+            m = objects.SteadyBody(x_dim=float(elements['x_dim'][i]), y_dim=float(elements['y_dim'][i]),
+                                   z_dim=float(elements['z_dim'][i]), density=float(elements['density'][i]),
+                                   index=int(elements['mass_index'][i]),
+                                   external_force=float(elements['external_force'][i]))
+        else:
+            m = objects.Masspoint(mass=float(elements['mass'][i]), index=int(elements['mass_index'][i]),
+                                  external_force=float(elements['external_force'][i]))
+
+        # - sign because the coordinate system (COS) of the simulation is inverted to the COS of the animation
+        m.setInitialConditions([-float(init_state[2 * i]), -float(init_state[2 * i + 1])],
+                               [float(init_state[2 * (num_mass + i)]), float(init_state[2 * (num_mass + i) + 1])])
+        list_of_mass.append(m)
+
+    list_of_spring = []
+    for j in range(len(elements['stiffness'])):
+        s = objects.Spring(stiffness=float(elements['stiffness'][j]), rest_length=float(elements['rest_length'][j]),
+                           index=int(elements['spring_index'][j]), type=str(elements['spring_type'][j]))
+        top = int(elements['top'][j])
+        s.setInitialConditions(None if top < 0 else list_of_mass[top], list_of_mass[int(elements['bottom'][j])],
+                               [0, 0])
+        list_of_spring.append(s)
+
+    return [list_of_spring, list_of_mass]
+
+def parse_file(savepath):
+    """
+    Reads a saved file once for load_list() and load_sys(): the element tables or the symbolic system, the settings
+    and the initial state. The results are read lazily (see simsave.LazyResults). The parsed files are cached by
+    their path, modification time and size, so loading the same file again doesn't read and sympify it again.
+    The least recently used file is removed when more than LOADED_FILES_SIZE files are cached.
 
     :param savepath: path of the file to load
     :type savepath: str
+    :return: data loaded from file (see simsave.load_system()) and the initial state "init_state"
+    :rtype: dictionary
+    """
+    file_name = os.path.realpath(savepath if ".nc" in savepath else savepath + ".nc")
+    stat = os.stat(file_name)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    entry = loaded_files.get(file_name)
+    if entry is None or entry[0] != version:
+        data = load_system(file_name, lazy=True)
+        if data['results'].num_points == 0:
+            raise ValueError("The file has no results yet (the simulation is still running).")
+        data['init_state'] = data['results'].state(0)
+        entry = (version, data)
+        loaded_files[file_name] = entry
+    loaded_files.move_to_end(file_name)
+
+    while len(loaded_files) > LOADED_FILES_SIZE:
+        loaded_files.popitem(last=False)
+
+    return entry[1]
+
+def objects_from_file(data):
+    """
+    Reconstructs the Masspoint, Steady Body, and Spring objects of a parsed file (see parse_file()).
+    Files with element tables are reconstructed from the tables (see objects_from_tables()), older files from the
+    names of their parameters. New objects are created for every call, because the animation moves them.
+
+    :param data: parsed file
+    :type data: dictionary
     :return: List containing reconstructed Spring and Mass objects
     :rtype: list of lists of objects
     """
-    
-    loaded_sys = load_system(savepath)
+    init_state = data['init_state']
+
+    if data['elements'] is not None:
+        return objects_from_tables(data['elements'], init_state)
 
-    # load simulation results to get initial conditions
-    load_res = loaded_sys['results']
+    # initial conditions of the simulation results (one column per state)
+    load_res = init_state[:, None]
     res_pos = load_res[:int(len(load_res[:])/2)]
     res_vel = load_res[int(len(load_res[:])/2):]
 
-    loaded_params = loaded_sys['system']['param_values']
+    loaded_params = data['system']['param_values']
     params_keys = [str(key) for key in list(loaded_params.keys())]
 
     # find Masspoints, Steady Body and Spring to reconstruct the list_of_object_lists for animation
@@ -294,45 +773,100 @@ def load_list(savepath):
 
     return [list_of_spring, list_of_mass]
 
-def load_sys(savepath):
+def mechanics_from_file(system):
     """
-    Loads a system configuration and equations of motion from a saved file.
+    Sets up the system of a file without element tables from its saved symbolic properties.
+    The equations of motion are derived when they are needed.
 
-    :param savepath: path of the file to load
-    :type savepath: str
-    :return: LoadedSystem object containing time, results, and loaded system
-    :rtype: LoadedSystem
+    :param system: symbolic properties of the system (see simsave.load_system())
+    :type system: dictionary
+    :return: loaded system
+    :rtype: newton.Mechanics
     """
-
-    data = load_system(savepath)
-
-    # construct equations of motion with saved data
-    param_val = data['system']['param_values']
-    masses = data['system']['masses']
-    forces = data['system']['forces']
-    force_list = [f for f in forces]
-
-    # set up system with loaded data
     loaded_system = newton.Mechanics()
-    i = 0
-    for m in masses:
+    for m, force in zip(system['masses'], system['forces']):
         loaded_system.add_mass(m, mass=sp.symbols(m))
-        force = force_list[i]
         for f in force:
             loaded_system.add_force(m, f)
-        i += 1
+    loaded_system.param_values = system['param_values']
+
+    return loaded_system
+
+def system_from_file(data, lazy=False):
+    """
+    Creates the LoadedSystem of a parsed file (see parse_file()). The system is only built when it is used
+    (e.g. to show the equations, see additions.LoadedSystem.defer_system()).
+
+    :param data: parsed file
+    :type data: dictionary
+    :param lazy: read the results only when they are needed, default is False
+    :type lazy: bool
+    :return: LoadedSystem object containing time, results, and loaded system
+    :rtype: LoadedSystem
+    """
+    lazy_results = data['results']
 
-    loaded_system.param_values = param_val
-    equ = loaded_system.generate_equations()
-    loaded_system.substitute_parameters(equ, loaded_system.param_values)
+    # settings of the simulation (files saved without settings have no attributes)
+    solver_config = newton.SolverConfig.from_attributes(data['solver_config']) if data['solver_config'] else None
 
-    # load simulation data
-    t = data['time']
-    y = array(data['results'][:])
+    if lazy:
+        results = LoadedSystem(None, None, None, solver_config, lazy_results)
+    else:
+        results = LoadedSystem(lazy_results.t, lazy_results.y, None, solver_config)
+
+    if data['elements'] is not None:
+        list_of_object_lists = objects_from_tables(data['elements'], data['init_state'])
+        results.defer_system(lambda: build_system(list_of_object_lists))
+    else:
+        results.defer_system(lambda: mechanics_from_file(data['system']))
 
-    results = LoadedSystem(t, y, loaded_system)
     return results
 
+def load_model_file(savepath, lazy=False):
+    """
+    Loads the objects and the system of a saved file. The file is read once (see parse_file()) and both are built
+    from the same parsed data.
+
+    :param savepath: path of the file to load
+    :type savepath: str
+    :param lazy: read the results only when they are needed (see simsave.LazyResults), default is False
+    :type lazy: bool
+    :return: List containing reconstructed Spring and Mass objects and LoadedSystem object
+    :rtype: tuple
+    """
+    data = parse_file(savepath)
+
+    return objects_from_file(data), system_from_file(data, lazy)
+
+def load_list(savepath):
+    """
+    Loads a system configuration and initial conditions from a saved file, reconstructing Masspoint, Steady Body, and Spring objects for animation.
+    The file is parsed once and cached (see parse_file() and objects_from_file()).
+
+    :param savepath: path of the file to load
+    :type savepath: str
+    :return: List containing reconstructed Spring and Mass objects
+    :rtype: list of lists of objects
+    """
+    return objects_from_file(parse_file(savepath))
+
+def load_sys(savepath, lazy=False):
+    """
+    Loads a system configuration and equations of motion from a saved file.
+    The file is parsed once and cached (see parse_file() and system_from_file()). The system is only built when it
+    is used (e.g. to show the equations, see additions.LoadedSystem.defer_system()).
+    Lazy results are only read when they are used, e.g. a time window or the frames of an animation
+    (see additions.LoadedSystem.window() and simsave.LazyResults).
+
+    :param savepath: path of the file to load
+    :type savepath: str
+    :param lazy: read the results only when they are needed, default is False
+    :type lazy: bool
+    :return: LoadedSystem object containing time, results, and loaded system
+    :rtype: LoadedSystem
+    """
+    return system_from_file(parse_file(savepath), lazy)
+
 def plot_results(res,ax):
     """
     Plots the position of masses over time from the simulation results.
@@ -384,26 +918,23 @@ def main():
     1. Creates a list of objects representing masses and springs.
     2. Runs a simulation using the created objects.
     3. Saves the simulation results and system configuration.
-    4. Loads the system configuration and initial conditions from the saved file.
-    5. Loads the system equations and simulation data from the saved file.
-    6. Plots the positions of masses over time.
-    7. Generates LaTeX representation of equations of motion.
-    8. Displays an animation of the system.
+    4. Loads the system configuration, initial conditions, system equations and simulation data from the saved file.
+    5. Plots the positions of masses over time.
+    6. Generates LaTeX representation of equations of motion.
+    7. Displays an animation of the system.
     """
     # Run the simulation
     list_of_object_lists=create_objects()
-    res, system = run_simulation(list_of_object_lists, simulation_points=25001)
+    config = newton.SolverConfig(t_span=(0, 10), num_points=25001)
+    res, system = run_simulation(list_of_object_lists, config=config)
     
     #save system
     name = "test3"
-    save_created_system(name, res, system)
+    save_created_system(name, res, system, config)
 
-    # load list_of_object_lists with saved data
+    # load list_of_object_lists, system and simulation data with saved data (the file is read once)
     savepath = os.path.dirname(os.path.realpath(__file__)) + "\data\\" + name + ".nc"
-    loaded_list_of_object_lists = load_list(savepath)
-
-    # load system and simulation data
-    loaded_res = load_sys(savepath)
+    loaded_list_of_object_lists, loaded_res = load_model_file(savepath)
     loaded_system = loaded_res.loaded_system
 
     #plot results     
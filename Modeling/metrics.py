@@ -0,0 +1,207 @@
+import sys
+import json
+from time import perf_counter
+from contextlib import contextmanager
+
+
+# metrics of the runs that are currently measured (the innermost run is the last one, see RunMetrics.__enter__())
+active_metrics = []
+
+# statistics of the solver that are recorded for every run (see RunMetrics.record_solver())
+SOLVER_STATISTICS = ("nfev", "njev", "nlu", "accepted_steps", "rejected_steps")
+
+
+def peak_memory():
+    """
+    Function for getting the peak memory (largest resident set size) of the process up to now.
+
+    :return: peak memory in bytes, None if the platform doesn't report it
+    :rtype: int or None
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return int(counters.PeakWorkingSetSize)
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+@contextmanager
+def timed(name):
+    """
+    Context manager for timing a phase of the run that is currently measured (see RunMetrics).
+    The time of phases inside the phase is only added to the inner phases, so the times of all phases add up to the
+    duration of the run. Without a measured run nothing is timed.
+
+    :param name: name of the phase (e.g. "integration")
+    :type name: str
+    """
+    if not active_metrics:
+        yield
+        return
+
+    metrics = active_metrics[-1]
+    # time of the phases inside this phase
+    metrics.nested.append(0.0)
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        inner = metrics.nested.pop()
+        metrics.phases[name] = metrics.phases.get(name, 0.0) + elapsed - inner
+        if metrics.nested:
+            metrics.nested[-1] += elapsed
+
+
+def counted_solver(solver, steps):
+    """
+    Function for getting a solver of solve_ivp() that counts its steps.
+    The accepted steps are counted for every solver. The rejected steps are derived from the evaluations of the
+    right-hand side for the Runge-Kutta methods (every attempt of a step evaluates all stages). The other solvers
+    don't report their rejected steps, so they are None.
+
+    :param solver: solver class of solve_ivp() (e.g. scipy.integrate.RK45)
+    :type solver: class
+    :param steps: counters, "accepted_steps" and "rejected_steps" are set to the counts of the integration
+    :type steps: dictionary
+    :return: subclass of the solver that can be passed as method to solve_ivp()
+    :rtype: class
+    """
+    stages = getattr(solver, "n_stages", None)
+    steps["accepted_steps"] = 0
+    steps["rejected_steps"] = 0 if stages else None
+
+    class CountedSolver(solver):
+        """
+        Solver that counts its accepted and rejected steps
+        """
+
+        def _step_impl(self):
+            nfev = self.nfev
+            success, message = super()._step_impl()
+            if success:
+                steps["accepted_steps"] += 1
+            if stages:
+                steps["rejected_steps"] += (self.nfev - nfev) // stages - success
+            return success, message
+
+    CountedSolver.__name__ = solver.__name__
+
+    return CountedSolver
+
+
+class RunMetrics:
+    """
+    Class for the metrics of a simulation run: the time of every phase (e.g. force assembly, generate_equations,
+    substitute_parameters, lambdify, integration, saving and latex), the statistics of the solver and the peak memory.
+    The phases are measured while the metrics are active (with-statement), so phases after the simulation
+    (e.g. saving) can be added to the metrics of the run later.
+
+    :ivar phases: time of every phase in seconds (without the time of the phases inside it, see timed())
+    :vartype phases: dictionary
+    :ivar total: time while the metrics were active in seconds
+    :vartype total: float
+    :ivar solver: statistics of the solver (see SOLVER_STATISTICS) and method, None if a value isn't available
+    :vartype solver: dictionary
+    :ivar peak_memory: peak memory of the process in bytes when the metrics were active the last time
+    :vartype peak_memory: int or None
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.total = 0.0
+        self.solver = {}
+        self.peak_memory = None
+        self.nested = []
+        self.start = None
+
+    def __enter__(self):
+        active_metrics.append(self)
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.total += perf_counter() - self.start
+        active_metrics.remove(self)
+        self.peak_memory = peak_memory()
+        return False
+
+    def record_solver(self, res, method=None):
+        """
+        Method for recording the statistics of the solver from a simulation result.
+
+        :param res: Result of simulation (see newton.Mechanics.simulate())
+        :type res: scipy.integrate.OdeSolution or newton.DenseResult
+        :param method: integration method, used if the result doesn't have the method that was used
+                       (e.g. the method that "auto" chose), default is None
+        :type method: str or None
+        """
+        for key in SOLVER_STATISTICS:
+            value = getattr(res, key, None)
+            self.solver[key] = None if value is None else int(value)
+        self.solver["method"] = getattr(res, "method", None) or method
+
+    def as_dict(self):
+        """
+        Method for getting the metrics as a dictionary (e.g. to compare runs).
+
+        :return: phases, total time, solver statistics and peak memory
+        :rtype: dictionary
+        """
+        return {"phases": dict(self.phases), "total": self.total, "solver": dict(self.solver),
+                "peak_memory": self.peak_memory}
+
+    def to_json(self):
+        """
+        Method for getting the metrics in JSON format.
+
+        :return: metrics as JSON object (see as_dict())
+        :rtype: str
+        """
+        return json.dumps(self.as_dict())
+
+    def log(self, file_name):
+        """
+        Method for appending the metrics to a log file with one JSON object per line.
+
+        :param file_name: name of the log file
+        :type file_name: str
+        """
+        with open(file_name, "a") as file:
+            file.write(self.to_json() + "\n")
+
+    def summary(self):
+        """
+        Method for getting a readable summary of the metrics (e.g. to show them in the GUI).
+
+        :return: one line per phase, statistic and the peak memory
+        :rtype: str
+        """
+        lines = [f"{name}: {duration:.3f} s" for name, duration in self.phases.items()]
+        lines.append(f"total: {self.total:.3f} s")
+        lines += [f"{key}: {value}" for key, value in self.solver.items() if value is not None]
+        if self.peak_memory is not None:
+            lines.append(f"peak memory: {self.peak_memory / 2 ** 20:.1f} MB")
+
+        return "\n".join(lines)
@@ -0,0 +1,221 @@
+from numpy import zeros, empty, outer, cos, sin, sqrt, asarray, flatnonzero, argsort, clip, diag, pi, eye, dot, \
+    atleast_1d, ndim
+from scipy.linalg import eigh, expm
+from scipy.sparse import csc_matrix, issparse
+from scipy.sparse.linalg import eigsh
+
+
+def modal_solution(M, K, f, init_cond, t0=0.0):
+    """
+    Method for computing the solution of a linear system M*q_ddot + K*q = f in closed form.
+    The system is decoupled by the generalized eigenvalue problem K*phi = omega^2*M*phi. Every mode is an independent
+    oscillator with a constant load, so its solution is known analytically at every time.
+    Coordinates without stiffness coupling (e.g. directions in which no spring acts) are moved with constant
+    acceleration f/m and are not part of the eigenvalue problem.
+    The eigenvalue problem is solved once, the returned function only evaluates the modes at the given times.
+
+    :param M: mass matrix (diagonal)
+    :type M: numpy.ndarray
+    :param K: stiffness matrix
+    :type K: numpy.ndarray
+    :param f: constant force vector (gravitation, external forces, prestress of the springs)
+    :type f: numpy.ndarray
+    :param init_cond: initial state [q0, v0] in the order of the coordinates
+    :type init_cond: list
+    :param t0: time of the initial state, default is 0
+    :type t0: float
+    :return: function that returns the state [q, v] at a time (shape: number of states) or at an array of times
+             (shape: number of states x number of time points)
+    :rtype: function
+    """
+    n = len(f)
+    z0 = asarray(init_cond, dtype=float)
+    q0 = z0[:n]
+    v0 = z0[n:]
+
+    # coordinates without any stiffness coupling: q = q0 + v0*t + a*t^2/2
+    coupled = (K != 0).any(axis=0) | (K != 0).any(axis=1)
+    free = flatnonzero(~coupled)
+    acc = f[free] / diag(M)[free]
+
+    idx = flatnonzero(coupled)
+    if len(idx):
+        # eigenvalues (omega^2) and mass normalized mode shapes (phi^T*M*phi = I)
+        omega_sq, phi = eigh(K[idx][:, idx], M[idx][:, idx])
+        tol = 1e-9 * abs(omega_sq).max()
+        if omega_sq.min() < -tol:
+            raise ValueError("The linear system is unstable (negative stiffness), there is no oscillating solution.")
+
+        # transform initial conditions and load into modal coordinates
+        M_phi = M[idx][:, idx] @ phi
+        eta0 = M_phi.T @ q0[idx]
+        eta_dot0 = M_phi.T @ v0[idx]
+        g = phi.T @ f[idx]
+
+        # every elastic mode oscillates around its static deflection g/omega^2
+        elastic = omega_sq > tol
+        rigid = ~elastic
+        omega = sqrt(omega_sq[elastic])
+        static = g[elastic] / omega**2
+        amplitude = eta0[elastic] - static
+
+    def solution(t_eval):
+        """
+        State of the system at the given times
+
+        :param t_eval: time or times
+        :type t_eval: float or numpy.ndarray
+        :return: state at the given times
+        :rtype: numpy.ndarray
+        """
+        t = atleast_1d(asarray(t_eval, dtype=float)) - t0
+        y = zeros((2 * n, len(t)))
+
+        y[free] = q0[free, None] + outer(v0[free], t) + outer(acc, t**2 / 2)
+        y[n + free] = v0[free, None] + outer(acc, t)
+
+        if len(idx):
+            wt = outer(omega, t)
+            cos_wt = cos(wt)
+            sin_wt = sin(wt)
+            eta = empty((len(idx), len(t)))
+            eta_dot = empty((len(idx), len(t)))
+            eta[elastic] = static[:, None] + amplitude[:, None] * cos_wt + (eta_dot0[elastic] / omega)[:, None] * sin_wt
+            eta_dot[elastic] = -(amplitude * omega)[:, None] * sin_wt + eta_dot0[elastic, None] * cos_wt
+
+            # rigid body modes (e.g. a chain that is not attached to the origin) move with constant acceleration
+            eta[rigid] = eta0[rigid, None] + outer(eta_dot0[rigid], t) + outer(g[rigid], t**2 / 2)
+            eta_dot[rigid] = eta_dot0[rigid, None] + outer(g[rigid], t)
+
+            # transform back to the coordinates of the masses
+            y[idx] = phi @ eta
+            y[n + idx] = phi @ eta_dot
+
+        return y if ndim(t_eval) else y[:, 0]
+
+    return solution
+
+
+def modal_response(M, K, f, init_cond, t_eval):
+    """
+    Method for computing the response of a linear system M*q_ddot + K*q = f in closed form at the given time points
+    (see modal_solution()). The initial state belongs to the first time point.
+
+    :param M: mass matrix (diagonal)
+    :type M: numpy.ndarray
+    :param K: stiffness matrix
+    :type K: numpy.ndarray
+    :param f: constant force vector (gravitation, external forces, prestress of the springs)
+    :type f: numpy.ndarray
+    :param init_cond: initial state [q0, v0] in the order of the coordinates
+    :type init_cond: list
+    :param t_eval: time points where the solution is computed
+    :type t_eval: numpy.ndarray
+    :return: state [q, v] at every time point (shape: number of states x number of time points)
+    :rtype: numpy.ndarray
+    """
+    return modal_solution(M, K, f, init_cond, t_eval[0])(t_eval)
+
+
+def discrete_propagator(M, K, f, dt):
+    """
+    Method for computing the exact discrete-time propagator of a linear system M*q_ddot + K*q = f.
+    The first order system z_dot = A*z + b with z = [q, v] has the exact solution z(t + dt) = Phi*z(t) + gamma
+    with the transition matrix Phi = exp(A*dt) and the constant term gamma = integral of exp(A*s)*b from 0 to dt.
+    Both are computed with one matrix exponential of the augmented matrix [[A, b], [0, 0]].
+
+    :param M: mass matrix (diagonal)
+    :type M: numpy.ndarray
+    :param K: stiffness matrix
+    :type K: numpy.ndarray
+    :param f: constant force vector (gravitation, external forces, prestress of the springs)
+    :type f: numpy.ndarray
+    :param dt: time step in (s)
+    :type dt: float
+    :return: transition matrix Phi and constant term gamma
+    :rtype: tuple of numpy.ndarray
+    """
+    n = len(f)
+    m_inv = 1 / diag(M)
+
+    augmented = zeros((2 * n + 1, 2 * n + 1))
+    augmented[:n, n:2 * n] = eye(n)
+    augmented[n:2 * n, :n] = -m_inv[:, None] * K
+    augmented[n:2 * n, 2 * n] = m_inv * f
+
+    E = expm(augmented * dt)
+
+    return E[:2 * n, :2 * n], E[:2 * n, 2 * n]
+
+
+def propagate(Phi, gamma, z0, num_points):
+    """
+    Method for computing the states of a linear system on a uniform time grid with its discrete-time propagator
+    (see discrete_propagator()). Every step is one matrix product z_k+1 = Phi*z_k + gamma. Many initial conditions
+    (one column of z0 per variant) are propagated together with one matrix product per step.
+
+    :param Phi: transition matrix
+    :type Phi: numpy.ndarray
+    :param gamma: constant term
+    :type gamma: numpy.ndarray
+    :param z0: initial state [q0, v0] (one column per variant for many initial conditions)
+    :type z0: numpy.ndarray
+    :param num_points: number of time points (including the initial state)
+    :type num_points: int
+    :return: state at every time point (shape: number of states x number of time points, or number of states x
+             number of variants x number of time points)
+    :rtype: numpy.ndarray
+    """
+    z0 = asarray(z0, dtype=float)
+    gamma = gamma.reshape((-1,) + (1,) * (z0.ndim - 1))
+
+    # the time is the first axis, so every step writes one contiguous block
+    y = empty((num_points,) + z0.shape)
+    y[0] = z0
+    for k in range(num_points - 1):
+        dot(Phi, y[k], out=y[k + 1])
+        y[k + 1] += gamma
+
+    return y.transpose(tuple(range(1, z0.ndim + 1)) + (0,))
+
+
+def natural_frequencies(M, K, num_modes=None, dense_limit=500):
+    """
+    Method for computing the natural frequencies and mode shapes of the linear(ized) system M*q_ddot + K*q = 0.
+    Small systems (or if all modes are requested) are solved with the dense eigenvalue solver.
+    For large systems only the lowest modes are computed with a sparse eigenvalue solver (shift-invert Lanczos),
+    so the full eigenvalue problem is never formed.
+
+    :param M: mass matrix (dense or sparse)
+    :type M: numpy.ndarray or scipy.sparse matrix
+    :param K: stiffness matrix (dense or sparse)
+    :type K: numpy.ndarray or scipy.sparse matrix
+    :param num_modes: number of (lowest) modes to compute, default is None (all modes)
+    :type num_modes: int or None
+    :param dense_limit: maximum size of the system for which the dense solver is used
+    :type dense_limit: int
+    :return: natural frequencies in (Hz) in ascending order and mass normalized mode shapes (one column per mode)
+    :rtype: tuple of numpy.ndarray
+    """
+    n = K.shape[0]
+    if num_modes is None or num_modes >= n - 1 or n <= dense_limit:
+        K = K.toarray() if issparse(K) else K
+        M = M.toarray() if issparse(M) else M
+        omega_sq, phi = eigh(K, M)
+        omega_sq = omega_sq[:num_modes]
+        phi = phi[:, :num_modes]
+    else:
+        K = csc_matrix(K)
+        M = csc_matrix(M)
+
+        # small negative shift, so K - sigma*M can be factorized even if there are rigid body modes (omega = 0)
+        sigma = -1e-6 * (K.diagonal() / M.diagonal()).max()
+        omega_sq, phi = eigsh(K, k=num_modes, M=M, sigma=sigma, which='LM')
+        order = argsort(omega_sq)
+        omega_sq = omega_sq[order]
+        phi = phi[:, order]
+
+    # rounding errors can lead to tiny negative values for rigid body modes
+    frequencies = sqrt(clip(omega_sq, 0, None)) / (2 * pi)
+
+    return frequencies, phi
@@ -0,0 +1,198 @@
+from scipy.sparse import csr_matrix, diags, bmat
+from numpy import array, ones, empty, arange, concatenate, where
+from integrators import SYMPLECTIC_METHODS
+from newton import solver_options, solve_states, solve_symplectic
+
+
+class SpringNetwork:
+    """
+    Class for the numeric model of a system of masses and springs that doesn't use sympy.
+    The masses and springs are stored as arrays (masses, external forces, half heights of the steady bodies,
+    connected masses, stiffness, rest lengths and types of the springs), so the forces of all springs are computed
+    in one vectorized pass. The springs act in y direction, so only the y coordinates are integrated and the
+    x coordinates move with their constant initial velocity.
+    The equations of motion are the same as the ones of the symbolic model (main_modeling.build_system()),
+    which is only needed to show or save the equations.
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects (with initial conditions)
+    :type list_of_object_lists: list of lists of objects
+    :param g: gravitational acceleration in (m/s^2), default is 9.81
+    :type g: float
+
+    :ivar mass: masses in (kg)
+    :vartype mass: numpy.ndarray
+    :ivar external_force: external forces acting on the masses in (N)
+    :vartype external_force: numpy.ndarray
+    :ivar half_height: half heights of the masses in (m) (zero for mass points)
+    :vartype half_height: numpy.ndarray
+    :ivar top: index of the mass at the start point of every spring (-1 for the origin)
+    :vartype top: numpy.ndarray
+    :ivar bottom: index of the mass at the end point of every spring
+    :vartype bottom: numpy.ndarray
+    :ivar stiffness: stiffness of the springs in (N/m) or (N/m^3)
+    :vartype stiffness: numpy.ndarray
+    :ivar rest_length: rest lengths of the springs in (m)
+    :vartype rest_length: numpy.ndarray
+    :ivar cubic: True for cubic springs, False for linear springs
+    :vartype cubic: numpy.ndarray
+    :ivar incidence: incidence matrix (masses x springs), +1 if the spring is below the mass, -1 if it is above
+    :vartype incidence: scipy.sparse.csr_matrix
+    :ivar extension: derivative of the extensions of the springs with respect to the y coordinates (springs x masses)
+    :vartype extension: scipy.sparse.csr_matrix
+    """
+
+    def __init__(self, list_of_object_lists, g=9.81):
+        list_of_springs, list_of_mass = list_of_object_lists
+        num_mass = len(list_of_mass)
+        num_springs = len(list_of_springs)
+
+        self.g = g
+        self.mass = array([mass.mass for mass in list_of_mass], dtype=float)
+        self.external_force = array([mass.external_force for mass in list_of_mass], dtype=float)
+        self.half_height = array([mass.y_dim / 2 if mass.type == "steady body" else 0 for mass in list_of_mass],
+                                 dtype=float)
+
+        # index of the masses connected by every spring (see objects.Spring.setInitialConditions())
+        mass_index = {id(mass): i for i, mass in enumerate(list_of_mass)}
+        self.top = array([-1 if spring.top_mass is None else mass_index[id(spring.top_mass)]
+                          for spring in list_of_springs], dtype=int)
+        self.bottom = array([mass_index[id(spring.bottom_mass)] for spring in list_of_springs], dtype=int)
+        self.stiffness = array([spring.stiffness for spring in list_of_springs], dtype=float)
+        self.rest_length = array([spring.rest_length for spring in list_of_springs], dtype=float)
+        self.cubic = array([spring.type == "cubic" for spring in list_of_springs], dtype=bool)
+
+        # extension = y_bottom - h_bottom - (y_top + h_top) - rest length
+        connected = self.top >= 0
+        rows = concatenate((arange(num_springs), arange(num_springs)[connected]))
+        cols = concatenate((self.bottom, self.top[connected]))
+        data = concatenate((ones(num_springs), -ones(connected.sum())))
+        self.extension = csr_matrix((data, (rows, cols)), shape=(num_springs, num_mass))
+
+        # the springs pull the top mass down (+) and the bottom mass up (-)
+        self.incidence = (-self.extension.T).tocsr()
+        self.offset = self.half_height[self.bottom] + where(connected, self.half_height[self.top], 0) \
+            + self.rest_length
+
+    def spring_forces(self, y):
+        """
+        Method for computing the forces of all springs.
+
+        :param y: y coordinates of the masses (coordinate system of the simulation)
+        :type y: numpy.ndarray
+        :return: forces of the springs in (N)
+        :rtype: numpy.ndarray
+        """
+        stretch = self.extension @ y - self.offset
+
+        return self.stiffness * where(self.cubic, stretch ** 3, stretch)
+
+    def accelerations(self, y):
+        """
+        Method for computing the accelerations of the masses in y direction (gravity, external forces and springs).
+
+        :param y: y coordinates of the masses (coordinate system of the simulation)
+        :type y: numpy.ndarray
+        :return: accelerations in (m/s^2)
+        :rtype: numpy.ndarray
+        """
+        return (self.mass * self.g + self.external_force + self.incidence @ self.spring_forces(y)) / self.mass
+
+    def rhs(self):
+        """
+        Method for getting the first order system of the y coordinates u_dot = [y_dot, a(y)].
+
+        :return: function f(t, u) that returns the time derivative of the state u = [y, y_dot]
+        :rtype: function
+        """
+        n = len(self.mass)
+
+        def sim_fun(t, u):
+            """
+            First order system
+
+            :param t: time variable
+            :type t: float
+            :param u: y coordinates and velocities of the masses
+            :type u: numpy.ndarray
+            :return: time derivative of the state
+            :rtype: numpy.ndarray
+            """
+            du = empty(2 * n)
+            du[:n] = u[n:]
+            du[n:] = self.accelerations(u[:n])
+            return du
+
+        return sim_fun
+
+    def jacobian(self, dense=False):
+        """
+        Method for getting the sparse Jacobian of the first order system of the y coordinates.
+        The derivative of the accelerations is M^-1 * B * diag(dF/ds) * D with the incidence matrix B and the
+        derivatives D of the extensions s of the springs.
+
+        :param dense: return the Jacobian as a dense array (e.g. for "LSODA"), default is False
+        :type dense: bool
+        :return: function J(t, u) that returns the Jacobian matrix at the state u = [y, y_dot]
+        :rtype: function
+        """
+        n = len(self.mass)
+        scale = diags(1 / self.mass) @ self.incidence
+
+        def jac(t, u):
+            """
+            Jacobian of the first order system
+
+            :param t: time variable
+            :type t: float
+            :param u: y coordinates and velocities of the masses
+            :type u: numpy.ndarray
+            :return: Jacobian matrix
+            :rtype: scipy.sparse.csr_matrix or numpy.ndarray
+            """
+            stretch = self.extension @ u[:n] - self.offset
+            slope = self.stiffness * where(self.cubic, 3 * stretch ** 2, 1)
+            A = scale @ diags(slope) @ self.extension
+            J = bmat([[None, diags(ones(n))], [A, None]], format="csr")
+
+            return J.toarray() if dense else J
+
+        return jac
+
+    def simulate(self, init_cond, t_span, num_points=25001, method="RK45", max_step=None, dense=False, rtol=1e-6,
+                 atol=1e-6):
+        """
+        Method to simulate (integrate) the system like newton.Mechanics.simulate() without symbolic equations.
+        The implicit methods "Radau", "BDF" and "LSODA" get the analytic Jacobian, the fixed step symplectic methods
+        "Verlet", "Yoshida4" and "Yoshida6" integrate on the output grid. The result has the full state.
+
+        :param init_cond: initial conditions [x1, y1, x2, y2, ..., x1_dot, y1_dot, x2_dot, y2_dot, ...]
+        :type init_cond: list
+        :param t_span: Interval of integration (start time and end time)
+        :type t_span: tuple
+        :param num_points: number of time steps for numerical integration (default 25001)
+        :type num_points: int
+        :param method: integration method of solve_ivp(), "Verlet", "Yoshida4" or "Yoshida6" (default "RK45")
+        :type method: str
+        :param max_step: maximum step size of the integration, default is None (no limit)
+        :type max_step: float or None
+        :param dense: return a DenseResult instead of the solution on the time grid, default is False
+        :type dense: bool
+        :param rtol: relative tolerance of the integration (default 1e-6)
+        :type rtol: float
+        :param atol: absolute tolerance of the integration, a value for all states or one value per state (default 1e-6)
+        :type atol: float or list
+        :return: See documentation of solve_ivp()
+        :rtype: scipy.integrate.OdeSolution or newton.DenseResult
+        """
+        if method in ("modal", "propagator", "auto"):
+            raise ValueError(f'Method "{method}" needs the symbolic equations (see newton.Mechanics.simulate()).')
+
+        n = len(self.mass)
+        # integrated states: y coordinates and y velocities
+        states = concatenate((arange(1, 2 * n, 2), 2 * n + arange(1, 2 * n, 2)))
+
+        if method in SYMPLECTIC_METHODS:
+            return solve_symplectic(self.accelerations, init_cond, states, t_span, num_points, method, max_step, dense)
+
+        options = solver_options(method, states, rtol, atol, max_step, self.jacobian)
+        return solve_states(self.rhs(), init_cond, states, t_span, num_points, method, options, dense)
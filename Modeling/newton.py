@@ -1,7 +1,270 @@
-from sympy import Function, Eq, symbols, lambdify
-from scipy.integrate import solve_ivp
-from numpy import linspace, concatenate
+from sympy import Function, Derivative, Eq, symbols, lambdify, sympify, expand, Basic
+from sympy.core.function import AppliedUndef
+from scipy.integrate import solve_ivp, RK23, RK45, DOP853, Radau, BDF, LSODA
+from scipy.optimize import OptimizeResult
+from scipy.sparse import csr_matrix, diags, issparse
+from scipy.sparse.linalg import spsolve, MatrixRankWarning
+from numpy import linspace, empty, zeros, asarray, diag, array, arange, concatenate, flatnonzero, setdiff1d, \
+    ndim, minimum, searchsorted, ones, column_stack, repeat, broadcast_arrays, ix_, isfinite
+from numpy.linalg import eigvals, norm
 from re import search
+from inspect import getsource
+import linecache
+import hashlib
+from warnings import catch_warnings, simplefilter
+from modal import modal_solution, discrete_propagator, propagate
+from integrators import integrate_symplectic, composition_weights, SYMPLECTIC_METHODS
+from caching import topology_cache
+from metrics import timed, counted_solver
+
+
+# solvers of solve_ivp() that can be stepped directly
+SOLVERS = {"RK23": RK23, "RK45": RK45, "DOP853": DOP853, "Radau": Radau, "BDF": BDF, "LSODA": LSODA}
+
+# solvers of solve_ivp() that use the Jacobian of the system
+IMPLICIT_METHODS = ("Radau", "BDF", "LSODA")
+
+# number of functions compiled by compile_source()
+compiled_sources = 0
+
+# number of states above which no dense matrices are created (dense eigenvalues, dense Jacobian of LSODA)
+DENSE_LIMIT = 2000
+
+
+def cached_kernel(eq_rhs, coord, vel, masses):
+    """
+    Method for getting the kernel of the given equations from the cache (see Kernel), used for systems without a
+    topology key. The not substituted equations describe the topology (connections and spring types) of the system,
+    so their hash is used as key of the cache (see caching.KernelCache).
+
+    :param eq_rhs: right hand side of the (not substituted) equations of motion
+    :type eq_rhs: list of sympy.Add()
+    :param coord: coordinates of the equations
+    :type coord: list of sympy.Function
+    :param vel: velocities of the equations
+    :type vel: list of sympy.Derivative
+    :param masses: symbolic mass of every coordinate
+    :type masses: list of sympy.Symbol
+    :return: kernel of the equations
+    :rtype: Kernel
+    """
+    key = hashlib.sha256(str((eq_rhs, masses)).encode()).hexdigest()
+    entry = topology_cache.get(key)
+    if entry is None:
+        entry = (Kernel(eq_rhs, coord, vel, masses), arange(len(coord)))
+        topology_cache.put(key, entry)
+    elif entry[0].eq_rhs is None:
+        entry[0].equation_source = lambda: eq_rhs
+
+    return entry[0]
+
+
+def structural_laplacian(K):
+    """
+    Method for building the graph Laplacian of the coupling pattern of a stiffness matrix: -1 for every coupled pair
+    of coordinates, the diagonal makes the row sums 1. The matrix is positive definite and has the same sparsity
+    pattern as K, so it can be used to regularize K if the springs have no stiffness (e.g. cubic springs at their rest
+    length). The stored pattern of K is used, so entries that are zero at the current coordinates count as well.
+
+    :param K: sparse stiffness matrix
+    :type K: scipy.sparse.csr_matrix
+    :return: Laplacian of the coupling pattern
+    :rtype: scipy.sparse.csc_matrix
+    """
+    P = csr_matrix(K, copy=True)
+    P.data[:] = -1.0
+    P.setdiag(0)
+    P.eliminate_zeros()
+    return (P + diags(1.0 - asarray(P.sum(axis=1)).ravel())).tocsc()
+
+
+def expand_states(y, t, t0, init_cond, states):
+    """
+    Method for reconstructing the full state from the integrated states (see Mechanics.reduced_kernel()).
+    Coordinates that were not integrated move with their constant initial velocity.
+
+    :param y: integrated states at the time points t (shape: number of integrated states x number of time points,
+              or number of integrated states for a single time point)
+    :type y: numpy.ndarray
+    :param t: time points
+    :type t: float or numpy.ndarray
+    :param t0: initial time
+    :type t0: float
+    :param init_cond: full initial state [q0, v0]
+    :type init_cond: list
+    :param states: indices of the integrated states in the full state
+    :type states: numpy.ndarray
+    :return: full state at the time points t
+    :rtype: numpy.ndarray
+    """
+    z0 = asarray(init_cond, dtype=float)
+    if len(states) == len(z0):
+        return y
+
+    y = asarray(y)
+    half = len(z0) // 2
+    dead = setdiff1d(arange(half), states[:len(states) // 2])
+    dt = asarray(t, dtype=float) - t0
+
+    full = empty((len(z0),) + y.shape[1:])
+    full[states] = y
+    full[dead] = z0[dead].reshape((-1,) + (1,) * dt.ndim) + z0[half + dead].reshape((-1,) + (1,) * dt.ndim) * dt
+    full[half + dead] = z0[half + dead].reshape((-1,) + (1,) * dt.ndim)
+
+    return full
+
+
+def solver_options(method, states, rtol=1e-6, atol=1e-6, max_step=None, jacobian=None):
+    """
+    Method for creating the options of a solver of solve_ivp() for the integrated states of a system.
+    The implicit methods "Radau", "BDF" and "LSODA" get the analytic Jacobian (sparse for "BDF" and "Radau",
+    dense for "LSODA", which only accepts dense Jacobians).
+
+    :param method: integration method of solve_ivp()
+    :type method: str
+    :param states: indices of the integrated states in the full state
+    :type states: numpy.ndarray
+    :param rtol: relative tolerance of the integration (default 1e-6)
+    :type rtol: float
+    :param atol: absolute tolerance of the integration, a value for all states or one value per state of the full
+                 state (default 1e-6)
+    :type atol: float or list
+    :param max_step: maximum step size of the integration, default is None (no limit)
+    :type max_step: float or None
+    :param jacobian: function jacobian(dense) that returns the Jacobian J(t, z) of the integrated states,
+                     default is None (the solver approximates the Jacobian)
+    :type jacobian: function or None
+    :return: keyword arguments of solve_ivp()
+    :rtype: dict
+    """
+    options = {'rtol': rtol, 'atol': atol if ndim(atol) == 0 else asarray(atol, dtype=float)[states]}
+    if method in IMPLICIT_METHODS and jacobian is not None:
+        options['jac'] = jacobian(method == "LSODA")
+    if max_step is not None:
+        options['max_step'] = max_step
+
+    return options
+
+
+def solve_states(sim_fun, init_cond, states, t_span, num_points, method, options, dense=False):
+    """
+    Method to integrate the integrated states of a system with solve_ivp() and to build the result with the full
+    state (see expand_states()). Besides the statistics of solve_ivp() the result has the numbers of accepted and
+    rejected steps (accepted_steps and rejected_steps, see metrics.counted_solver()) and the method.
+
+    :param sim_fun: first order system f(t, z) of the integrated states
+    :type sim_fun: function
+    :param init_cond: full initial state [q0, v0]
+    :type init_cond: list
+    :param states: indices of the integrated states in the full state
+    :type states: numpy.ndarray
+    :param t_span: Interval of integration (start time and end time)
+    :type t_span: tuple
+    :param num_points: number of time points of the output
+    :type num_points: int
+    :param method: integration method of solve_ivp()
+    :type method: str
+    :param options: options of the solver (see solver_options())
+    :type options: dict
+    :param dense: return a DenseResult instead of the solution on the time grid, default is False
+    :type dense: bool
+    :return: See documentation of solve_ivp()
+    :rtype: scipy.integrate.OdeSolution or DenseResult
+    """
+    z0 = asarray(init_cond, dtype=float)[states]
+    # the solver counts its accepted and rejected steps
+    steps = {}
+    solver = counted_solver(SOLVERS[method], steps) if method in SOLVERS else method
+
+    if dense:
+        res = solve_ivp(sim_fun, t_span, z0, method=solver, dense_output=True, **options)
+
+        def solution(t):
+            """
+            Full state at the given times
+
+            :param t: time or times
+            :type t: float or numpy.ndarray
+            :return: state at the given times
+            :rtype: numpy.ndarray
+            """
+            return expand_states(res.sol(t), t, t_span[0], init_cond, states)
+
+        return DenseResult(solution, t_span, num_points, nfev=res.nfev, njev=res.njev, nlu=res.nlu,
+                           status=res.status, message=res.message, success=res.success, method=method, **steps)
+
+    # define the time points where the solution is computed
+    t_eval = linspace(t_span[0], t_span[1], num_points)
+
+    res = solve_ivp(sim_fun, t_span, z0, method=solver, t_eval=t_eval, **options)
+    res.y = expand_states(res.y, res.t, t_span[0], init_cond, states)
+    res.update(steps)
+    res.method = method
+
+    return res
+
+
+def solve_symplectic(acc, init_cond, states, t_span, num_points, method, max_step=None, dense=False):
+    """
+    Method to integrate the integrated states of a system with a fixed step symplectic method on the uniform output
+    grid (see integrators.integrate_symplectic()) and to build the result with the full state (see expand_states()).
+
+    :param acc: function a(q) that returns the accelerations of the integrated coordinates
+    :type acc: function
+    :param init_cond: full initial state [q0, v0]
+    :type init_cond: list
+    :param states: indices of the integrated states in the full state
+    :type states: numpy.ndarray
+    :param t_span: Interval of integration (start time and end time)
+    :type t_span: tuple
+    :param num_points: number of time points of the output
+    :type num_points: int
+    :param method: "Verlet", "Yoshida4" or "Yoshida6"
+    :type method: str
+    :param max_step: maximum step size, default is None (one step per output interval)
+    :type max_step: float or None
+    :param dense: must be False, the fixed step methods have no dense output
+    :type dense: bool
+    :return: solution on the time grid with the same fields as the result of solve_ivp()
+    :rtype: scipy.optimize.OptimizeResult
+    """
+    if dense:
+        raise ValueError(f'Method "{method}" has no dense output.')
+
+    t_eval = linspace(t_span[0], t_span[1], num_points)
+    order = SYMPLECTIC_METHODS[method]
+    y, nfev = integrate_symplectic(acc, asarray(init_cond, dtype=float)[states], t_eval, order, max_step)
+
+    # every step evaluates the accelerations once per velocity Verlet step of the composition
+    steps = (nfev - 1) // len(composition_weights(order))
+    return OptimizeResult(t=t_eval, y=expand_states(y, t_eval, t_span[0], init_cond, states), sol=None,
+                          t_events=None, y_events=None, nfev=nfev, njev=0, nlu=0, accepted_steps=steps,
+                          rejected_steps=0, status=0, message=f"Fixed step symplectic integration ({method}).",
+                          success=True, method=method)
+
+
+def compile_source(source):
+    """
+    Method for compiling the source code of a lambdified function (e.g. the source code of a pickled kernel).
+    The generated code uses numpy functions by their names, so it is executed in the numpy namespace.
+
+    :param source: source code generated by lambdify()
+    :type source: str
+    :return: compiled function
+    :rtype: function
+    """
+    # the source code is registered like lambdify() does it, so getsource() works for the compiled function again
+    # (e.g. to pickle a kernel that was unpickled before)
+    global compiled_sources
+    compiled_sources += 1
+    file_name = f"<compiled-source-{compiled_sources}>"
+    linecache.cache[file_name] = (len(source), None, source.splitlines(True), file_name)
+
+    namespace = {}
+    exec("from numpy import *", namespace)
+    exec(compile(source, file_name, "exec"), namespace)
+
+    return namespace['_lambdifygenerated']
 
 
 class Mechanics:
@@ -35,6 +298,12 @@ class Mechanics:
     :vartype param_values: dictionary
     :ivar t: time variable
     :vartype t: sympy.Symbols
+    :ivar topology: key of the topology of the system (see main_modeling.topology_key()), None if the kernel
+                    isn't cached by topology
+    :vartype topology: str or None
+    :ivar elements: Spring and Mass objects the system was built from (see main_modeling.build_system()), saved as
+                    element tables (see simsave.save_model()), None if the system wasn't built from objects
+    :vartype elements: list of lists of objects or None
     """
 
     def __init__(self):
@@ -42,10 +311,38 @@ class Mechanics:
         self.coordinates = {}
         self.velocities = {}
         self.accelerations = {}
-        self.forces = {}
+        self.applied_forces = {}
+        self.force_assembly = None
         self.constraints = {}
         self.param_values = {}
         self.t = symbols("t")
+        self.topology = None
+        self.elements = None
+
+    @property
+    def forces(self):
+        """
+        Forces acting on the masses. Deferred forces (see defer_forces()) are added when they are needed the first time.
+
+        :return: forces of every mass
+        :rtype: dictionary
+        """
+        if self.force_assembly is not None:
+            assembly, self.force_assembly = self.force_assembly, None
+            with timed("force assembly"):
+                assembly()
+
+        return self.applied_forces
+
+    def defer_forces(self, assembly):
+        """
+        Method for adding the forces only when they are needed (to show or save the equations or to derive the kernel).
+        If the kernel of the system's topology is cached, a simulation doesn't need the symbolic forces at all.
+
+        :param assembly: function without arguments that adds the forces to the system (see add_force())
+        :type assembly: function
+        """
+        self.force_assembly = assembly
 
     def add_mass(self, name, mass):
         """
@@ -67,10 +364,11 @@ class Mechanics:
         # define coordinates and their derivatives for x and y directions (2-dimensional)
         x = Function(f'x{name_int}')(self.t)
         y = Function(f'y{name_int}')(self.t)
-        xdot = x.diff(self.t)
-        ydot = y.diff(self.t)
-        xddot = x.diff(self.t, 2)
-        yddot = y.diff(self.t, 2)
+        # (evaluate=False: the derivatives of undefined functions can't be evaluated anyway, trying it is expensive)
+        xdot = Derivative(x, self.t, evaluate=False)
+        ydot = Derivative(y, self.t, evaluate=False)
+        xddot = Derivative(x, (self.t, 2), evaluate=False)
+        yddot = Derivative(y, (self.t, 2), evaluate=False)
 
         # save coordinates and derivatives in dictionary
         self.coordinates[name] = {'x': x, 'y': y}
@@ -88,9 +386,9 @@ class Mechanics:
         """
 
         # for first mass added to the system we need to initialize the list
-        if mass not in self.forces:
-            self.forces[mass] = []
-        self.forces[mass].append(force)
+        if mass not in self.applied_forces:
+            self.applied_forces[mass] = []
+        self.applied_forces[mass].append(force)
 
     def sum_of_force(self, name, dir):
         """
@@ -155,27 +453,28 @@ class Mechanics:
         :return: symbolic equations of motion
         :rtype: list of sympy.Add()
         """
+        with timed("generate_equations"):
+            equations = []
+            for name in self.parameters:
+                # current mass
+                m = self.parameters[name]['mass']
 
-        equations = []
-        for name in self.parameters:
-            # current mass
-            m = self.parameters[name]['mass']
-
-            # accelerations for x and y directions
-            xddot = self.accelerations[name]['x']
-            yddot = self.accelerations[name]['y']
+                # accelerations for x and y directions
+                xddot = self.accelerations[name]['x']
+                yddot = self.accelerations[name]['y']
 
-            # sum of forces in x and y directions (sum of all applied forces)
-            F_sum_x = self.sum_of_force(name, 'x')
-            F_sum_y = self.sum_of_force(name, 'y')
+                # sum of forces in x and y directions (sum of all applied forces)
+                F_sum_x = self.sum_of_force(name, 'x')
+                F_sum_y = self.sum_of_force(name, 'y')
 
-            # Newton's second law: F=ma <=> a=F/m
-            eq_x = Eq(xddot, F_sum_x / m)
-            eq_y = Eq(yddot, F_sum_y / m)
+                # Newton's second law: F=ma <=> a=F/m
+                # (evaluate=False: sympy can't decide if the equation is true anyway, trying it is expensive)
+                eq_x = Eq(xddot, F_sum_x / m, evaluate=False)
+                eq_y = Eq(yddot, F_sum_y / m, evaluate=False)
 
-            # alternately append equations regarding x and y direction
-            equations.append(eq_x)
-            equations.append(eq_y)
+                # alternately append equations regarding x and y direction
+                equations.append(eq_x)
+                equations.append(eq_y)
 
         return equations
 
@@ -190,7 +489,11 @@ class Mechanics:
         :return: equations with substituted parameters
         :rtype: list of sympy.Add()
         """
-        return [eq.subs(param) for eq in equations]
+        # xreplace substitutes all parameters in one tree traversal, subs() would traverse the tree once per parameter.
+        # Only symbolic keys can occur in the equations (e.g. the spring types are stored as strings).
+        with timed("substitute_parameters"):
+            rule = {key: sympify(value) for key, value in param.items() if isinstance(key, Basic)}
+            return [eq.xreplace(rule) for eq in equations]
 
     def rhs_of_equation(self, equations):
         """
@@ -203,9 +506,443 @@ class Mechanics:
         """
         return [eq.rhs for eq in equations]
 
-    def simulate(self, param_values, init_cond, t_span, num_points=25001):
+    def state_variables(self):
+        """
+        Method for collecting the coordinates and velocities of the system in the order of the state vector
+        [x1, y1, x2, y2, ..., x1_dot, y1_dot, x2_dot, y2_dot, ...]
+
+        :return: list of coordinates and list of velocities
+        :rtype: tuple of lists
+        """
+        # init lists for coordinates and velocities
+        coord = []
+        vel = []
+
+        # construct lists of coordinates and velocities
+        for name in self.parameters:
+            x = self.coordinates[name]['x']
+            y = self.coordinates[name]['y']
+            xdot = self.velocities[name]['x']
+            ydot = self.velocities[name]['y']
+            coord.extend([x, y])
+            vel.extend([xdot, ydot])
+
+        return coord, vel
+
+    def acceleration_rhs(self, param_values):
+        """
+        Method for computing the right hand side of the equations of motion with substituted parameters
+        (accelerations of the masses in the order of the coordinates)
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :return: right hand side of the substituted equations of motion
+        :rtype: list of sympy.Add()
+        """
+        # get the equations of motion, substitute the parameters and store the right hand side of the equation
+        eq = self.generate_equations()
+        sub_equations = self.substitute_parameters(eq, param_values)
+
+        return self.rhs_of_equation(sub_equations)
+
+    def kernel(self):
+        """
+        Method for getting the compiled numeric functions (kernel) of the equations of motion.
+        The kernel only depends on the topology of the system (which masses are connected by which type of spring),
+        but not on the parameter values. So it is cached per topology and reused when parameters are edited or the
+        same system is simulated again. If the system has a topology key, the kernel is cached by it like the reduced
+        kernel (see reduced_kernel()), so the equations of motion aren't generated again either. Otherwise only the
+        equations are generated, nothing is substituted or lambdified again.
+
+        :return: kernel of the system
+        :rtype: Kernel
+        """
+        if self.topology is not None:
+            entry = topology_cache.get(self.full_key())
+            if entry is not None:
+                kernel = entry[0]
+                if kernel.eq_rhs is None:
+                    # the equations are only derived if a function has to be compiled
+                    kernel.equation_source = lambda: self.rhs_of_equation(self.generate_equations())
+                return kernel
+
+        eq_rhs = self.rhs_of_equation(self.generate_equations())
+        coord, vel = self.state_variables()
+        masses = [self.parameters[name]['mass'] for name in self.parameters for _ in ('x', 'y')]
+
+        if self.topology is None:
+            return cached_kernel(eq_rhs, coord, vel, masses)
+
+        kernel = Kernel(eq_rhs, coord, vel, masses)
+        topology_cache.put(self.full_key(), (kernel, arange(len(coord))))
+
+        return kernel
+
+    def full_key(self):
+        """
+        Method for getting the cache key of the kernel of all coordinates (see kernel()). The key of the topology is
+        used for the reduced kernel (see reduced_kernel()).
+
+        :return: key of the kernel of all coordinates
+        :rtype: str
+        """
+        return f"{self.topology}-full"
+
+    def reduced_kernel(self):
+        """
+        Method for getting the kernel of the coordinates that have to be integrated.
+        A coordinate without any force (e.g. the x direction of a chain that only has forces in y direction) has an
+        identically zero acceleration. If no other equation depends on it, it moves with constant velocity and is
+        dropped from the integrated system (see expand_states()).
+
+        If the system has a topology key, the kernel is cached by it (see caching.KernelCache). Then the equations
+        aren't generated again, even after a restart of the app. They are only derived if a function of a stored
+        kernel wasn't compiled yet.
+
+        :return: kernel of the integrated coordinates and indices of these coordinates
+        :rtype: tuple
+        """
+        if self.topology is not None:
+            entry = topology_cache.get(self.topology)
+            if entry is not None:
+                kernel, active = entry
+                if kernel.eq_rhs is None:
+                    # the equations are only derived if a function has to be compiled
+                    kernel.equation_source = lambda: self.reduced_equations(active)
+                return entry
+
+        eq_rhs = self.rhs_of_equation(self.generate_equations())
+        coord, vel = self.state_variables()
+        masses = [self.parameters[name]['mass'] for name in self.parameters for _ in ('x', 'y')]
+
+        # coordinates (and velocities, which contain their coordinate) that appear in any equation
+        used = set().union(*(rhs.atoms(AppliedUndef) for rhs in eq_rhs))
+        active = [i for i, rhs in enumerate(eq_rhs) if rhs != 0 or coord[i] in used]
+
+        reduced = ([eq_rhs[i] for i in active], [coord[i] for i in active], [vel[i] for i in active],
+                   [masses[i] for i in active])
+        if self.topology is None:
+            return cached_kernel(*reduced), array(active, dtype=int)
+
+        entry = (Kernel(*reduced), array(active, dtype=int))
+        topology_cache.put(self.topology, entry)
+
+        return entry
+
+    def reduced_equations(self, active):
+        """
+        Method for getting the right hand sides of the equations of motion of the integrated coordinates.
+
+        :param active: indices of the integrated coordinates (see reduced_kernel())
+        :type active: numpy.ndarray
+        :return: right hand side of the (not substituted) equations of motion of these coordinates
+        :rtype: list of sympy.Add()
+        """
+        eq_rhs = self.rhs_of_equation(self.generate_equations())
+        return [eq_rhs[i] for i in active]
+
+    def store_kernel(self):
+        """
+        Method for storing the cached kernels of the system's topology with their compiled functions
+        (see caching.KernelCache.save()).
+        """
+        if self.topology is not None:
+            topology_cache.save(self.topology)
+            topology_cache.save(self.full_key())
+
+    def compile_rhs(self, param_values):
+        """
+        Method to compile the first order system into one numeric function (see Kernel.rhs()).
+        All right hand sides are lambdified together into a single function that takes the whole state vector,
+        so every solver step only needs one call of the generated code instead of one call per equation.
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :return: function f(t, z) that returns the time derivative of the state vector z
+        :rtype: function
+        """
+        kernel = self.kernel()
+        return kernel.rhs(kernel.parameter_vector(param_values))
+
+    def compile_jacobian(self, param_values, dense=False):
+        """
+        Method to compute the Jacobian of the first order system symbolically and compile it into one numeric function
+        (see Kernel.jacobian()).
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param dense: return the Jacobian as a dense array instead of a sparse matrix, default is False
+        :type dense: bool
+        :return: function J(t, z) that returns the Jacobian matrix of the first order system at the state z
+        :rtype: function
+        """
+        kernel = self.kernel()
+        return kernel.jacobian(kernel.parameter_vector(param_values), dense)
+
+    def is_linear(self):
+        """
+        Method for checking whether the equations of motion are linear in the coordinates without deriving them.
+        A system built from objects (see main_modeling.build_system()) is linear if all of its springs are linear.
+
+        :return: True if the system is linear, False if it has cubic springs, None if the system wasn't built from
+                 objects (the equations have to be checked, see linear_matrices())
+        :rtype: bool or None
+        """
+        if self.elements is None:
+            return None
+
+        return all(spring.type == "linear" for spring in self.elements[0])
+
+    def linear_matrices(self, param_values):
+        """
+        Method for extracting the mass matrix, the stiffness matrix and the constant force vector of a linear system.
+        If all springs are linear, the equations of motion can be written as M*q_ddot + K*q = f.
+        For systems built from objects the matrices are evaluated with the cached kernel (see reduced_kernel()):
+        K is the stiffness matrix (see Kernel.stiffness()) and f = M*a(0) the force at the origin, so nothing is
+        derived or substituted again. For other systems the coefficients are read from the expanded right hand sides
+        of the equations (q_ddot = -M^-1*K*q + M^-1*f).
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :return: mass matrix M, stiffness matrix K and force vector f
+        :rtype: tuple of numpy.ndarray
+        """
+        linear = self.is_linear()
+        if linear is False:
+            raise ValueError("The equations of motion are not linear in the coordinates (the system has cubic springs).")
+
+        M = diag(self.mass_vector(param_values))
+
+        if linear:
+            kernel, active = self.reduced_kernel()
+            p = kernel.parameter_vector(param_values)
+            q = zeros(len(active))
+
+            n = len(M)
+            K = zeros((n, n))
+            f = zeros(n)
+            # coordinates that aren't integrated have no stiffness and no force
+            K[ix_(active, active)] = kernel.stiffness(p)(q).toarray()
+            f[active] = M.diagonal()[active] * kernel.acceleration(p)(q)
+            self.store_kernel()
+
+            return M, K, f
+
+        eq_rhs = self.acceleration_rhs(param_values)
+        coord, vel = self.state_variables()
+        index = {c: i for i, c in enumerate(coord)}
+
+        n = len(coord)
+        A = zeros((n, n))
+        c = zeros(n)
+        for i, rhs in enumerate(eq_rhs):
+            for term, coeff in expand(rhs).as_coefficients_dict().items():
+                if term == 1:
+                    c[i] += float(coeff)
+                elif term in index:
+                    A[i, index[term]] += float(coeff)
+                else:
+                    raise ValueError(f"The equations of motion are not linear in the coordinates (term: {term}).")
+
+        return M, -M @ A, M @ c
+
+    def linear_propagator(self, param_values, dt):
+        """
+        Method for computing the exact discrete-time propagator z_k+1 = Phi*z_k + gamma of a linear system for the
+        time step dt (see modal.discrete_propagator()). Only the coordinates with stiffness or force are propagated,
+        the others move with their constant initial velocity (see expand_states()).
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param dt: time step in (s)
+        :type dt: float
+        :return: transition matrix Phi, constant term gamma and indices of the propagated states in the full state
+        :rtype: tuple
+        """
+        M, K, f = self.linear_matrices(param_values)
+        active = flatnonzero((K != 0).any(axis=0) | (K != 0).any(axis=1) | (f != 0))
+        Phi, gamma = discrete_propagator(M[active][:, active], K[active][:, active], f[active], dt)
+
+        return Phi, gamma, concatenate((active, len(f) + active))
+
+    def mass_vector(self, param_values):
+        """
+        Method for getting the numeric mass that belongs to every coordinate of the system
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :return: mass of every coordinate [m1, m1, m2, m2, ...] (every mass appears twice: x and y direction)
+        :rtype: numpy.ndarray
+        """
+        return array([float(param_values[self.parameters[name]['mass']])
+                      for name in self.parameters for _ in ('x', 'y')])
+
+    def compile_stiffness(self, param_values):
+        """
+        Method to compile the (tangent) stiffness matrix K = -M*da/dq of the system into a numeric function
+        (see Kernel.stiffness()).
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :return: function K(q) that returns the sparse stiffness matrix at the coordinates q
+        :rtype: function
+        """
+        kernel = self.kernel()
+        return kernel.stiffness(kernel.parameter_vector(param_values))
+
+    def linearize(self, param_values, coord_values):
+        """
+        Method for linearizing the system at the given coordinates (e.g. the static equilibrium).
+        The linearized equations of motion are M*dq_ddot + K*dq = 0.
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param coord_values: coordinates [x1, y1, x2, y2, ...] at which the system is linearized
+        :type coord_values: list
+        :return: sparse mass matrix M and sparse stiffness matrix K
+        :rtype: tuple of scipy.sparse.csr_matrix
         """
-        Method to simulate (integrate) the given system
+        stiffness = self.compile_stiffness(param_values)
+        M = diags(self.mass_vector(param_values), format="csr")
+
+        return M, stiffness(asarray(coord_values, dtype=float))
+
+    def static_equilibrium(self, param_values, coord_guess, tol=1e-10, max_iter=200):
+        """
+        Method for computing the static equilibrium of the system (all accelerations are zero).
+        The equilibrium is found by Newton-Raphson iterations with the analytic, sparse stiffness matrix
+        (see compile_stiffness()). Linear systems converge in one step. If the stiffness matrix is singular (e.g. cubic springs at
+        their rest length) or a step increases the forces, the step is regularized with the Laplacian of the spring
+        network (see structural_laplacian()) and the regularization is reduced with the forces.
+        Coordinates that aren't coupled to any spring (e.g. the x direction) keep the value of the guess.
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param coord_guess: start value of the iteration [x1, y1, x2, y2, ...], e.g. the initial positions
+        :type coord_guess: list
+        :param tol: tolerance of the step size relative to the magnitude of the coordinates
+        :type tol: float
+        :param max_iter: maximum number of Newton-Raphson iterations
+        :type max_iter: int
+        :return: coordinates of the static equilibrium
+        :rtype: numpy.ndarray
+        """
+        sim_fun = self.compile_rhs(param_values)
+        stiffness = self.compile_stiffness(param_values)
+        masses = self.mass_vector(param_values)
+
+        q = array(coord_guess, dtype=float)
+        n = len(q)
+        rest = zeros(n)
+
+        # only coordinates coupled by springs can be in equilibrium
+        coupled = flatnonzero(stiffness(q).getnnz(axis=1))
+        force = masses * sim_fun(0, concatenate((q, rest)))[n:]
+        uncoupled = setdiff1d(arange(n), coupled)
+        if any(force[uncoupled] != 0):
+            raise ValueError("There is no static equilibrium: a constant force acts on a mass in a direction without spring.")
+
+        # pseudo-transient continuation: mu = 0 is the plain Newton-Raphson step, mu > 0 regularizes the step with the
+        # Laplacian of the spring network and is reduced with the forces (switched evolution relaxation)
+        mu = 0.0
+        laplacian = None
+
+        for _ in range(max_iter):
+            # Newton-Raphson step: (K + mu*L)*dq = M*a
+            K = stiffness(q)[coupled][:, coupled]
+            dq = None
+            if mu == 0:
+                with catch_warnings():
+                    simplefilter("error", MatrixRankWarning)
+                    try:
+                        dq = spsolve(K.tocsc(), force[coupled])
+                    except MatrixRankWarning:
+                        pass
+
+            # singular stiffness matrix (e.g. cubic springs at their rest length)
+            if dq is None or not isfinite(dq).all():
+                if laplacian is None:
+                    laplacian = structural_laplacian(K)
+                if mu == 0:
+                    # force per coordinate over the length scale of the coordinates
+                    mu = norm(force[coupled]) / (len(coupled) ** 0.5 * max(1.0, abs(q[coupled]).max()))
+                dq = spsolve((K + mu * laplacian).tocsc(), force[coupled])
+
+            q_new = q.copy()
+            q_new[coupled] += dq
+            force_new = masses * sim_fun(0, concatenate((q_new, rest)))[n:]
+            converged = abs(dq).max() <= tol * max(1.0, abs(q_new).max())
+
+            if mu == 0 and not converged and norm(force_new[coupled]) > norm(force[coupled]):
+                # the Newton-Raphson step overshoots, repeat it regularized
+                laplacian = structural_laplacian(K)
+                mu = norm(force[coupled]) / (len(coupled) ** 0.5 * max(1.0, abs(q[coupled]).max()))
+                continue
+
+            if mu > 0:
+                mu *= norm(force_new[coupled]) / norm(force[coupled])
+            q, force = q_new, force_new
+
+            if converged:
+                return q
+
+        raise ValueError("The static equilibrium did not converge.")
+
+    def is_stiff(self, jac, init_cond, stiffness_ratio=1e3):
+        """
+        Method to detect whether the system is stiff at the given state.
+        The eigenvalues of the Jacobian are the (linearized) time constants and frequencies of the system.
+        The system is regarded as stiff, if the fastest and the slowest (non-zero) eigenvalue differ by more than the
+        given ratio. In that case explicit solvers need steps that are limited by the fastest eigenvalue, even if it
+        barely contributes to the solution.
+        Systems with more than DENSE_LIMIT states are regarded as stiff without computing the eigenvalues
+        (the ratio of the highest to the lowest frequency of a chain grows with its length).
+
+        :param jac: compiled Jacobian J(t, z) of the system (see compile_jacobian())
+        :type jac: function
+        :param init_cond: state at which the stiffness is evaluated
+        :type init_cond: list
+        :param stiffness_ratio: ratio of the largest to the smallest eigenvalue magnitude above which the system is stiff
+        :type stiffness_ratio: float
+        :return: True if the system is stiff
+        :rtype: bool
+        """
+        if len(init_cond) > DENSE_LIMIT:
+            return True
+
+        J = jac(0, asarray(init_cond, dtype=float))
+        magnitudes = abs(eigvals(J.toarray() if issparse(J) else J))
+        largest = magnitudes.max()
+        if largest == 0:
+            return False
+
+        # eigenvalues of free directions (no force acting) are zero and are not taken into account
+        smallest = magnitudes[magnitudes > 1e-12 * largest].min()
+
+        return largest / smallest > stiffness_ratio
+
+    def simulate(self, param_values, init_cond, t_span, num_points=25001, method="RK45", max_step=None, dense=False,
+                 rtol=1e-6, atol=1e-6):
+        """
+        Method to simulate (integrate) the given system.
+        The implicit methods "Radau", "BDF" and "LSODA" get the analytic Jacobian of the system.
+        Method "modal" computes the solution of linear systems (only linear springs) in closed form without
+        numerical integration (see modal.modal_solution()).
+        Method "propagator" computes the states of linear systems on the uniform time grid exactly with one matrix
+        product per time step (see linear_propagator()).
+        With method "auto" linear systems (see is_linear()) are solved with "modal". Otherwise the system is checked for stiffness at
+        the initial state (see is_stiff()).
+        A stiff system is integrated with "LSODA" (which switches between Adams and BDF steps on its own),
+        otherwise "RK45" is used.
+        The fixed step symplectic methods "Verlet", "Yoshida4" and "Yoshida6" integrate on the uniform output grid
+        (see integrators.integrate_symplectic()). They keep the energy of undamped systems bounded on long horizons.
+        Coordinates without forces (the x direction of the chains) are not integrated. They move with their constant
+        initial velocity and are added to the result (see reduced_kernel()), so the result has the full state.
+        With dense=True the solution is not sampled on the time grid during the integration. A DenseResult is returned
+        that evaluates the continuous solution only at the times where it is needed (see DenseResult.sample()).
+        Besides the statistics of solve_ivp() the result has the numbers of accepted and rejected steps
+        (accepted_steps and rejected_steps, see metrics.counted_solver()) and the method that was used (method, e.g.
+        the method that "auto" chose).
 
         :param param_values: parameter of the given system. For example masses, spring constants,...)
         :type param_values: dictionary
@@ -215,29 +952,438 @@ class Mechanics:
         :type t_span: tuple
         :param num_points: number of time steps for numerical integration (default 25001)
         :type num_points: int
+        :param method: integration method of solve_ivp(), "modal", "propagator", "Verlet", "Yoshida4", "Yoshida6" or
+                       "auto" (default "RK45")
+        :type method: str
+        :param max_step: maximum step size of the integration, default is None (no limit)
+        :type max_step: float or None
+        :param dense: return a DenseResult instead of the solution on the time grid, default is False
+                      (not available for "propagator" and the fixed step symplectic methods)
+        :type dense: bool
+        :param rtol: relative tolerance of the integration (default 1e-6)
+        :type rtol: float
+        :param atol: absolute tolerance of the integration, a value for all states or one value per state (default 1e-6)
+        :type atol: float or list
         :return: See documentation of solve_ivp()
+        :rtype: scipy.integrate.OdeSolution or DenseResult
+        """
+        # define the time points where the solution is computed
+        t_eval = linspace(t_span[0], t_span[1], num_points)
+
+        if method in SYMPLECTIC_METHODS:
+            kernel, active = self.reduced_kernel()
+            if kernel.depends_on_velocity():
+                raise ValueError(f'Method "{method}" needs accelerations that don\'t depend on the velocities.')
+
+            states = concatenate((active, len(init_cond) // 2 + active))
+            acc = kernel.acceleration(kernel.parameter_vector(param_values))
+            self.store_kernel()
+            return solve_symplectic(acc, init_cond, states, t_span, num_points, method, max_step, dense)
+
+        if method == "propagator":
+            if dense:
+                raise ValueError(f'Method "{method}" has no dense output.')
+
+            dt = (t_span[1] - t_span[0]) / (num_points - 1) if num_points > 1 else 0
+            Phi, gamma, states = self.linear_propagator(param_values, dt)
+            y = propagate(Phi, gamma, asarray(init_cond, dtype=float)[states], num_points)
+            y = expand_states(y, t_eval, t_span[0], init_cond, states)
+            return OptimizeResult(t=t_eval, y=y, sol=None, t_events=None, y_events=None, nfev=0, njev=0, nlu=0,
+                                  accepted_steps=num_points - 1, rejected_steps=0, status=0,
+                                  message="Exact discrete-time propagation.", success=True, method="propagator")
+
+        # systems with cubic springs are integrated without deriving the linear matrices (see is_linear())
+        if method == "modal" or method == "auto" and self.is_linear() is not False:
+            try:
+                M, K, f = self.linear_matrices(param_values)
+            except ValueError:
+                if method == "modal":
+                    raise
+            else:
+                # the modes are computed once, the solution is evaluated at any time
+                solution = modal_solution(M, K, f, init_cond, t_span[0])
+                if dense:
+                    return DenseResult(solution, t_span, num_points, accepted_steps=0, rejected_steps=0,
+                                       message="Closed-form modal solution.", method="modal")
+
+                y = solution(t_eval)
+                # same fields as the result of solve_ivp(), so plotting, animation and saving work unchanged
+                return OptimizeResult(t=t_eval, y=y, sol=None, t_events=None, y_events=None, nfev=0, njev=0, nlu=0,
+                                      accepted_steps=0, rejected_steps=0, status=0,
+                                      message="Closed-form modal solution.", success=True, method="modal")
+
+        sim_fun, method, options, states = self.solver_setup(param_values, init_cond, method, max_step, rtol, atol)
+        return solve_states(sim_fun, init_cond, states, t_span, num_points, method, options, dense)
+
+    def solver_setup(self, param_values, init_cond, method="RK45", max_step=None, rtol=1e-6, atol=1e-6):
+        """
+        Method to prepare the numerical integration with one of the solvers of solve_ivp().
+        Only the states of the coordinates with forces are integrated (see reduced_kernel()).
+        The implicit methods get the analytic Jacobian (sparse for "BDF" and "Radau", dense for "LSODA").
+        Method "auto" is replaced by "LSODA" for stiff systems and by "RK45" otherwise (see simulate()).
+        Stiff systems with more than DENSE_LIMIT states use "BDF" with the sparse Jacobian instead of "LSODA".
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param init_cond: initial conditions regarding the system (Initial state)
+        :type init_cond: list
+        :param method: integration method of solve_ivp() or "auto" (default "RK45")
+        :type method: str
+        :param max_step: maximum step size of the integration, default is None (no limit)
+        :type max_step: float or None
+        :param rtol: relative tolerance of the integration (default 1e-6)
+        :type rtol: float
+        :param atol: absolute tolerance of the integration, a value for all states or one value per state (default 1e-6)
+        :type atol: float or list
+        :return: right-hand side sim_fun(t, z) of the integrated states, chosen method, options of the solver and
+                 indices of the integrated states in the full state (see expand_states())
+        :rtype: tuple
+        """
+        kernel, active = self.reduced_kernel()
+        states = concatenate((active, len(init_cond) // 2 + active))
+        p = kernel.parameter_vector(param_values)
+        sim_fun = kernel.rhs(p)
+        z0 = asarray(init_cond, dtype=float)[states]
+
+        if method == "auto":
+            if not self.is_stiff(kernel.jacobian(p), z0):
+                method = "RK45"
+            else:
+                method = "LSODA" if len(z0) <= DENSE_LIMIT else "BDF"
+
+        options = solver_options(method, states, rtol, atol, max_step, lambda dense: kernel.jacobian(p, dense))
+        self.store_kernel()
+
+        return sim_fun, method, options, states
+
+    def simulate_chunks(self, param_values, init_cond, t_span, chunk_duration, num_points=25001, method="RK45",
+                        max_step=None, rtol=1e-6, atol=1e-6):
+        """
+        Generator to simulate the given system in time windows of length chunk_duration.
+        The solver object of scipy is stepped directly and keeps its state (step size, history) between the windows,
+        so the result is the same as one integration over the whole interval. Every window is sampled on the same
+        uniform grid as simulate() and only the current window is held in memory.
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param init_cond: initial conditions regarding the system (Initial state)
+        :type init_cond: list
+        :param t_span: Interval of integration (start time and end time)
+        :type t_span: tuple
+        :param chunk_duration: length of the time windows
+        :type chunk_duration: float
+        :param num_points: number of time steps over the whole interval, at least 2 (default 25001)
+        :type num_points: int
+        :param method: integration method of solve_ivp() or "auto" (default "RK45")
+        :type method: str
+        :param max_step: maximum step size of the integration, default is None (no limit)
+        :type max_step: float or None
+        :param rtol: relative tolerance of the integration (default 1e-6)
+        :type rtol: float
+        :param atol: absolute tolerance of the integration, a value for all states or one value per state (default 1e-6)
+        :type atol: float or list
+        :return: time points (shape: number of points) and states (shape: number of states x number of points)
+                 of every window
+        :rtype: generator of tuple
+        """
+        if method not in SOLVERS and method != "auto":
+            raise ValueError(f'Method "{method}" can\'t be used for chunked integration.')
+        if num_points < 2:
+            raise ValueError("The chunked integration needs at least 2 time points (start time and end time).")
+
+        sim_fun, method, options, states = self.solver_setup(param_values, init_cond, method, max_step, rtol, atol)
+        solver = SOLVERS[method](sim_fun, t_span[0], asarray(init_cond, dtype=float)[states], t_span[1], **options)
+
+        dt = (t_span[1] - t_span[0]) / (num_points - 1)
+        points_per_chunk = max(1, round(chunk_duration / dt))
+
+        start = 0
+        while start < num_points:
+            stop = min(start + points_per_chunk, num_points)
+            # the last point must not exceed the end of the interval due to rounding
+            t_chunk = minimum(t_span[0] + arange(start, stop) * dt, t_span[1])
+            y_chunk = empty((len(states), len(t_chunk)))
+
+            filled = 0
+            while True:
+                # points covered by the last step are evaluated with its interpolant
+                covered = searchsorted(t_chunk, solver.t, side='right')
+                if covered > filled:
+                    if solver.t_old is None:
+                        y_chunk[:, filled:covered] = solver.y[:, None]
+                    else:
+                        y_chunk[:, filled:covered] = solver.dense_output()(t_chunk[filled:covered])
+                    filled = covered
+
+                if filled == len(t_chunk):
+                    break
+
+                message = solver.step()
+                if solver.status == 'failed':
+                    raise RuntimeError(message)
+
+            yield t_chunk, expand_states(y_chunk, t_chunk, t_span[0], init_cond, states)
+            start = stop
+
+    def simulate_batch(self, param_sets, init_cond, t_span, num_points=25001, method="RK45", max_step=None, rtol=1e-6,
+                       atol=1e-6):
+        """
+        Method to simulate many variants of the system with the same topology but different parameters together.
+        The variants are integrated as one batched state array with the compiled kernel (see Kernel.batch_rhs()),
+        so the equations are derived and compiled only once and every solver step evaluates all variants at once.
+        The step size is controlled by the error of all variants, so it is determined by the most demanding variant.
+
+        :param param_sets: parameter values of every variant (each like param_values of simulate())
+        :type param_sets: list of dictionaries
+        :param init_cond: initial conditions regarding the system (Initial state), the same for all variants
+        :type init_cond: list
+        :param t_span: Interval of integration (start time and end time)
+        :type t_span: tuple
+        :param num_points: number of time steps for numerical integration (default 25001)
+        :type num_points: int
+        :param method: integration method of solve_ivp() (default "RK45"), the implicit methods get the block
+                       diagonal Jacobian of all variants (see Kernel.batch_jacobian())
+        :type method: str
+        :param max_step: maximum step size of the integration, default is None (no limit)
+        :type max_step: float or None
+        :param rtol: relative tolerance of the integration (default 1e-6)
+        :type rtol: float
+        :param atol: absolute tolerance of the integration, a value for all states or one value per state (default 1e-6)
+        :type atol: float or list
+        :return: See documentation of solve_ivp(), but y is indexed (variant, state, time)
         :rtype: scipy.integrate.OdeSolution
         """
-        # get the equations of motion, substitute the parameters and store the right hand side of the equation
-        eq = self.generate_equations()
-        sub_equations = self.substitute_parameters(eq, param_values)
-        eq_rhs = self.rhs_of_equation(sub_equations)
+        if method not in SOLVERS:
+            raise ValueError(f'Method "{method}" can\'t be used for batched runs (available: {", ".join(SOLVERS)}).')
 
-        # init lists for coordinates and velocities
-        coord = []
-        vel = []
+        kernel, active = self.reduced_kernel()
+        states = concatenate((active, len(init_cond) // 2 + active))
+        P = column_stack([kernel.parameter_vector(param_values) for param_values in param_sets])
+        num_variants = P.shape[1]
 
-        # construct lists of coordinates and velocities that are needed for the lambdify function
-        for name in self.parameters:
-            x = self.coordinates[name]['x']
-            y = self.coordinates[name]['y']
-            xdot = self.velocities[name]['x']
-            ydot = self.velocities[name]['y']
-            coord.extend([x, y])
-            vel.extend([xdot, ydot])
+        # batch state: every integrated state of the system is a row, every variant is a column
+        z0 = repeat(asarray(init_cond, dtype=float)[states, None], num_variants, axis=1)
+
+        # define the time points where the solution is computed
+        t_eval = linspace(t_span[0], t_span[1], num_points)
+
+        sim_fun = kernel.batch_rhs(P)
+        # the tolerances of a state hold for all variants
+        options = solver_options(method, repeat(states, num_variants), rtol, atol, max_step,
+                                 lambda dense: kernel.batch_jacobian(P, dense))
+        self.store_kernel()
+
+        res = solve_ivp(sim_fun, t_span, z0.reshape(-1), method=method, t_eval=t_eval, **options)
+        y = res.y.reshape(len(states), num_variants, -1)
+        res.y = expand_states(y, res.t[None, :], t_span[0], init_cond, states).transpose(1, 0, 2)
+
+        return res
+
+    def propagate_batch(self, param_values, init_conds, t_span, num_points=25001):
+        """
+        Method to simulate a linear system from many initial conditions together with its exact discrete-time
+        propagator (see linear_propagator()). The propagator is computed once and all initial conditions are
+        propagated with one matrix product per time step.
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :param init_conds: initial conditions of every variant (each like init_cond of simulate())
+        :type init_conds: list of lists
+        :param t_span: Interval of integration (start time and end time)
+        :type t_span: tuple
+        :param num_points: number of time points of the uniform grid (default 25001)
+        :type num_points: int
+        :return: See documentation of solve_ivp(), but y is indexed (variant, state, time)
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        t_eval = linspace(t_span[0], t_span[1], num_points)
+        dt = (t_span[1] - t_span[0]) / (num_points - 1) if num_points > 1 else 0
+        Phi, gamma, states = self.linear_propagator(param_values, dt)
+
+        # batch state: every propagated state of the system is a row, every variant is a column
+        Z0 = asarray(init_conds, dtype=float).T
+        y = propagate(Phi, gamma, Z0[states], num_points)
+
+        # the states that are not propagated are reconstructed for every variant
+        full = empty((len(init_conds), Z0.shape[0], num_points))
+        for j in range(len(init_conds)):
+            full[j] = expand_states(y[:, j], t_eval, t_span[0], Z0[:, j], states)
+
+        return OptimizeResult(t=t_eval, y=full, sol=None, t_events=None, y_events=None, nfev=0, njev=0, nlu=0,
+                              status=0, message="Exact discrete-time propagation.", success=True)
+
+
+class Kernel:
+    """
+    Class for the compiled numeric functions (kernel) of the equations of motion of one system topology.
+    The parameters (masses, spring constants, gravitation, ...) are not substituted into the equations. They are passed
+    as a parameter vector to the generated functions, so one kernel can be used for any parameter values.
+    Every function is lambdified once, when it is needed for the first time.
+
+    :param eq_rhs: right hand side of the (not substituted) equations of motion
+    :type eq_rhs: list of sympy.Add()
+    :param coord: coordinates of the system [x1, y1, x2, y2, ...]
+    :type coord: list of sympy.Function
+    :param vel: velocities of the system [x1_dot, y1_dot, x2_dot, y2_dot, ...]
+    :type vel: list of sympy.Derivative
+    :param masses: symbolic mass of every coordinate [m1, m1, m2, m2, ...]
+    :type masses: list of sympy.Symbol
+
+    :ivar parameters: symbols of the parameters in the order of the parameter vector
+    :vartype parameters: list of sympy.Symbol
+    :ivar equation_source: function that derives the equations again for an unpickled kernel, default is None
+    :vartype equation_source: function or None
+    """
+    def __init__(self, eq_rhs, coord, vel, masses):
+        self.eq_rhs = eq_rhs
+        self.coord = coord
+        self.vel = vel
+        self.masses = masses
+
+        t = symbols("t")
+        free_symbols = set(masses).union(*(rhs.free_symbols for rhs in eq_rhs))
+        self.parameters = sorted(free_symbols - {t}, key=str)
+
+        # equations in terms of the state symbols and compiled functions (created on demand)
+        self.state_eqs = None
+        self.acc_fun = None
+        self.jac_fun = None
+        self.jacobian_pattern = None
+        self.stiffness_fun = None
+        self.stiffness_pattern = None
+        self.velocity_dependent = None
+        self.equation_source = None
+
+    def __getstate__(self):
+        """
+        Method for pickling the kernel, e.g. to send it to the worker processes of a process pool.
+        The symbolic equations are not pickled. Instead the generated source code of every compiled function is stored,
+        so the receiving process only executes the source code and doesn't derive or lambdify anything.
+
+        :return: state of the kernel
+        :rtype: dictionary
+        """
+        state = self.__dict__.copy()
+        state['eq_rhs'] = None
+        state['state_eqs'] = None
+        state['equation_source'] = None
+        for name in ('acc_fun', 'jac_fun', 'stiffness_fun'):
+            if state[name] is not None:
+                state[name] = getsource(state[name])
+
+        return state
+
+    def __setstate__(self, state):
+        """
+        Method for unpickling the kernel. The generated source code of the compiled functions is executed again.
+
+        :param state: state of the kernel (see __getstate__())
+        :type state: dictionary
+        """
+        self.__dict__.update(state)
+        for name in ('acc_fun', 'jac_fun', 'stiffness_fun'):
+            if state[name] is not None:
+                setattr(self, name, compile_source(state[name]))
+
+    def compiled_functions(self):
+        """
+        Method for getting the names of the functions that are compiled.
+
+        :return: names of the compiled functions
+        :rtype: tuple
+        """
+        return tuple(name for name in ('acc_fun', 'jac_fun', 'stiffness_fun') if getattr(self, name) is not None)
+
+    def depends_on_velocity(self):
+        """
+        Method for checking if any acceleration depends on the velocities (e.g. damping).
+        The result is kept, so an unpickled kernel doesn't need its equations for it.
+
+        :return: True if any equation contains a velocity
+        :rtype: bool
+        """
+        if self.velocity_dependent is None:
+            self.check_equations()
+            self.velocity_dependent = any(rhs.has(*self.vel) for rhs in self.eq_rhs)
+
+        return self.velocity_dependent
+
+    def check_equations(self):
+        """
+        Method for checking that the symbolic equations are available to compile a function.
+        An unpickled kernel only contains the functions that were compiled before pickling. Its equations are derived
+        again if an equation source is given (see Mechanics.reduced_kernel()).
+        """
+        if self.eq_rhs is None and self.equation_source is not None:
+            self.eq_rhs = self.equation_source()
+        if self.eq_rhs is None:
+            raise ValueError("The kernel has no symbolic equations (unpickled kernel). "
+                             "Compile all needed functions before pickling the kernel.")
+
+    def parameter_vector(self, param_values):
+        """
+        Method for creating the parameter vector of the kernel from the parameter values of a system
+
+        :param param_values: parameter of the given system. For example masses, spring constants,...)
+        :type param_values: dictionary
+        :return: parameter vector
+        :rtype: numpy.ndarray
+        """
+        return array([float(param_values[p]) for p in self.parameters])
+
+    def acceleration_function(self):
+        """
+        Method for getting the compiled accelerations a(z, p) of the system.
+        The generated function unpacks the rows of the state vector z and of the parameter vector p. So it also works
+        with two-dimensional arrays, where every column is one variant of the system.
+
+        Common subexpressions of all equations (e.g. the extension of a spring, which appears in the equations of both
+        connected masses, or its power for cubic springs) are computed only once per call of the generated function.
+
+        :return: function a(z, p) that returns the list of accelerations
+        :rtype: function
+        """
+        if self.acc_fun is None:
+            with timed("lambdify"):
+                state, equations = self.state_equations()
+                # Lambdify: transform the symbolic equations of motion to one numeric function of the state vector
+                # and the parameter vector (the nested lists unpack the vectors inside the generated function)
+                self.acc_fun = lambdify([state, self.parameters], equations, cse=True)
+
+        return self.acc_fun
+
+    def state_equations(self):
+        """
+        Method for getting the equations of motion in terms of plain symbols of the state vector.
+        The coordinates and velocities (functions of t and their derivatives) are replaced in one pass.
+        Differentiating with respect to symbols and lambdifying with symbol arguments is much faster than with
+        functions, which are replaced again for every single derivative and argument.
 
-        # Lambdify: transform the symbolic equation of motion to numeric equation of motion
-        rhs_funcs = [lambdify(coord + vel, rhs) for rhs in eq_rhs]
+        :return: symbols of the state vector [q, v] and the equations of motion in terms of them
+        :rtype: tuple
+        """
+        if self.state_eqs is None:
+            self.check_equations()
+            half = len(self.coord)
+            # plain symbols with names that no parameter has (lambdify would replace Dummy arguments again)
+            state = list(symbols(f"_z0:{2 * half}"))
+            # the derivatives are replaced as a whole before their functions are reached
+            replacement = dict(zip(self.coord + self.vel, state))
+            self.state_eqs = (state, [rhs.xreplace(replacement) for rhs in self.eq_rhs])
+
+        return self.state_eqs
+
+    def rhs(self, p):
+        """
+        Method for getting the first order system z_dot = [v, a(q, v, p)] for the given parameter vector
+
+        :param p: parameter vector (see parameter_vector())
+        :type p: numpy.ndarray
+        :return: function f(t, z) that returns the time derivative of the state vector z
+        :rtype: function
+        """
+        acc_fun = self.acceleration_function()
+        half = len(self.coord)
 
         # function to convert a second order system to a first order system
         def sim_fun(t, z):
@@ -246,20 +1392,412 @@ class Mechanics:
 
             :param t: time variable
             :type t: float
-            :param z: list of current state of the system
-            :type z: list
+            :param z: current state of the system
+            :type z: numpy.ndarray
+            :return: time derivative of the state
+            :rtype: numpy.ndarray
             """
-            half = len(z) // 2
-            positions = z[:half]
-            velocities = z[half:]
+            # a new array is allocated on every call, because the solvers keep references to returned derivatives
+            dz = empty(len(z))
+            dz[:half] = z[half:]
+            dz[half:] = acc_fun(z, p)
 
-            # evaluate the lambdified function at the current position and velocity ("*" unpacks lists into positional arguments)
-            rhs_evals = [f(*positions, *velocities) for f in rhs_funcs]
+            return dz
 
-            # return state vector
-            return concatenate((velocities, rhs_evals))
+        return sim_fun
 
-        # define the time points where the solution is computed
-        t_eval = linspace(t_span[0], t_span[1], num_points)
+    def acceleration(self, p):
+        """
+        Method for getting the accelerations of the masses as a function of the coordinates only
+        (for the fixed step symplectic methods, see integrators.integrate_symplectic()).
+        The velocities in the state vector passed to the generated code are set to zero.
+
+        :param p: parameter vector (see parameter_vector())
+        :type p: numpy.ndarray
+        :return: function a(q) that returns the accelerations at the coordinates q
+        :rtype: function
+        """
+        acc_fun = self.acceleration_function()
+        half = len(self.coord)
+        z = zeros(2 * half)
+
+        def acc(q):
+            """
+            Accelerations of the masses
+
+            :param q: coordinates of the masses
+            :type q: numpy.ndarray
+            :return: accelerations
+            :rtype: numpy.ndarray
+            """
+            z[:half] = q
+            return asarray(acc_fun(z, p), dtype=float)
+
+        return acc
+
+    def batch_rhs(self, P):
+        """
+        Method for getting the first order system of many variants of the system (one column of P per variant).
+        All variants are integrated together as one state vector, which is the flattened array of shape
+        (number of states, number of variants). So one call of the generated code evaluates all variants at once.
+
+        :param P: parameter vectors of all variants (shape: number of parameters x number of variants)
+        :type P: numpy.ndarray
+        :return: function f(t, z) that returns the time derivative of the flattened batch state vector z
+        :rtype: function
+        """
+        acc_fun = self.acceleration_function()
+        half = len(self.coord)
+        num_variants = P.shape[1]
+
+        def sim_fun(t, z):
+            """
+            Method to convert the batched second order system to a first order system
+
+            :param t: time variable
+            :type t: float
+            :param z: current state of all variants (flattened)
+            :type z: numpy.ndarray
+            :return: time derivative of the state of all variants (flattened)
+            :rtype: numpy.ndarray
+            """
+            Z = z.reshape(-1, num_variants)
+            dZ = empty(Z.shape)
+            dZ[:half] = Z[half:]
+            # constant accelerations (e.g. zero in x direction) are scalars and have to be broadcast to all variants
+            dZ[half:] = broadcast_arrays(*acc_fun(Z, P), Z[0])[:-1]
+
+            return dZ.reshape(-1)
+
+        return sim_fun
+
+    def jacobian(self, p, dense=False):
+        """
+        Method for getting the Jacobian of the first order system for the given parameter vector.
+        The first order system is z_dot = [v, a(q, v)]. So the upper half of the Jacobian is constant ([0, I])
+        and only the derivatives of the accelerations have to be derived.
+        Every acceleration depends only on the masses that are connected to it by springs (a chain gives a banded
+        matrix), so every equation is only differentiated with respect to the states it contains and the Jacobian
+        is returned in sparse format. The implicit solvers "BDF" and "Radau" use sparse LU decompositions then.
+
+        :param p: parameter vector (see parameter_vector())
+        :type p: numpy.ndarray
+        :param dense: return the Jacobian as a dense array (e.g. for "LSODA"), default is False
+        :type dense: bool
+        :return: function J(t, z) that returns the Jacobian matrix of the first order system at the state z
+        :rtype: function
+        """
+        if self.jac_fun is None:
+            with timed("lambdify"):
+                state, equations = self.state_equations()
+                half = len(self.coord)
+                index = {s: i for i, s in enumerate(state)}
+
+                # sparsity pattern and symbolic entries of the derivatives of the accelerations
+                rows = []
+                cols = []
+                entries = []
+                for i, rhs in enumerate(equations):
+                    for s in rhs.free_symbols:
+                        if s in index:
+                            rows.append(half + i)
+                            cols.append(index[s])
+                            entries.append(rhs.diff(s))
+
+                self.jacobian_pattern = (rows, cols)
+                # the entries of the same spring share subexpressions (see acceleration_function())
+                self.jac_fun = lambdify([state, self.parameters], entries, cse=True)
+
+        jac_fun = self.jac_fun
+        half = len(self.coord)
+        rows, cols = self.jacobian_pattern
+
+        # constant block [0, I] and the derivatives of the accelerations,
+        # the data of the csr matrix is sorted once, so only the values have to be reordered in every call
+        all_rows = concatenate((arange(half), asarray(rows, dtype=int)))
+        all_cols = concatenate((arange(half, 2 * half), asarray(cols, dtype=int)))
+        template = csr_matrix((arange(1, len(all_rows) + 1, dtype=float), (all_rows, all_cols)),
+                              shape=(2 * half, 2 * half))
+        order = template.data.astype(int) - 1
+        ones_block = ones(half)
+
+        def jac(t, z):
+            """
+            Jacobian of the first order system
+
+            :param t: time variable
+            :type t: float
+            :param z: current state of the system
+            :type z: numpy.ndarray
+            :return: Jacobian matrix
+            :rtype: scipy.sparse.csr_matrix or numpy.ndarray
+            """
+            values = concatenate((ones_block, asarray(jac_fun(z, p), dtype=float)))
+            J = csr_matrix((values[order], template.indices, template.indptr), shape=template.shape)
+
+            return J.toarray() if dense else J
+
+        return jac
+
+    def batch_jacobian(self, P, dense=False):
+        """
+        Method for getting the Jacobian of the batched first order system of many variants (see batch_rhs()).
+        The variants don't depend on each other, so the Jacobian is block diagonal with the Jacobian of every variant
+        (see jacobian()). The flattened batch state has the variants as fastest index, so the blocks are interleaved,
+        but the matrix is only as sparse as the Jacobians of the variants.
+
+        :param P: parameter vectors of all variants (shape: number of parameters x number of variants)
+        :type P: numpy.ndarray
+        :param dense: return the Jacobian as a dense array (e.g. for "LSODA"), default is False
+        :type dense: bool
+        :return: function J(t, z) that returns the Jacobian matrix of the flattened batch state vector z
+        :rtype: function
+        """
+        # compiles the derivatives of the accelerations and their sparsity pattern
+        self.jacobian(P[:, 0])
+        jac_fun = self.jac_fun
+        half = len(self.coord)
+        num_variants = P.shape[1]
+        rows, cols = self.jacobian_pattern
+
+        # entry (i, j) of variant k is the entry (i*num_variants + k, j*num_variants + k) of the batch
+        all_rows = concatenate((arange(half), asarray(rows, dtype=int)))
+        all_cols = concatenate((arange(half, 2 * half), asarray(cols, dtype=int)))
+        variants = arange(num_variants)
+        size = 2 * half * num_variants
+        template = csr_matrix((arange(1, len(all_rows) * num_variants + 1, dtype=float),
+                               ((all_rows[:, None] * num_variants + variants).ravel(),
+                                (all_cols[:, None] * num_variants + variants).ravel())), shape=(size, size))
+        order = template.data.astype(int) - 1
+        ones_block = ones((half, num_variants))
+
+        def jac(t, z):
+            """
+            Jacobian of the batched first order system
+
+            :param t: time variable
+            :type t: float
+            :param z: current state of all variants (flattened)
+            :type z: numpy.ndarray
+            :return: Jacobian matrix
+            :rtype: scipy.sparse.csr_matrix or numpy.ndarray
+            """
+            Z = z.reshape(-1, num_variants)
+            # constant derivatives (e.g. of linear springs) are scalars and have to be broadcast to all variants
+            entries = broadcast_arrays(*jac_fun(Z, P), Z[0])[:-1]
+            values = concatenate((ones_block, asarray(entries, dtype=float).reshape(-1, num_variants))).ravel()
+            J = csr_matrix((values[order], template.indices, template.indptr), shape=template.shape)
+
+            return J.toarray() if dense else J
+
+        return jac
+
+    def stiffness(self, p):
+        """
+        Method for getting the (tangent) stiffness matrix K = -M*da/dq for the given parameter vector.
+        Every acceleration depends only on the coordinates of the masses that are connected by springs.
+        So every equation is only differentiated with respect to the coordinates it contains and the matrix is
+        returned in sparse format.
+
+        :param p: parameter vector (see parameter_vector())
+        :type p: numpy.ndarray
+        :return: function K(q) that returns the sparse stiffness matrix at the coordinates q
+        :rtype: function
+        """
+        if self.stiffness_fun is None:
+            with timed("lambdify"):
+                state, equations = self.state_equations()
+                coord = state[:len(self.coord)]
+                index = {c: i for i, c in enumerate(coord)}
+
+                # sparsity pattern and symbolic entries of the stiffness matrix
+                rows = []
+                cols = []
+                entries = []
+                for i, rhs in enumerate(equations):
+                    for c in rhs.free_symbols:
+                        if c in index:
+                            rows.append(i)
+                            cols.append(index[c])
+                            entries.append(-self.masses[i] * rhs.diff(c))
+
+                self.stiffness_pattern = (rows, cols)
+                self.stiffness_fun = lambdify([coord, self.parameters], entries, cse=True)
+
+        stiffness_fun = self.stiffness_fun
+        rows, cols = self.stiffness_pattern
+        n = len(self.coord)
+
+        def stiffness(q):
+            """
+            Stiffness matrix of the system
+
+            :param q: coordinates of the masses
+            :type q: numpy.ndarray
+            :return: sparse stiffness matrix
+            :rtype: scipy.sparse.csr_matrix
+            """
+            data = asarray(stiffness_fun(q, p), dtype=float)
+            return csr_matrix((data, (rows, cols)), shape=(n, n))
 
-        return solve_ivp(sim_fun, t_span, init_cond, t_eval=t_eval, rtol=1e-6)
\ No newline at end of file
+        return stiffness
+
+
+class SolverConfig:
+    """
+    A class to represent the settings of a simulation: horizon, output sampling, method and tolerances.
+    The settings are passed to Mechanics.simulate() (see options()) and saved with the simulation results,
+    so a run can be reproduced and compared with other runs (see attributes()).
+
+    :param t_span: Interval of integration (start time and end time), default is (0, 10)
+    :type t_span: tuple
+    :param num_points: number of time points of the output, default is 25001
+    :type num_points: int
+    :param method: integration method (see Mechanics.simulate()), default is "RK45"
+    :type method: str
+    :param rtol: relative tolerance, default is 1e-6
+    :type rtol: float
+    :param atol: absolute tolerance, a value for all states or one value per state, default is 1e-6
+    :type atol: float or list
+    :param max_step: maximum step size, default is None (no limit)
+    :type max_step: float or None
+    :param dense: return a lazy result with dense output (see DenseResult), default is False
+    :type dense: bool
+    """
+
+    def __init__(self, t_span=(0, 10), num_points=25001, method="RK45", rtol=1e-6, atol=1e-6, max_step=None,
+                 dense=False):
+        self.t_span = (float(t_span[0]), float(t_span[1]))
+        self.num_points = int(num_points)
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+        self.max_step = max_step
+        self.dense = dense
+
+    def options(self):
+        """
+        Method for getting the settings as keyword arguments of Mechanics.simulate().
+
+        :return: keyword arguments of Mechanics.simulate()
+        :rtype: dict
+        """
+        return {'t_span': self.t_span, 'num_points': self.num_points, 'method': self.method,
+                'max_step': self.max_step, 'dense': self.dense, 'rtol': self.rtol, 'atol': self.atol}
+
+    def attributes(self):
+        """
+        Method for getting the settings as attributes of a netCDF file (numbers, strings and numeric arrays).
+        A missing maximum step size is saved as inf.
+
+        :return: settings
+        :rtype: dict
+        """
+        return {'t_start': self.t_span[0], 't_end': self.t_span[1], 'num_points': self.num_points,
+                'method': self.method, 'rtol': self.rtol, 'atol': self.atol,
+                'max_step': float('inf') if self.max_step is None else self.max_step, 'dense': int(self.dense)}
+
+    @staticmethod
+    def from_attributes(attributes):
+        """
+        Method for creating the settings from the attributes of a netCDF file (see attributes()).
+
+        :param attributes: settings
+        :type attributes: dict
+        :return: settings
+        :rtype: SolverConfig
+        """
+        max_step = float(attributes['max_step'])
+        atol = attributes['atol']
+
+        return SolverConfig(t_span=(attributes['t_start'], attributes['t_end']), num_points=attributes['num_points'],
+                            method=str(attributes['method']), rtol=float(attributes['rtol']),
+                            atol=float(atol) if ndim(atol) == 0 else [float(a) for a in atol],
+                            max_step=None if max_step == float('inf') else max_step, dense=bool(attributes['dense']))
+
+
+class DenseResult:
+    """
+    Lazy simulation result that holds the continuous solution (dense output) instead of the sampled states.
+    The states are only evaluated at the times where they are needed, for example the frames of the animation or the
+    points of a plot (see sample()). The attributes t and y sample the solution on the default grid of num_points
+    points when they are used for the first time, so the result can be used like the result of solve_ivp().
+
+    :param sol: continuous solution, returns the state at a time or the states at an array of times
+    :type sol: scipy.integrate.OdeSolution or function
+    :param t_span: Interval of integration (start time and end time)
+    :type t_span: tuple
+    :param num_points: number of points of the default grid
+    :type num_points: int
+    :param stats: statistics of the solver (nfev, njev, nlu, accepted_steps, rejected_steps, status, message, success)
+                  and the method that was used (method)
+    :type stats: dict
+
+    :ivar sol: continuous solution
+    :vartype sol: scipy.integrate.OdeSolution or function
+    :ivar t_span: Interval of integration
+    :vartype t_span: tuple
+    :ivar num_points: number of points of the default grid
+    :vartype num_points: int
+    """
+
+    def __init__(self, sol, t_span, num_points, **stats):
+        self.sol = sol
+        self.t_span = t_span
+        self.num_points = num_points
+        self.t_events = None
+        self.y_events = None
+        self.nfev = stats.get('nfev', 0)
+        self.njev = stats.get('njev', 0)
+        self.nlu = stats.get('nlu', 0)
+        self.accepted_steps = stats.get('accepted_steps')
+        self.rejected_steps = stats.get('rejected_steps')
+        self.status = stats.get('status', 0)
+        self.message = stats.get('message', "")
+        self.success = stats.get('success', True)
+        self.method = stats.get('method')
+        self.grid = None
+
+    def __call__(self, t):
+        """
+        Method for evaluating the solution at the given times.
+
+        :param t: time or times
+        :type t: float or numpy.ndarray
+        :return: state at the given time (shape: number of states) or times (shape: number of states x number of times)
+        :rtype: numpy.ndarray
+        """
+        return self.sol(t)
+
+    def sample(self, num_points):
+        """
+        Method for evaluating the solution on a uniform grid over the interval of integration.
+
+        :param num_points: number of time points
+        :type num_points: int
+        :return: sampled solution with the attributes t and y like the result of solve_ivp()
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        t = linspace(self.t_span[0], self.t_span[1], num_points)
+        return OptimizeResult(t=t, y=self.sol(t), sol=self.sol, t_events=None, y_events=None, nfev=self.nfev,
+                              njev=self.njev, nlu=self.nlu, accepted_steps=self.accepted_steps,
+                              rejected_steps=self.rejected_steps, status=self.status, message=self.message,
+                              success=self.success, method=self.method)
+
+    @property
+    def t(self):
+        """
+        Time points of the default grid
+        """
+        if self.grid is None:
+            self.grid = self.sample(self.num_points)
+        return self.grid.t
+
+    @property
+    def y(self):
+        """
+        States on the default grid (shape: number of states x number of time points)
+        """
+        if self.grid is None:
+            self.grid = self.sample(self.num_points)
+        return self.grid.y
@@ -51,6 +51,10 @@ class Spring:
     :vartype length: float
     :ivar prestretch: prestretch of the spring in (m)
     :vartype prestretch: float
+    :ivar top_mass: mass at the startingpoint of the spring (None for the origin)
+    :vartype top_mass: object or None
+    :ivar bottom_mass: mass at the endpoint of the spring
+    :vartype bottom_mass: object or None
     """
     def __init__(self, stiffness, rest_length, index, type = "linear", color="black", linewidth=2):
         """
@@ -82,6 +86,10 @@ class Spring:
         self.sym_Fx = sp.Symbol("F_x"+str(self.index)) 
         self.sym_Fy = sp.Symbol("F_y"+str(self.index)) 
         self.sym_type = f"spring_type{self.index}"
+
+        # connected masses, set with the initial conditions
+        self.top_mass = None
+        self.bottom_mass = None
         
     def setInitialConditions(self,top_mass, bottom_mass, velocity):
         """
@@ -121,6 +129,10 @@ class Spring:
             raise AssertionError("Please insert a mass as second argument of the method")
 
 
+        # the connected masses define the topology of the system (see main_modeling.get_list_of_all_forces())
+        self.top_mass = top_mass
+        self.bottom_mass = bottom_mass
+
         self.velocity= velocity
         self.length = np.sqrt((self.endpoint[0]-self.startingpoint[0])**2 + (self.endpoint[1]-self.startingpoint[1])**2)
         self.prestretch =  self.length - self.rest_length
@@ -0,0 +1,117 @@
+from concurrent.futures import ProcessPoolExecutor
+from numpy import concatenate
+from numpy.random import default_rng
+from newton import solver_options, solve_states, SOLVERS, IMPLICIT_METHODS
+
+# kernels and indices of their integrated coordinates that were sent to this (worker) process by init_worker()
+worker_kernels = []
+
+
+def init_worker(kernels):
+    """
+    Method that is executed once in every worker process when the process pool is started.
+    The kernels are transferred as generated source code (see newton.Kernel.__getstate__()) and compiled again,
+    so the workers never derive or lambdify the equations of motion.
+
+    :param kernels: kernels of all topologies that are simulated and the indices of their integrated coordinates
+                    (see newton.Mechanics.reduced_kernel())
+    :type kernels: list of tuples
+    """
+    worker_kernels[:] = kernels
+
+
+def simulate_job(job):
+    """
+    Method to simulate one job in a worker process like newton.Mechanics.simulate(): only the coordinates with forces
+    are integrated and the result has the full state, the step counts and the method (see newton.solve_states()).
+
+    :param job: (index of the kernel, parameter vector, initial conditions, settings of the simulation). The settings
+                are a newton.SolverConfig.
+    :type job: tuple
+    :return: See documentation of solve_ivp()
+    :rtype: scipy.integrate.OdeSolution
+    """
+    kernel_index, p, init_cond, config = job
+    kernel, active = worker_kernels[kernel_index]
+    states = concatenate((active, len(init_cond) // 2 + active))
+
+    options = solver_options(config.method, states, config.rtol, config.atol, config.max_step,
+                             lambda dense: kernel.jacobian(p, dense))
+
+    return solve_states(kernel.rhs(p), init_cond, states, config.t_span, config.num_points, config.method, options)
+
+
+def run_jobs(kernels, jobs, max_workers=None):
+    """
+    Method to run independent simulation jobs in parallel on a process pool.
+    Every kernel is sent only once to every worker (when the worker is started). The jobs only reference the kernel
+    by its index and contain the numeric data (parameter vector, initial conditions, ...).
+    The methods of the jobs are checked before the pool is started. Only the solvers of solve_ivp() can be used,
+    the other methods of newton.Mechanics.simulate() need the symbolic equations or the whole system.
+    The results are returned in the order of the jobs.
+
+    :param kernels: kernels of all topologies that are simulated and the indices of their integrated coordinates
+                    (see newton.Mechanics.reduced_kernel())
+    :type kernels: list of tuples
+    :param jobs: jobs (see simulate_job())
+    :type jobs: list of tuples
+    :param max_workers: number of worker processes, default is None (number of processors)
+    :type max_workers: int or None
+    :return: results of all jobs
+    :rtype: list of scipy.integrate.OdeSolution
+    """
+    for kernel_index, p, init_cond, config in jobs:
+        if config.method not in SOLVERS:
+            raise ValueError(f'Method "{config.method}" can\'t be used in parallel runs '
+                             f'(available: {", ".join(SOLVERS)}).')
+        if config.dense:
+            raise ValueError("Parallel runs have no dense output.")
+
+    for kernel_index, p, init_cond, config in jobs:
+        # compile everything the workers need before the kernels are pickled
+        kernel = kernels[kernel_index][0]
+        kernel.acceleration_function()
+        if config.method in IMPLICIT_METHODS:
+            kernel.jacobian(p)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(kernels,)) as executor:
+        return list(executor.map(simulate_job, jobs))
+
+
+def sample_parameters(param_values, distributions, num_samples, seed=None):
+    """
+    Method for creating randomly perturbed parameter values for Monte Carlo simulations.
+    Every perturbed parameter is multiplied by (1 + sample) where the samples are drawn from the given distribution.
+    The random number generator is seeded, so the same seed always creates the same samples.
+
+    :param param_values: nominal parameter values of the system
+    :type param_values: dictionary
+    :param distributions: relative perturbation of the parameters. The keys are the names of the parameters
+                          (e.g. "k1", "m2"), the values are the name of a distribution of numpy.random.Generator and
+                          its arguments. E.g. {"k1": ("normal", 0, 0.05)} for a standard deviation of 5 %.
+    :type distributions: dictionary
+    :param num_samples: number of samples
+    :type num_samples: int
+    :param seed: seed of the random number generator, default is None
+    :type seed: int or None
+    :return: parameter values of every sample and table of the sampled values (one column per perturbed parameter)
+    :rtype: tuple
+    """
+    rng = default_rng(seed)
+    symbols_by_name = {str(key): key for key in param_values}
+
+    table = {}
+    for name, (distribution, *args) in distributions.items():
+        if name not in symbols_by_name:
+            raise ValueError(f"Unknown parameter {name}.")
+        samples = getattr(rng, distribution)(*args, size=num_samples)
+        table[name] = float(param_values[symbols_by_name[name]]) * (1 + samples)
+
+    param_sets = []
+    for j in range(num_samples):
+        sample = dict(param_values)
+        for name, values in table.items():
+            sample[symbols_by_name[name]] = values[j]
+        param_sets.append(sample)
+
+    return param_sets, table
@@ -1,10 +1,29 @@
 from netCDF4 import Dataset
-from sympy import sympify
-from numpy import array
+from sympy import sympify, Symbol
+from numpy import array, asarray, arange, concatenate, empty
+from scipy.optimize import OptimizeResult
 from os import path, remove
+from time import perf_counter
 from additions import eq_to_latex
+from metrics import timed
 
-def save(file_name="data.nc", data=None, names=None):
+# size of the chunks of the states in the layout of save_states() in bytes
+CHUNK_BYTES = 2 ** 20
+
+# columns of the element tables of the model (see save_model())
+MASS_TABLE = ("mass_type", "mass_index", "mass", "external_force", "x_dim", "y_dim", "z_dim", "density")
+SPRING_TABLE = ("spring_type", "spring_index", "stiffness", "rest_length", "top", "bottom")
+
+# the appended results of a StreamWriter are written to the file at least every FLUSH_INTERVAL seconds or when
+# FLUSH_BYTES bytes of states are buffered
+FLUSH_INTERVAL = 5.0
+FLUSH_BYTES = 64 * 2 ** 20
+
+# zlib compression level of the layout of save_states() (1: fastest, 9: smallest, higher levels hardly reduce the
+# size of simulation results)
+COMPRESSION_LEVEL = 1
+
+def save(file_name="data.nc", data=None, names=None, attributes=None):
     """
     Method for saving the simulated data (and symbolic equation). To save data it uses the netCDF4 library
     that is based on HDF5. HDF5 uses optimized structures and algorithms to allow an efficient saving
@@ -19,6 +38,8 @@ def save(file_name="data.nc", data=None, names=None):
     :type data: list
     :param names: names of the corresponding data (like keys for python dictionaries)
     :type names: list
+    :param attributes: global attributes of the file (numbers, strings or numeric arrays), default is None
+    :type attributes: dict
     """
 
     # check if ".nc" is already in file name
@@ -50,16 +71,229 @@ def save(file_name="data.nc", data=None, names=None):
     for n, d in zip(data_names, data):
         data_file.variables[n][:] = d[:]
 
+    # write global attributes (e.g. solver settings)
+    if attributes is not None:
+        data_file.setncatts(attributes)
+
     # close file
     data_file.close()
 
 
-def save_system(file_name="data.nc", sim_res=None, system=None,  names=None):
+def chunk_points(num_states):
+    """
+    Method for computing the number of time points of a chunk of the states (see save_states()).
+    A chunk holds all states of about CHUNK_BYTES bytes of consecutive time points.
+
+    :param num_states: number of states
+    :type num_states: int
+    :return: number of time points per chunk
+    :rtype: int
+    """
+    return max(1, CHUNK_BYTES // (8 * max(1, num_states)))
+
+
+def element_tables(list_of_object_lists):
+    """
+    Method for creating the element tables of a system of masses and springs (one row per element).
+    The masses have their type ("masspoint" or "steady body"), index, mass, external force and for steady bodies
+    their dimensions and density (zero for masspoints). The springs have their type ("linear" or "cubic"), index,
+    stiffness, rest length and the rows of the connected masses (top is -1 for springs attached to the origin).
+
+    :param list_of_object_lists: List containing lists of Spring and Mass objects (with initial conditions)
+    :type list_of_object_lists: list of lists of objects
+    :return: columns of the tables (see MASS_TABLE and SPRING_TABLE)
+    :rtype: dictionary
+    """
+    list_of_springs, list_of_mass = list_of_object_lists
+    mass_index = {id(mass): i for i, mass in enumerate(list_of_mass)}
+    steady = [mass.type == "steady body" for mass in list_of_mass]
+
+    return {"mass_type": array([mass.type for mass in list_of_mass], dtype=object),
+            "mass_index": array([mass.index for mass in list_of_mass], dtype="i4"),
+            "mass": array([mass.mass for mass in list_of_mass], dtype=float),
+            "external_force": array([mass.external_force for mass in list_of_mass], dtype=float),
+            "x_dim": array([mass.x_dim if s else 0 for mass, s in zip(list_of_mass, steady)], dtype=float),
+            "y_dim": array([mass.y_dim if s else 0 for mass, s in zip(list_of_mass, steady)], dtype=float),
+            "z_dim": array([mass.z_dim if s else 0 for mass, s in zip(list_of_mass, steady)], dtype=float),
+            "density": array([mass.density if s else 0 for mass, s in zip(list_of_mass, steady)], dtype=float),
+            "spring_type": array([spring.type for spring in list_of_springs], dtype=object),
+            "spring_index": array([spring.index for spring in list_of_springs], dtype="i4"),
+            "stiffness": array([spring.stiffness for spring in list_of_springs], dtype=float),
+            "rest_length": array([spring.rest_length for spring in list_of_springs], dtype=float),
+            "top": array([-1 if spring.top_mass is None else mass_index[id(spring.top_mass)]
+                          for spring in list_of_springs], dtype="i4"),
+            "bottom": array([mass_index[id(spring.bottom_mass)] for spring in list_of_springs], dtype="i4")}
+
+
+def save_model(data_file, list_of_object_lists, g=9.81):
+    """
+    Method for saving the model as element tables in the group "model" of an open file (see element_tables()).
+    The columns of the masses have the dimension "mass", the columns of the springs the dimension "spring".
+    The tables are read without sympy (see load_model()), the equations can be derived again from them.
+
+    :param data_file: file opened for writing
+    :type data_file: netCDF4.Dataset
+    :param list_of_object_lists: List containing lists of Spring and Mass objects (with initial conditions)
+    :type list_of_object_lists: list of lists of objects
+    :param g: gravitational acceleration in (m/s^2), default is 9.81
+    :type g: float
+    """
+    tables = element_tables(list_of_object_lists)
+
+    model = data_file.createGroup("model")
+    model.createDimension("mass", size=len(tables["mass"]))
+    model.createDimension("spring", size=len(tables["stiffness"]))
+    for columns, dimension in ((MASS_TABLE, "mass"), (SPRING_TABLE, "spring")):
+        for name in columns:
+            column = tables[name]
+            variable = model.createVariable(name, str if column.dtype == object else column.dtype, (dimension,))
+            variable[:] = column
+    model.g = g
+
+
+def load_model(data_file):
+    """
+    Method for loading the element tables of the model from an open file (see save_model()).
+
+    :param data_file: file opened for reading
+    :type data_file: netCDF4.Dataset
+    :return: columns of the tables (see element_tables()) and the gravitational acceleration "g",
+             None if the file has no model
+    :rtype: dictionary or None
+    """
+    if "model" not in data_file.groups:
+        return None
+
+    model = data_file.groups["model"]
+    tables = {name: model.variables[name][:] for name in MASS_TABLE + SPRING_TABLE}
+    tables["g"] = float(model.g)
+
+    return tables
+
+
+def create_states(data_file, num_states):
+    """
+    Method for creating the variables of the layout of save_states() in an open file: the unlimited dimension "time",
+    the time points and the chunked and compressed states.
+
+    :param data_file: file opened for writing
+    :type data_file: netCDF4.Dataset
+    :param num_states: number of states
+    :type num_states: int
+    :return: variables of the time points and the states
+    :rtype: tuple of netCDF4.Variable
+    """
+    chunk = chunk_points(num_states)
+
+    data_file.createDimension("time", size=None)
+    data_file.createDimension("state", size=num_states)
+
+    time_var = data_file.createVariable("time", "f8", ("time",), zlib=True, complevel=COMPRESSION_LEVEL,
+                                        shuffle=True, chunksizes=(chunk * num_states,))
+    states_var = data_file.createVariable("states", "f8", ("time", "state"), zlib=True, complevel=COMPRESSION_LEVEL,
+                                          shuffle=True, chunksizes=(chunk, num_states))
+
+    return time_var, states_var
+
+
+def save_strings(data_file, sym_data):
+    """
+    Method for saving the strings of the mechanical system (see system_strings()) in the variable "system" of an open
+    file.
+
+    :param data_file: file opened for writing
+    :type data_file: netCDF4.Dataset
+    :param sym_data: strings of the mechanical system
+    :type sym_data: list of str
+    """
+    data_file.createDimension("entry", size=len(sym_data))
+    system_var = data_file.createVariable("system", str, ("entry",))
+    for i, entry in enumerate(sym_data):
+        system_var[i] = entry
+
+
+def save_states(file_name="data.nc", t=None, y=None, sym_data=None, attributes=None, elements=None, g=9.81):
+    """
+    Method for saving the simulated data in one two-dimensional variable. The layout of save() creates one dimension
+    and one uncompressed variable per row, so the file is large and reading a time window touches every variable.
+    Here the time points and the states share the dimension "time":
+
+    * "time" (time): time points
+    * "states" (time, state): states at every time point
+    * "system" (entry): strings of the mechanical system (see save_system()), only if there are no element tables
+    * group "model": element tables of the system (see save_model())
+
+    The states are stored in chunks of consecutive time points with all states (see chunk_points()) and compressed
+    with zlib and the shuffle filter, so a time window is read from a few chunks. The dimension "time" is unlimited.
+
+    :param file_name: name of the wanted file (with or without .nc)
+    :type file_name: str
+    :param t: time points
+    :type t: numpy.ndarray
+    :param y: states at the time points (shape: number of states x number of time points)
+    :type y: numpy.ndarray
+    :param sym_data: strings of the mechanical system, default is None (not saved)
+    :type sym_data: list of str
+    :param attributes: global attributes of the file (numbers, strings or numeric arrays), default is None
+    :type attributes: dict
+    :param elements: List containing lists of Spring and Mass objects of the system, default is None (not saved)
+    :type elements: list of lists of objects
+    :param g: gravitational acceleration of the system in (m/s^2), default is 9.81
+    :type g: float
+    """
+
+    # check if ".nc" is already in file name
+    if ".nc" in file_name:
+        name_str = file_name
+    else:
+        name_str = file_name + ".nc"
+
+    t = asarray(t, dtype=float)
+    y = asarray(y, dtype=float)
+
+    data_file = Dataset(name_str, "w")
+    time_var, states_var = create_states(data_file, y.shape[0])
+    time_var[:] = t
+    states_var[:] = y.T
+
+    if sym_data is not None:
+        save_strings(data_file, sym_data)
+    if elements is not None:
+        save_model(data_file, elements, g)
+
+    # write global attributes (e.g. solver settings)
+    if attributes is not None:
+        data_file.setncatts(attributes)
+
+    data_file.close()
+
+
+def system_strings(system):
+    """
+    Method for getting the strings of the symbolic properties of a mechanical system
+    (param_values, parameters, coordinates, velocities, accelerations, forces of the masses, constraints).
+
+    :param system: mechanical system
+    :type system: Newton System
+    :return: strings of the mechanical system
+    :rtype: numpy.ndarray
+    """
+    # get masses to save forces
+    masses = [str(system.parameters[key]['mass']) for key in system.parameters]
+    forces = [system.forces.get(mass, []) for mass in masses]
+
+    return array([str(system.param_values), str(system.parameters), str(system.coordinates),
+                  str(system.velocities), str(system.accelerations), str(forces), str(system.constraints)])
+
+
+def save_system(file_name="data.nc", sim_res=None, system=None,  names=None, config=None):
     """
     Method for saving the simulated data and the mechanical system. This method is based on the save() function
     that uses the netCDF4 library. It is optimized to save simulation data and the simulated system itself.
     It takes the simulated data and the important properties of the mechanical system
-    (that are needed to reconstruct the system) and saves the data by creating a list that is passed to the save() function.
+    (that are needed to reconstruct the system) and saves the data in one chunked and compressed variable
+    (see save_states()). Systems of main_modeling.build_system() are saved as element tables (see save_model()),
+    other systems as strings of their symbolic properties.
 
     :param file_name: name of the wanted file (with or without .nc)
     :type file_name: str
@@ -67,27 +301,157 @@ def save_system(file_name="data.nc", sim_res=None, system=None,  names=None):
     :type sim_res: str
     :param system: mechanical system
     :type system: Newton System
-    :param names: names of the corresponding data (like keys for python dictionaries)
+    :param names: names of the corresponding data (like keys for python dictionaries), if names are given the data is
+                  saved in the layout of save() with one variable per row, default is None
     :type names: list
+    :param config: settings of the simulation, saved as global attributes of the file, default is None
+    :type config: newton.SolverConfig
     """
-    tex_save(file_name, system)
+    with timed("saving"):
+        tex_save(file_name, system)
 
-    # get masses to save forces
-    masses = [str(system.parameters[key]['mass']) for key in system.parameters]
-    forces = [system.forces.get(mass, []) for mass in masses]
-    # save system
-    sym_data = array(
-        [str(system.param_values), str(system.parameters), str(system.coordinates),
-         str(system.velocities), str(system.accelerations), str(forces), str(system.constraints)])
+        attributes = None if config is None else config.attributes()
+        if system.elements is not None and names is None:
+            save_states(file_name, sim_res.t, sim_res.y, attributes=attributes, elements=system.elements,
+                        g=float(system.param_values.get(Symbol("g"), 9.81)))
+            return
+
+        sym_data = system_strings(system)
 
-    # save time
-    save_data = [sim_res.t]
+        if names is None:
+            save_states(file_name, sim_res.t, sim_res.y, sym_data, attributes)
+            return
 
-    # save simulation result
-    save_data.extend(sim_res.y)
-    save_data.append(sym_data)
+        # save time
+        save_data = [sim_res.t]
 
-    save(file_name, save_data, names)
+        # save simulation result
+        save_data.extend(sim_res.y)
+        save_data.append(sym_data)
+
+        save(file_name, save_data, names, attributes)
+
+
+class StreamWriter:
+    """
+    Writer that saves the simulation results while the simulation is running, so a long run doesn't have to be held
+    in memory and the results up to the last flush are kept if the process dies. The file is created in the layout of
+    save_states() when the writer is created and the chunks of the simulation (see
+    newton.Mechanics.simulate_chunks()) are appended along the unlimited dimension "time" (see append()).
+
+    The element tables of the system (see save_model()) are written when the writer is created, because they are
+    known before the run. The first chunk is written at once (it holds the initial state), the following chunks are
+    buffered and written at least every flush_interval seconds or when flush_bytes bytes of states are buffered
+    (see flush()). The file is only opened to write the buffer and closed again, so between the flushes it is a valid
+    file that can be loaded like a finished file (see main_modeling.load_model_file()). finish() writes the rest of
+    the buffer and the equations in LaTeX format (and the strings of systems without element tables) like
+    save_system().
+
+    :param file_name: name of the wanted file (with or without .nc)
+    :type file_name: str
+    :param num_states: number of states
+    :type num_states: int
+    :param config: settings of the simulation, saved as global attributes of the file, default is None
+    :type config: newton.SolverConfig
+    :param elements: List containing lists of Spring and Mass objects of the system, default is None (the system is
+                     saved as strings by finish())
+    :type elements: list of lists of objects
+    :param g: gravitational acceleration of the system in (m/s^2), default is 9.81
+    :type g: float
+    :param flush_interval: maximum time in seconds between two flushes, default is FLUSH_INTERVAL
+    :type flush_interval: float
+    :param flush_bytes: maximum size of the buffered states in bytes, default is FLUSH_BYTES
+    :type flush_bytes: int
+
+    :ivar num_points: number of time points written to the file
+    :vartype num_points: int
+    """
+
+    def __init__(self, file_name, num_states, config=None, elements=None, g=9.81, flush_interval=FLUSH_INTERVAL,
+                 flush_bytes=FLUSH_BYTES):
+        self.file_name = file_name
+        # check if ".nc" is already in file name
+        if ".nc" in file_name:
+            self.name_str = file_name
+        else:
+            self.name_str = file_name + ".nc"
+        self.num_states = num_states
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.num_points = 0
+        self.buffer = []
+        self.buffered_bytes = 0
+
+        self.model_saved = elements is not None
+
+        data_file = Dataset(self.name_str, "w")
+        create_states(data_file, num_states)
+        if elements is not None:
+            save_model(data_file, elements, g)
+        # write global attributes (e.g. solver settings)
+        if config is not None:
+            data_file.setncatts(config.attributes())
+        data_file.close()
+        self.last_flush = perf_counter()
+
+    def append(self, t, y):
+        """
+        Method for appending a chunk of the simulation results. The buffer is written to the file if nothing was
+        written yet, if the last flush is longer than flush_interval ago or if the buffer is full.
+
+        :param t: time points of the chunk
+        :type t: numpy.ndarray
+        :param y: states at the time points (shape: number of states x number of time points)
+        :type y: numpy.ndarray
+        """
+        t = asarray(t, dtype=float)
+        y = asarray(y, dtype=float)
+        self.buffer.append((t, y))
+        self.buffered_bytes += y.nbytes
+
+        # the first chunk holds the initial state that is needed to load the file
+        if self.num_points == 0 or self.buffered_bytes >= self.flush_bytes \
+                or perf_counter() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Method for writing the buffered chunks to the end of the file.
+        """
+        if self.buffer:
+            with timed("saving"):
+                t = concatenate([chunk[0] for chunk in self.buffer])
+                y = concatenate([chunk[1] for chunk in self.buffer], axis=1)
+
+                data_file = Dataset(self.name_str, "a")
+                start, stop = self.num_points, self.num_points + len(t)
+                data_file.variables["time"][start:stop] = t
+                data_file.variables["states"][start:stop] = y.T
+                data_file.close()
+
+            self.num_points = stop
+            self.buffer = []
+            self.buffered_bytes = 0
+        self.last_flush = perf_counter()
+
+    def finish(self, system):
+        """
+        Method for finishing the file: the buffer is written and the equations are saved in LaTeX format like in
+        save_system(). Systems without element tables are saved as strings of their symbolic properties.
+
+        :param system: mechanical system
+        :type system: Newton System
+        """
+        self.flush()
+
+        with timed("saving"):
+            tex_save(self.file_name, system)
+
+            if not self.model_saved:
+                data_file = Dataset(self.name_str, "a")
+                save_strings(data_file, system_strings(system))
+                data_file.close()
+                self.model_saved = True
 
 
 def load(file_name="data.nc", num_data=(0,)):
@@ -149,31 +513,308 @@ def load(file_name="data.nc", num_data=(0,)):
     return data_set
 
 
-def load_system(file_name="data.nc"):
+def load_attributes(file_name="data.nc"):
+    """
+    Method for loading the global attributes of a file (e.g. the settings of the simulation).
+
+    :param file_name: name of the file you want to load (with or without .nc)
+    :type file_name: str
+    :return: global attributes (empty if there are none)
+    :rtype: dict
+    """
+
+    # check if ".nc" is already in file name
+    if ".nc" in file_name:
+        name_str = file_name
+    else:
+        name_str = file_name + ".nc"
+
+    data_file = Dataset(name_str, 'r')
+    attributes = {key: data_file.getncattr(key) for key in data_file.ncattrs()}
+    data_file.close()
+
+    return attributes
+
+
+def search_time(time_var, t, right=False):
+    """
+    Method for finding the index of the first stored time point that is not before the time t (binary search).
+    The time points are read one by one, so only the chunks of the visited points are read from the file.
+
+    :param time_var: stored time points (increasing)
+    :type time_var: netCDF4.Variable
+    :param t: time
+    :type t: float
+    :param right: find the first time point after t instead, default is False
+    :type right: bool
+    :return: index of the first time point >= t (> t if right is True), number of time points if there is none
+    :rtype: int
+    """
+    low, high = 0, len(time_var)
+    while low < high:
+        middle = (low + high) // 2
+        value = time_var[middle]
+        if value < t or (right and value == t):
+            low = middle + 1
+        else:
+            high = middle
+
+    return low
+
+
+class LazyResults:
+    """
+    Lazy simulation results of a saved file. Only the sizes and the first and last time point are read when the
+    results are opened, the states are read when they are needed: a time window (see window()), the points of a plot
+    or the frames of an animation (see sample()) or a single time point (see state()). The time window is found by a
+    binary search on the stored time points (see search_time()), so only the chunks of the window are read and
+    decompressed. The file is opened for every read and is not kept open.
+    The attributes t and y read all time points and states when they are used for the first time, so the results can
+    be used like the result of solve_ivp().
+
+    Files in the layout of save_states() and files with one variable per row (see save()) are read.
+
+    :param file_name: name of the file you want to load (with or without .nc)
+    :type file_name: str
+
+    :ivar num_points: number of stored time points
+    :vartype num_points: int
+    :ivar num_states: number of states
+    :vartype num_states: int
+    :ivar t_span: first and last stored time point (None if there are no time points yet)
+    :vartype t_span: tuple or None
+    """
+
+    def __init__(self, file_name="data.nc"):
+        # check if ".nc" is already in file name
+        if ".nc" in file_name:
+            self.file_name = file_name
+        else:
+            self.file_name = file_name + ".nc"
+
+        with Dataset(self.file_name, 'r') as data_file:
+            variables = data_file.variables
+            # layout of save_states() or layout of save() (time, one variable per state and the system)
+            self.chunked = "states" in variables
+            time_var = variables["time"] if self.chunked else list(variables.values())[0]
+            self.num_points = len(time_var)
+            if self.chunked:
+                self.num_states = variables["states"].shape[1]
+            else:
+                self.num_states = len(variables) - 2
+            # a StreamWriter that hasn't flushed yet has no time points
+            self.t_span = (float(time_var[0]), float(time_var[-1])) if self.num_points else None
+        self.full = None
+
+    def index(self, t, right=False):
+        """
+        Method for finding the index of the first stored time point that is not before the time t
+        (see search_time()).
+
+        :param t: time
+        :type t: float
+        :param right: find the first time point after t instead, default is False
+        :type right: bool
+        :return: index of the time point
+        :rtype: int
+        """
+        with Dataset(self.file_name, 'r') as data_file:
+            variables = data_file.variables
+            return search_time(variables["time"] if self.chunked else list(variables.values())[0], t, right)
+
+    def read(self, start, stop, step=1, states=None):
+        """
+        Method for reading the time points start to stop (without stop) with the given step.
+        The states are read in blocks of consecutive time points (see chunk_points()) and thinned in memory,
+        because a strided read from the file reads every point on its own.
+
+        :param start: index of the first time point
+        :type start: int
+        :param stop: index after the last time point
+        :type stop: int
+        :param step: step between the read time points, default is 1
+        :type step: int
+        :param states: indices of the states to read, default is None (all states)
+        :type states: list of int
+        :return: read results with the attributes t and y (shape: number of read states x number of read time points)
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        start, stop, _ = slice(start, stop).indices(self.num_points)
+        stop = max(start, stop)
+        indices = arange(self.num_states) if states is None else asarray(states, dtype=int)
+
+        with Dataset(self.file_name, 'r') as data_file:
+            data_file.set_auto_mask(False)
+            variables = data_file.variables
+            if self.chunked:
+                time_var = variables["time"]
+                states_var = variables["states"]
+            else:
+                data = list(variables.values())
+                time_var = data[0]
+                row_vars = [data[1 + i] for i in indices]
+
+            block = chunk_points(self.num_states) * step
+            t_blocks = []
+            y_blocks = []
+            for begin in range(start, stop, block):
+                end = min(begin + block, stop)
+                t_blocks.append(time_var[begin:end][::step])
+                if self.chunked:
+                    y_blocks.append(states_var[begin:end][::step, indices].T)
+                else:
+                    y_blocks.append(array([var[begin:end][::step] for var in row_vars]).reshape(len(indices), -1))
+
+        t = concatenate(t_blocks) if t_blocks else empty(0)
+        y = concatenate(y_blocks, axis=1) if y_blocks else empty((len(indices), 0))
+        return OptimizeResult(t=t, y=y)
+
+    def window(self, t_start=None, t_end=None, states=None, max_points=None):
+        """
+        Method for reading the time points of a time window. The window starts at the first time point that is not
+        before t_start and ends at the last time point that is not after t_end.
+
+        :param t_start: start time of the window, default is None (first time point)
+        :type t_start: float
+        :param t_end: end time of the window, default is None (last time point)
+        :type t_end: float
+        :param states: indices of the states to read, default is None (all states)
+        :type states: list of int
+        :param max_points: maximum number of read time points (every n-th point is read), default is None (all points)
+        :type max_points: int
+        :return: results of the window with the attributes t and y
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        start = 0 if t_start is None else self.index(t_start)
+        stop = self.num_points if t_end is None else self.index(t_end, right=True)
+        step = 1 if max_points is None else max(1, -(-(stop - start) // max_points))
+
+        return self.read(start, stop, step, states)
+
+    def sample(self, num_points, states=None):
+        """
+        Method for reading about num_points evenly spaced stored time points (e.g. the points of a plot or the frames
+        of an animation). Every n-th time point is read, so the sample can have less points than num_points.
+
+        :param num_points: maximum number of time points
+        :type num_points: int
+        :param states: indices of the states to read, default is None (all states)
+        :type states: list of int
+        :return: sampled results with the attributes t and y
+        :rtype: scipy.optimize.OptimizeResult
+        """
+        return self.window(states=states, max_points=num_points)
+
+    def state(self, index):
+        """
+        Method for reading the states of one stored time point (e.g. the initial conditions).
+
+        :param index: index of the time point (negative indices count from the end)
+        :type index: int
+        :return: states at the time point
+        :rtype: numpy.ndarray
+        """
+        index = index % self.num_points
+        return self.read(index, index + 1).y[:, 0]
+
+    @property
+    def t(self):
+        """
+        All stored time points
+        """
+        if self.full is None:
+            self.full = self.read(0, self.num_points)
+        return self.full.t
+
+    @property
+    def y(self):
+        """
+        All stored states (shape: number of states x number of time points)
+        """
+        if self.full is None:
+            self.full = self.read(0, self.num_points)
+        return self.full.y
+
+
+def load_system(file_name="data.nc", lazy=False):
     """
     Method for loading the simulation results and the simulated system.
-    This method is based on the load() function that uses the netCDF4 library.
+    This method uses the netCDF4 library.
     It is optimized to load simulation data and the simulated system itself. It exports the simulated results
     and the properties of mechanical system to a dictionary for an easy access. After that the simulation results
     can be plotted and the mechanical system can be reconstructed.
 
+    Files in the layout of save_states() and files with one variable per row (see save()) are loaded.
+    The element tables of files with a model (see save_model()) are read without sympy, so the symbolic system is
+    only created when it is needed (see main_modeling.load_sys()).
+
     :param file_name: name of the file you want to load (with or without .nc)
     :type file_name: str
-    :return: data loaded from file {time,results,system}
+    :param lazy: read the results only when they are needed (see LazyResults), time is None and results is a
+                 LazyResults object, default is False
+    :type lazy: bool
+    :return: data loaded from file {time,results,system,elements,solver_config}
+             (results has one row per state, system contains the symbolic properties of files without element
+             tables and is None otherwise (and for running StreamWriters without element tables), elements contains the element
+             tables (see load_model()) and is None for files without them, solver_config contains the settings of the simulation, it is empty for files
+             without settings)
     :rtype: dictionary
     """
 
-    data = load(file_name, num_data=(0,))
-    loaded_data = {'time': data[0][:],
-                   'results': [d[:] for d in data[1:-1]],
-                   'system': {'param_values': sympify(data[-1][0]),
-                              'masses': list(sympify(data[-1][1]).keys()),
-                              'coordinates': sympify(data[-1][2]),
-                              'velocities': sympify(data[-1][3]),
-                              'accelerations': sympify(data[-1][4]),
-                              'forces': sympify(data[-1][5]),
-                              'constraints': sympify(data[-1][6])
-                              }
+    # check if ".nc" is already in file name
+    if ".nc" in file_name:
+        name_str = file_name
+    else:
+        name_str = file_name + ".nc"
+
+    data_file = Dataset(name_str, 'r')
+    try:
+        # plain arrays instead of masked arrays (the results have no missing values)
+        data_file.set_auto_mask(False)
+        elements = load_model(data_file)
+        if lazy:
+            # only the strings of the system are read now (see LazyResults)
+            time = None
+            results = LazyResults(name_str)
+            if elements is not None:
+                sym_data = None
+            elif "states" in data_file.variables:
+                # running StreamWriters of systems without element tables haven't saved the system yet
+                sym_data = data_file.variables["system"][:] if "system" in data_file.variables else None
+            else:
+                sym_data = list(data_file.variables.values())[-1][:]
+        elif "states" in data_file.variables:
+            # layout of save_states()
+            time = data_file.variables["time"][:]
+            results = data_file.variables["states"][:].T
+            # running StreamWriters of systems without element tables haven't saved the system yet
+            saved = elements is None and "system" in data_file.variables
+            sym_data = data_file.variables["system"][:] if saved else None
+        else:
+            # layout of save(): time, one variable per state and the strings of the system
+            data = list(data_file.variables.values())
+            time = data[0][:]
+            results = array([d[:] for d in data[1:-1]])
+            sym_data = data[-1][:]
+    finally:
+        data_file.close()
+
+    system = None
+    if sym_data is not None:
+        system = {'param_values': sympify(sym_data[0]),
+                  'masses': list(sympify(sym_data[1]).keys()),
+                  'coordinates': sympify(sym_data[2]),
+                  'velocities': sympify(sym_data[3]),
+                  'accelerations': sympify(sym_data[4]),
+                  'forces': sympify(sym_data[5]),
+                  'constraints': sympify(sym_data[6])
+                  }
+
+    loaded_data = {'time': time,
+                   'results': results,
+                   'system': system,
+                   'elements': elements,
+                   'solver_config': load_attributes(file_name)
                    }
     return loaded_data
 
@@ -0,0 +1,76 @@
+import objects
+import main_modeling
+
+
+def create_branched():
+    """
+    Creates a branched and looped network: m1 hangs from the origin, m2 and m3 hang from m1 and m4 hangs from m2 and
+    m3. The springs are not in the order of a chain.
+    """
+    masses = [objects.Masspoint(mass=1, index=i, external_force=0) for i in range(1, 5)]
+    for mass, position in zip(masses, ([0, -0.5], [-0.3, -1.0], [0.3, -1.0], [0, -1.5])):
+        mass.setInitialConditions(position, [0, 0])
+
+    connections = [(None, 0), (0, 1), (0, 2), (1, 3), (2, 3)]
+    springs = []
+    for j, (top, bottom) in enumerate(connections):
+        spring = objects.Spring(stiffness=100, rest_length=0.4, index=j + 1)
+        spring.setInitialConditions(None if top is None else masses[top], masses[bottom], [0, 0])
+        springs.append(spring)
+
+    return [springs, masses]
+
+
+def test_static_equilibrium_keeps_topology_of_branched_network():
+    list_of_object_lists = create_branched()
+    key = main_modeling.topology_key(list_of_object_lists)
+
+    positions, prestretches, system = main_modeling.run_static_equilibrium(list_of_object_lists)
+
+    assert main_modeling.topology_key(list_of_object_lists) == key
+    assert len(prestretches) == 5
+    # m2 and m3 hang symmetrically below m1
+    assert abs(positions[1][1] - positions[2][1]) < 1e-9
+
+
+def test_equilibrium_as_initial_conditions_keeps_topology():
+    list_of_object_lists = create_branched()
+    key = main_modeling.topology_key(list_of_object_lists)
+
+    main_modeling.run_static_equilibrium(list_of_object_lists, set_equilibrium=True)
+
+    assert main_modeling.topology_key(list_of_object_lists) == key
+    springs, masses = list_of_object_lists
+    assert springs[4].top_mass is masses[2] and springs[4].bottom_mass is masses[3]
+
+
+def create_cubic_chain(num_masses=3):
+    """
+    Creates a chain of cubic springs that start at their rest length, so the stiffness matrix at the start is zero.
+    """
+    masses = [objects.Masspoint(mass=1, index=i, external_force=0) for i in range(1, num_masses + 1)]
+    springs = []
+    for i, mass in enumerate(masses):
+        mass.setInitialConditions([0, -0.5 * (i + 1)], [0, 0])
+        spring = objects.Spring(stiffness=100, rest_length=0.5, index=i + 1, type="cubic")
+        spring.setInitialConditions(masses[i - 1] if i > 0 else None, mass, [0, 0])
+        springs.append(spring)
+
+    return [springs, masses]
+
+
+def test_static_equilibrium_of_cubic_springs_at_rest_length():
+    list_of_object_lists = create_cubic_chain()
+
+    positions, prestretches, system = main_modeling.run_static_equilibrium(list_of_object_lists)
+
+    # spring i carries the weight of the masses below it: k*stretch^3 = n*m*g
+    for i, stretch in enumerate(prestretches):
+        assert abs(stretch - ((3 - i) * 9.81 / 100) ** (1 / 3)) < 1e-8
+
+
+def test_modal_analysis_of_cubic_springs_at_rest_length():
+    frequencies = main_modeling.run_modal_analysis(create_cubic_chain())[0]
+
+    assert len(frequencies) == 3
+    assert all(frequencies > 0)
@@ -0,0 +1,77 @@
+import pytest
+from numpy import allclose, abs, log2, cos, linspace, array
+from integrators import composition_weights, integrate_symplectic
+import main_modeling
+
+
+def test_composition_weights():
+    for order in (2, 4, 6, 8):
+        weights = composition_weights(order)
+        assert len(weights) == 3 ** (order // 2 - 1)
+        assert allclose(sum(weights), 1)
+        # symmetric composition
+        assert allclose(weights, weights[::-1])
+
+    with pytest.raises(ValueError):
+        composition_weights(3)
+
+
+@pytest.mark.parametrize("order", [2, 4, 6])
+def test_order_of_convergence(order):
+    # harmonic oscillator with omega = 2, exact solution q = cos(2t)
+    def acc(q):
+        return -4 * q
+
+    errors = []
+    for num_points in (41, 81):
+        t_eval = linspace(0, 2, num_points)
+        y, nfev = integrate_symplectic(acc, [1.0, 0.0], t_eval, order)
+        errors.append(abs(y[0] - cos(2 * t_eval)).max())
+
+    assert log2(errors[0] / errors[1]) == pytest.approx(order, abs=0.3)
+
+
+def test_energy_stays_bounded():
+    def acc(q):
+        return -q
+
+    t_eval = linspace(0, 1000, 10001)
+    y, nfev = integrate_symplectic(acc, [1.0, 0.0], t_eval, order=2)
+    energy = 0.5 * (y[0] ** 2 + y[1] ** 2)
+
+    # the energy error of velocity Verlet oscillates with the square of the step size (h^2/8), it doesn't drift
+    assert abs(energy - 0.5).max() < 0.002
+    assert abs(energy[-1000:] - 0.5).max() <= 1.01 * abs(energy[:1000] - 0.5).max()
+
+
+def test_substeps_are_limited_by_max_step():
+    def acc(q):
+        return -q
+
+    t_eval = linspace(0, 1, 11)
+    y, nfev = integrate_symplectic(acc, [1.0, 0.0], t_eval, order=4, max_step=0.025)
+    # 4 substeps per output interval with 3 evaluations each and the evaluation at the start
+    assert nfev == 10 * 4 * 3 + 1
+    assert allclose(y[0], cos(t_eval), atol=1e-8)
+
+    with pytest.raises(ValueError):
+        integrate_symplectic(acc, [1.0, 0.0], array([0, 0.1, 0.3]))
+
+
+@pytest.mark.parametrize("method", ["Verlet", "Yoshida4", "Yoshida6"])
+@pytest.mark.parametrize("spring_type", ["linear", "cubic"])
+def test_symplectic_simulation_matches_reference(create_chain, spring_type, method):
+    list_of_object_lists = create_chain(4, spring_type=spring_type)
+    list_of_object_lists[1][2].velocity = [0.3, 0.1]
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = system.simulate(system.param_values, z0, (0, 2), 21, method=method, max_step=1e-3)
+    reference = system.simulate(system.param_values, z0, (0, 2), 21, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    assert res.method == method
+    assert res.accepted_steps == 2000
+    assert allclose(res.y, reference.y, rtol=0, atol={"Verlet": 1e-2, "Yoshida4": 1e-5, "Yoshida6": 1e-8}[method])
+
+    with pytest.raises(ValueError):
+        system.simulate(system.param_values, z0, (0, 2), 21, method=method, dense=True)
@@ -0,0 +1,105 @@
+import pytest
+from numpy import allclose, array, zeros
+from scipy.sparse import issparse
+import main_modeling
+from caching import topology_cache
+
+
+def finite_differences(fun, z, h=1e-6):
+    """
+    Jacobian of fun(t, z) at the state z by central differences.
+    """
+    columns = []
+    for i in range(len(z)):
+        step = zeros(len(z))
+        step[i] = h
+        columns.append((fun(0, z + step) - fun(0, z - step)) / (2 * h))
+
+    return array(columns).T
+
+
+@pytest.mark.parametrize("method", ["RK45", "DOP853", "Radau", "BDF", "LSODA"])
+@pytest.mark.parametrize("spring_type", ["linear", "cubic"])
+def test_simulation_matches_reference(create_chain, spring_type, method):
+    list_of_object_lists = create_chain(4, spring_type=spring_type)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = system.simulate(system.param_values, z0, (0, 2), 21, method=method, rtol=1e-9, atol=1e-9)
+    reference = system.simulate(system.param_values, z0, (0, 2), 21, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    assert res.y.shape == (16, 21)
+    assert res.method == method
+    assert allclose(res.y, reference.y, rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize("spring_type", ["linear", "cubic"])
+def test_jacobian_matches_finite_differences(create_chain, spring_type):
+    list_of_object_lists = create_chain(4, spring_type=spring_type)
+    system = main_modeling.build_system(list_of_object_lists)
+    kernel, active = system.reduced_kernel()
+    p = kernel.parameter_vector(system.param_values)
+
+    # stretched chain with moving masses (only the y coordinates are integrated)
+    z = array([-0.6, -1.3, -1.8, -2.5, 0.3, -0.2, 0.1, 0.4])
+    assert len(z) == 2 * len(active)
+
+    jac = kernel.jacobian(p)(0, z)
+    dense_jac = kernel.jacobian(p, dense=True)(0, z)
+    reference = finite_differences(kernel.rhs(p), z)
+
+    assert issparse(jac)
+    assert not issparse(dense_jac)
+    assert allclose(jac.toarray(), reference, rtol=1e-6, atol=1e-6)
+    assert allclose(dense_jac, reference, rtol=1e-6, atol=1e-6)
+
+
+def test_auto_uses_implicit_method_for_stiff_systems(create_chain):
+    list_of_object_lists = create_chain(4, spring_type="cubic")
+    # a very light mass at the top of the chain oscillates much faster than the others
+    list_of_object_lists[1][0].mass = 1e-5
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = system.simulate(system.param_values, z0, (0, 0.2), 11, method="auto", rtol=1e-9, atol=1e-9)
+    reference = system.simulate(system.param_values, z0, (0, 0.2), 11, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    assert res.method == "LSODA"
+    # the fast velocity of the light mass has the largest error
+    assert allclose(res.y, reference.y, rtol=0, atol=1e-5)
+
+
+def test_auto_uses_explicit_method_for_non_stiff_systems(create_chain):
+    list_of_object_lists = create_chain(4, spring_type="cubic")
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    assert system.simulate(system.param_values, z0, (0, 1), 11, method="auto").method == "RK45"
+
+
+def test_parameter_edit_reuses_the_kernel(create_chain):
+    system = main_modeling.build_system(create_chain(3, spring_type="cubic"))
+    edited = main_modeling.build_system(create_chain(3, spring_type="cubic", stiffness=300, mass=2))
+
+    assert edited.topology == system.topology
+    assert edited.reduced_kernel()[0] is system.reduced_kernel()[0]
+    assert edited.kernel() is system.kernel()
+    assert system.kernel() is not system.reduced_kernel()[0]
+
+
+def test_stored_kernel_is_loaded_without_deriving_the_equations(create_chain):
+    list_of_object_lists = create_chain(3, spring_type="cubic", stiffness=250)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = system.simulate(system.param_values, z0, (0, 1), 11, method="BDF")
+    system.static_equilibrium(system.param_values, z0[:6])
+    topology_cache.flush()
+    topology_cache.clear()
+
+    loaded = main_modeling.build_system(list_of_object_lists)
+    kernel, active = loaded.reduced_kernel()
+    assert kernel.eq_rhs is None
+    assert loaded.kernel().eq_rhs is None
+    assert allclose(loaded.simulate(loaded.param_values, z0, (0, 1), 11, method="BDF").y, res.y, rtol=0, atol=1e-12)
+    assert allclose(loaded.compile_rhs(loaded.param_values)(0, z0), system.compile_rhs(system.param_values)(0, z0))
@@ -0,0 +1,72 @@
+import os
+import json
+import time
+import pytest
+from numpy import array
+import newton
+from metrics import RunMetrics, timed
+import main_modeling
+
+
+def test_phases_do_not_contain_inner_phases():
+    with RunMetrics() as metrics:
+        with timed("outer"):
+            time.sleep(0.02)
+            with timed("inner"):
+                time.sleep(0.05)
+        with timed("outer"):
+            time.sleep(0.01)
+
+    assert 0.03 <= metrics.phases["outer"] < 0.05
+    assert metrics.phases["inner"] >= 0.05
+    assert sum(metrics.phases.values()) <= metrics.total
+
+    # without a measured run nothing is recorded
+    with timed("outer"):
+        pass
+    assert len(metrics.phases) == 2
+
+
+@pytest.mark.parametrize("method", ["RK45", "DOP853", "BDF"])
+def test_counted_steps_match_the_solution(create_chain, method):
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = system.simulate(system.param_values, z0, (0, 2), 21, method=method)
+
+    # the same solver stepped directly
+    sim_fun, method, options, states = system.solver_setup(system.param_values, z0, method)
+    solver = newton.SOLVERS[method](sim_fun, 0, array(z0)[states], 2, **options)
+    steps = 0
+    while solver.status == "running":
+        solver.step()
+        steps += 1
+
+    assert res.accepted_steps == steps
+    if method == "BDF":
+        assert res.rejected_steps is None
+    else:
+        # every attempt of a step evaluates all stages (plus the evaluations for the initial step size)
+        assert solver.nfev == solver.n_stages * (res.accepted_steps + res.rejected_steps) + 2
+
+
+def test_metrics_of_a_run_are_recorded_and_logged(tmp_path, create_chain):
+    res, system = main_modeling.run_simulation(create_chain(3, spring_type="cubic"), simulation_points=101,
+                                               method="auto")
+    metrics = res.metrics
+
+    assert "integration" in metrics.phases
+    assert sum(metrics.phases.values()) <= metrics.total
+    # the method that "auto" chose
+    assert metrics.solver["method"] == "RK45"
+    assert metrics.solver["accepted_steps"] == res.accepted_steps
+    assert metrics.solver["nfev"] == res.nfev
+    assert "method: RK45" in metrics.summary()
+
+    file_name = os.path.join(tmp_path, "metrics.jsonl")
+    metrics.log(file_name)
+    metrics.log(file_name)
+    with open(file_name) as file:
+        lines = [json.loads(line) for line in file]
+    assert lines == [metrics.as_dict(), metrics.as_dict()]
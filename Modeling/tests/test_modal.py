@@ -0,0 +1,95 @@
+import pytest
+from numpy import allclose, sqrt, sin, pi, array, arange
+import main_modeling
+import modal
+
+
+def test_dense_modal_solution_matches_the_time_grid(create_chain):
+    list_of_object_lists = create_chain(3)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+    t_span = (1, 6)
+
+    res = system.simulate(system.param_values, z0, t_span, 51, method="modal")
+    dense = system.simulate(system.param_values, z0, t_span, 51, method="modal", dense=True)
+
+    # single times and arrays of times after the start of the interval
+    for k in (10, 25, 50):
+        assert allclose(dense(res.t[k]), res.y[:, k], rtol=0, atol=1e-12)
+    assert allclose(dense(res.t[1:]), res.y[:, 1:], rtol=0, atol=1e-12)
+
+    reference = system.simulate(system.param_values, z0, t_span, 51, method="DOP853", rtol=1e-12, atol=1e-12)
+    assert allclose(dense(2.5), reference.y[:, 15], rtol=0, atol=1e-8)
+
+
+@pytest.mark.parametrize("method", ["modal", "propagator", "auto"])
+def test_linear_solution_matches_reference(create_chain, method):
+    list_of_object_lists = create_chain(4)
+    # the x coordinates move with their initial velocity
+    list_of_object_lists[1][1].velocity = [0.2, 0.5]
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = system.simulate(system.param_values, z0, (0, 3), 31, method=method)
+    reference = system.simulate(system.param_values, z0, (0, 3), 31, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    assert res.method == ("modal" if method == "auto" else method)
+    assert allclose(res.y, reference.y, rtol=0, atol=1e-8)
+
+
+def test_linear_solvers_reject_cubic_springs(create_chain):
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    for method in ("modal", "propagator"):
+        with pytest.raises(ValueError):
+            system.simulate(system.param_values, z0, (0, 1), 11, method=method)
+
+
+def test_propagate_batch_matches_single_runs(create_chain):
+    list_of_object_lists = create_chain(3)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = array(main_modeling.get_initial_conditions(list_of_object_lists[1]))
+    init_conds = [z0, z0 + 0.1, z0 - 0.05]
+
+    res = system.propagate_batch(system.param_values, init_conds, (0, 2), 41)
+
+    assert res.y.shape == (3, 12, 41)
+    for j, init_cond in enumerate(init_conds):
+        reference = system.simulate(system.param_values, init_cond, (0, 2), 41, method="DOP853", rtol=1e-12,
+                                    atol=1e-12)
+        assert allclose(res.y[j], reference.y, rtol=0, atol=1e-8)
+
+
+def test_natural_frequency_of_single_oscillator(create_chain):
+    frequencies, mode_shapes, system = main_modeling.run_modal_analysis(create_chain(1, stiffness=400, mass=4))
+
+    assert allclose(frequencies, [sqrt(400 / 4) / (2 * pi)])
+    # the x direction has no spring, so it has no mode
+    assert allclose(abs(mode_shapes[:, 0]), [0, 0.5])
+
+
+def test_natural_frequencies_of_linear_chain(create_chain):
+    frequencies, mode_shapes, system = main_modeling.run_modal_analysis(create_chain(5, stiffness=100, mass=1))
+
+    # chain fixed at the top and free at the bottom
+    j = arange(1, 6)
+    assert allclose(frequencies, 2 * sqrt(100) * sin((2 * j - 1) * pi / 22) / (2 * pi))
+
+
+@pytest.mark.parametrize("spring_type", ["linear", "cubic"])
+def test_sparse_eigensolver_matches_dense_solver(create_chain, spring_type):
+    list_of_object_lists = create_chain(8, spring_type=spring_type)
+    frequencies, mode_shapes, system = main_modeling.run_modal_analysis(list_of_object_lists)
+    assert len(frequencies) == 8
+    assert (frequencies > 0).all()
+
+    # linearized at the static equilibrium like run_modal_analysis()
+    q0 = main_modeling.get_initial_conditions(list_of_object_lists[1])[:16]
+    M, K = system.linearize(system.param_values, system.static_equilibrium(system.param_values, q0))
+    coupled = K.getnnz(axis=1) > 0
+    lowest, phi = modal.natural_frequencies(M[coupled][:, coupled], K[coupled][:, coupled], 3, dense_limit=2)
+
+    assert allclose(lowest, frequencies[:3])
+    assert allclose(abs(phi), abs(mode_shapes[coupled, :3]))
@@ -0,0 +1,71 @@
+import pytest
+from numpy import allclose, array, zeros
+import objects
+import network
+import main_modeling
+
+
+def create_mixed():
+    """
+    Creates a chain of a mass point, a steady body with an external force and a mass point, connected by a linear,
+    a cubic and a linear spring.
+    """
+    masses = [objects.Masspoint(mass=1, index=1, external_force=0),
+              objects.SteadyBody(x_dim=0.2, y_dim=0.2, z_dim=0.2, density=250, index=2, external_force=5),
+              objects.Masspoint(mass=0.5, index=3, external_force=0)]
+    for mass, y in zip(masses, (-0.55, -1.3, -1.9)):
+        mass.setInitialConditions([0, y], [0, 0])
+
+    springs = []
+    for i, spring_type in enumerate(("linear", "cubic", "linear")):
+        spring = objects.Spring(stiffness=100, rest_length=0.5, index=i + 1, type=spring_type)
+        spring.setInitialConditions(masses[i - 1] if i > 0 else None, masses[i], [0, 0])
+        springs.append(spring)
+
+    return [springs, masses]
+
+
+@pytest.mark.parametrize("method", ["RK45", "BDF", "Yoshida6"])
+def test_network_matches_symbolic_model(method):
+    list_of_object_lists = create_mixed()
+    list_of_object_lists[1][2].velocity = [0.3, -0.2]
+    system = main_modeling.build_system(list_of_object_lists)
+    model = network.SpringNetwork(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    res = model.simulate(z0, (0, 2), 21, method=method, max_step=1e-3 if method == "Yoshida6" else None, rtol=1e-9,
+                         atol=1e-9)
+    reference = system.simulate(system.param_values, z0, (0, 2), 21, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    assert res.method == method
+    assert allclose(res.y, reference.y, rtol=0, atol=1e-6)
+
+
+def test_network_jacobian_matches_symbolic_jacobian():
+    list_of_object_lists = create_mixed()
+    system = main_modeling.build_system(list_of_object_lists)
+    model = network.SpringNetwork(list_of_object_lists)
+    kernel, active = system.reduced_kernel()
+    p = kernel.parameter_vector(system.param_values)
+
+    # the symbolic model integrates the same y coordinates
+    assert list(active) == [1, 3, 5]
+    u = array([-0.6, -1.25, -2.0, 0.1, -0.3, 0.2])
+
+    assert allclose(model.rhs()(0, u), kernel.rhs(p)(0, u))
+    assert allclose(model.jacobian()(0, u).toarray(), kernel.jacobian(p)(0, u).toarray())
+    assert allclose(model.jacobian(dense=True)(0, u), kernel.jacobian(p, dense=True)(0, u))
+
+
+def test_network_simulation_run(create_chain):
+    list_of_object_lists = create_chain(5, spring_type="cubic")
+    res, model = main_modeling.run_simulation_numeric(list_of_object_lists)
+
+    assert res.y.shape == (20, 25001)
+    assert res.metrics.solver["method"] == "RK45"
+    assert "force assembly" in res.metrics.phases
+    assert allclose(res.y[:5 * 2:2], zeros((5, 25001)))
+
+    for method in ("modal", "propagator", "auto"):
+        with pytest.raises(ValueError):
+            model.simulate(main_modeling.get_initial_conditions(list_of_object_lists[1]), (0, 1), 11, method=method)
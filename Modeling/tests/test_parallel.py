@@ -0,0 +1,24 @@
+import pytest
+from numpy import array_equal
+import newton
+import main_modeling
+
+
+def test_parallel_runs_match_single_runs(create_chain):
+    config = newton.SolverConfig(t_span=(0, 2), num_points=21, method="BDF")
+    models = [create_chain(4, spring_type="cubic"), create_chain(3)]
+
+    results, systems = main_modeling.run_simulations_parallel(models, config=config, max_workers=2)
+
+    for res, list_of_object_lists in zip(results, models):
+        single, system = main_modeling.run_simulation(list_of_object_lists, config=config)
+        assert array_equal(res.y, single.y)
+        assert res.method == "BDF"
+        assert res.accepted_steps == single.accepted_steps
+
+
+@pytest.mark.parametrize("method", ["auto", "modal", "Verlet"])
+def test_parallel_runs_reject_methods_without_solver(create_chain, method):
+    with pytest.raises(ValueError):
+        main_modeling.run_monte_carlo(create_chain(3), {"k1": ("normal", 0, 0.05)}, 2, seed=1,
+                                      config=newton.SolverConfig(method=method))
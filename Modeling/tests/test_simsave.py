@@ -0,0 +1,116 @@
+import os
+import pytest
+from numpy import allclose, array_equal
+import newton
+import main_modeling
+from simsave import StreamWriter, LazyResults, load_system, save_system
+
+
+def test_stream_writer_file_can_be_loaded_during_the_run(tmp_path, create_chain):
+    list_of_object_lists = create_chain(3)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+    file_name = os.path.join(tmp_path, "stream.nc")
+
+    writer = StreamWriter(file_name, len(z0), newton.SolverConfig(), system.elements, flush_interval=100)
+    assert load_system(file_name, lazy=True)['results'].t_span is None
+    with pytest.raises(ValueError):
+        main_modeling.load_list(file_name)
+
+    chunks = system.simulate_chunks(system.param_values, z0, (0, 10), 1.0, 2001)
+    writer.append(*next(chunks))
+    list_of_object_lists, loaded = main_modeling.load_model_file(file_name, lazy=True)
+    assert len(list_of_object_lists[1]) == 3
+    assert loaded.results.num_points == 200
+
+    for chunk in chunks:
+        writer.append(*chunk)
+    writer.finish(system)
+    assert main_modeling.load_sys(file_name).y.shape == (12, 2001)
+
+
+def test_simulation_to_file_needs_two_time_points(tmp_path, create_chain):
+    file_name = os.path.join(tmp_path, "single.nc")
+    config = newton.SolverConfig(num_points=1)
+
+    with pytest.raises(ValueError):
+        main_modeling.run_simulation_to_file(create_chain(3), file_name, config=config)
+    assert not os.path.exists(file_name)
+
+
+@pytest.mark.parametrize("config", [newton.SolverConfig(),
+                                    newton.SolverConfig(t_span=(1, 3), num_points=11, method="BDF", rtol=1e-8,
+                                                        atol=[1e-6, 1e-7] * 6, max_step=0.1, dense=True)])
+def test_solver_config_round_trip(tmp_path, create_chain, config):
+    assert newton.SolverConfig.from_attributes(config.attributes()).options() == config.options()
+
+    # settings saved with the results of a run
+    run_config = newton.SolverConfig(t_span=config.t_span, num_points=config.num_points, method=config.method,
+                                     rtol=config.rtol, atol=config.atol, max_step=config.max_step)
+    res, system = main_modeling.run_simulation(create_chain(3), config=run_config)
+    file_name = os.path.join(tmp_path, "config")
+    save_system(file_name, res, system, config=config)
+
+    assert main_modeling.load_sys(file_name).solver_config.options() == config.options()
+
+
+def test_lazy_results_read_time_windows(tmp_path, create_chain):
+    config = newton.SolverConfig(t_span=(0, 2), num_points=2001)
+    res, system = main_modeling.run_simulation(create_chain(3, spring_type="cubic"), config=config)
+    file_name = os.path.join(tmp_path, "lazy")
+    save_system(file_name, res, system, config=config)
+
+    lazy = LazyResults(file_name)
+    assert (lazy.num_points, lazy.num_states, lazy.t_span) == (2001, 12, (0, 2))
+
+    window = lazy.window(0.5, 1.0)
+    assert array_equal(window.t, res.t[500:1001])
+    assert array_equal(window.y, res.y[:, 500:1001])
+    assert array_equal(lazy.window(1.5, states=[1, 3]).y, res.y[[1, 3], 1500:])
+    assert array_equal(lazy.sample(100).y, res.y[:, ::21])
+    assert array_equal(lazy.state(-1), res.y[:, -1])
+    assert array_equal(lazy.y, res.y)
+
+    loaded = main_modeling.load_sys(file_name, lazy=True)
+    assert loaded.time is None
+    assert array_equal(loaded.window(0.5, 1.0).y, window.y)
+    assert array_equal(loaded.t, res.t)
+
+
+def test_file_is_parsed_once(tmp_path, create_chain):
+    list_of_object_lists = create_chain(3)
+    res, system = main_modeling.run_simulation(list_of_object_lists, config=newton.SolverConfig(num_points=101))
+    file_name = os.path.join(tmp_path, "parsed")
+    save_system(file_name, res, system)
+
+    data = main_modeling.parse_file(file_name)
+    assert main_modeling.parse_file(file_name + ".nc") is data
+
+    loaded_objects, loaded = main_modeling.load_model_file(file_name)
+    assert main_modeling.parse_file(file_name) is data
+    assert main_modeling.topology_key(loaded_objects) == main_modeling.topology_key(list_of_object_lists)
+    assert array_equal(main_modeling.get_initial_conditions(loaded_objects[1]), res.y[:, 0])
+    assert array_equal(loaded.y, res.y)
+
+    # a changed file is parsed again
+    res, system = main_modeling.run_simulation(list_of_object_lists, config=newton.SolverConfig(num_points=201))
+    save_system(file_name, res, system)
+    assert main_modeling.parse_file(file_name) is not data
+    assert main_modeling.load_sys(file_name).y.shape == (12, 201)
+
+
+def test_streamed_file_matches_reference(tmp_path, create_chain):
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+    config = newton.SolverConfig(t_span=(0, 2), num_points=201, method="BDF", rtol=1e-9, atol=1e-9)
+    file_name = os.path.join(tmp_path, "streamed.nc")
+
+    metrics, system = main_modeling.run_simulation_to_file(list_of_object_lists, file_name, chunk_duration=0.3,
+                                                           config=config)
+
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+    reference = system.simulate(system.param_values, z0, (0, 2), 201, method="DOP853", rtol=1e-12, atol=1e-12)
+    loaded = main_modeling.load_sys(file_name)
+    assert allclose(loaded.t, reference.t)
+    assert allclose(loaded.y, reference.y, rtol=0, atol=1e-6)
+    assert loaded.solver_config.options() == config.options()
+    assert "integration" in metrics.phases
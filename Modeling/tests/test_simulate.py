@@ -0,0 +1,89 @@
+import pytest
+from numpy import allclose, concatenate, linspace, array
+import newton
+import main_modeling
+
+
+@pytest.mark.parametrize("method", ["RK45", "DOP853", "BDF", "auto"])
+def test_dense_result_matches_reference(create_chain, method):
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    dense = system.simulate(system.param_values, z0, (0, 2), 21, method=method, dense=True, rtol=1e-9, atol=1e-9)
+    res = system.simulate(system.param_values, z0, (0, 2), 21, method=method, rtol=1e-9, atol=1e-9)
+    reference = system.simulate(system.param_values, z0, (0, 2), 41, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    assert isinstance(dense, newton.DenseResult)
+    assert dense.method == res.method
+    # the grid is evaluated with the same interpolants as the solution of solve_ivp()
+    assert allclose(dense.t, res.t)
+    assert allclose(dense.y, res.y, rtol=0, atol=1e-12)
+    assert allclose(dense.sample(41).y, reference.y, rtol=0, atol=1e-6)
+    assert allclose(dense(reference.t[7]), reference.y[:, 7], rtol=0, atol=1e-6)
+
+
+def test_propagator_has_no_dense_output(create_chain):
+    list_of_object_lists = create_chain(3)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    with pytest.raises(ValueError):
+        system.simulate(system.param_values, z0, (0, 2), 21, method="propagator", dense=True)
+
+
+@pytest.mark.parametrize("method", ["RK45", "BDF"])
+def test_chunks_match_single_run(create_chain, method):
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    chunks = list(system.simulate_chunks(system.param_values, z0, (0, 3), 0.7, 61, method=method, rtol=1e-9,
+                                         atol=1e-9))
+    t = concatenate([t_chunk for t_chunk, y_chunk in chunks])
+    y = concatenate([y_chunk for t_chunk, y_chunk in chunks], axis=1)
+    res = system.simulate(system.param_values, z0, (0, 3), 61, method=method, rtol=1e-9, atol=1e-9)
+    reference = system.simulate(system.param_values, z0, (0, 3), 61, method="DOP853", rtol=1e-12, atol=1e-12)
+
+    # windows of 14 points (0.7 s), the last window has the remaining points
+    assert [len(t_chunk) for t_chunk, y_chunk in chunks] == [14, 14, 14, 14, 5]
+    assert allclose(t, res.t)
+    assert allclose(y, res.y, rtol=0, atol=1e-10)
+    assert allclose(y, reference.y, rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["modal", "Verlet"])
+def test_chunks_reject_methods_without_solver(create_chain, method):
+    list_of_object_lists = create_chain(3)
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+
+    with pytest.raises(ValueError):
+        next(system.simulate_chunks(system.param_values, z0, (0, 1), 0.5, 11, method=method))
+    with pytest.raises(ValueError):
+        next(system.simulate_chunks(system.param_values, z0, (0, 1), 0.5, 1))
+
+
+def test_coordinates_without_forces_are_not_integrated(create_chain):
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+    list_of_object_lists[1][0].velocity = [0.4, 0]
+    list_of_object_lists[1][2].velocity = [-0.2, 0.1]
+    system = main_modeling.build_system(list_of_object_lists)
+    z0 = array(main_modeling.get_initial_conditions(list_of_object_lists[1]))
+
+    kernel, active = system.reduced_kernel()
+    # only the y coordinates have forces
+    assert list(active) == [1, 3, 5]
+    assert len(kernel.coord) == 3
+
+    t_span = (0.5, 2)
+    res = system.simulate(system.param_values, z0, t_span, 16, method="RK45", rtol=1e-9, atol=1e-9)
+    reference = system.simulate(system.param_values, z0, t_span, 16, method="DOP853", rtol=1e-12, atol=1e-12)
+    assert res.y.shape == (12, 16)
+    assert allclose(res.y, reference.y, rtol=0, atol=1e-6)
+
+    # the x coordinates move with their constant initial velocity from the start of the interval
+    t = linspace(0, 1.5, 16)
+    for i in (0, 2, 4):
+        assert allclose(res.y[i], z0[i] + z0[6 + i] * t)
+        assert allclose(res.y[6 + i], z0[6 + i])
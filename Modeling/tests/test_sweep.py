@@ -0,0 +1,35 @@
+import pytest
+from numpy import allclose
+import newton
+import main_modeling
+
+
+def test_parameter_sweep_uses_config(create_chain):
+    config = newton.SolverConfig(t_span=(0, 2), num_points=21, rtol=1e-9, atol=1e-9, max_step=0.1)
+    list_of_object_lists = create_chain(3, spring_type="cubic")
+
+    res, system = main_modeling.run_parameter_sweep(list_of_object_lists, {"k1": [50, 100]}, config=config)
+    assert res.y.shape == (2, 12, 21)
+    assert res.t[-1] == 2
+
+    # the variant with the stiffness of the chain (100) matches a single run with the same settings
+    single, system = main_modeling.run_simulation(list_of_object_lists, config=config)
+    assert allclose(res.y[1], single.y, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["BDF", "Radau"])
+def test_implicit_parameter_sweep_matches_reference(create_chain, method):
+    list_of_object_lists = create_chain(4, spring_type="cubic")
+    config = newton.SolverConfig(t_span=(0, 2), num_points=21, method=method, rtol=1e-9, atol=1e-9)
+
+    res, system = main_modeling.run_parameter_sweep(list_of_object_lists, {"k1": [50, 100]}, config=config)
+
+    z0 = main_modeling.get_initial_conditions(list_of_object_lists[1])
+    reference = system.simulate(system.param_values, z0, (0, 2), 21, method="DOP853", rtol=1e-12, atol=1e-12)
+    assert allclose(res.y[1], reference.y, rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["auto", "modal", "Verlet"])
+def test_parameter_sweep_rejects_methods_without_solver(create_chain, method):
+    with pytest.raises(ValueError):
+        main_modeling.run_parameter_sweep(create_chain(3), {"k1": [50, 100]}, method=method)